@@ -0,0 +1,191 @@
+"""Incremental JSON prefix checker for streamed LLM output.
+
+`SchemaPrefixGuard.feed(chunk)` consumes text as it arrives and raises
+``StreamAbort`` the moment the prefix seen so far can no longer become a
+document that satisfies the output schema, e.g.:
+
+    - the reply starts with prose instead of ``[`` / ``{``
+    - the root (or any nested value) has the wrong JSON type
+    - an object uses a key its schema forbids (``additionalProperties: false``)
+
+It is deliberately not a full parser or validator: the complete text is
+still parsed and validated normally once the stream ends. The guard only
+has to be cheap, never reject a prefix of a valid document, and catch the
+common ways a model goes off the rails early.
+"""
+from __future__ import annotations
+
+_WS = " \t\r\n"
+
+
+class StreamAbort(ValueError):
+    """Raised when the streamed prefix can't be a schema-valid document."""
+
+
+def _types(schema: dict | None) -> set[str] | None:
+    if not schema or "type" not in schema:
+        return None
+    t = schema["type"]
+    return {t} if isinstance(t, str) else set(t)
+
+
+def _scalar_type(ch: str) -> str | None:
+    if ch == '"':
+        return "string"
+    if ch in "-0123456789":
+        return "number"
+    if ch in "tf":
+        return "boolean"
+    if ch == "n":
+        return "null"
+    return None
+
+
+class _Frame:
+    __slots__ = ("kind", "schema", "expect_key", "key")
+
+    def __init__(self, kind: str, schema: dict | None) -> None:
+        self.kind = kind  # "{" or "["
+        self.schema = schema
+        self.expect_key = kind == "{"
+        self.key: str | None = None
+
+
+class SchemaPrefixGuard:
+    def __init__(self, schema: dict | None) -> None:
+        self._root_schema = schema
+        self._stack: list[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_fence_header = False
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._key_buf: list[str] = []
+        self._in_scalar = False
+
+    @property
+    def done(self) -> bool:
+        """True once the root container has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> None:
+        for ch in chunk:
+            if self._done:
+                return
+            self._step(ch)
+
+    # -- internals ---------------------------------------------------------
+
+    def _child_schema(self) -> dict | None:
+        if not self._stack:
+            return self._root_schema
+        top = self._stack[-1]
+        if top.schema is None:
+            return None
+        if top.kind == "[":
+            items = top.schema.get("items")
+            return items if isinstance(items, dict) else None
+        props = top.schema.get("properties") or {}
+        return props.get(top.key) if top.key is not None else None
+
+    def _check_value_type(self, json_type: str) -> None:
+        allowed = _types(self._child_schema())
+        if allowed is None:
+            return
+        if json_type == "number" and allowed & {"number", "integer"}:
+            return
+        if json_type not in allowed:
+            where = f"key {self._stack[-1].key!r}" if self._stack and self._stack[-1].kind == "{" else "value"
+            raise StreamAbort(f"{where} is {json_type}, schema expects {sorted(allowed)}")
+
+    def _check_key(self, key: str) -> None:
+        top = self._stack[-1]
+        schema = top.schema
+        if not schema or schema.get("additionalProperties", True) is not False:
+            return
+        if key not in (schema.get("properties") or {}):
+            raise StreamAbort(f"unexpected key {key!r} (additionalProperties is false)")
+
+    def _step(self, ch: str) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    key = "".join(self._key_buf)
+                    self._stack[-1].key = key
+                    self._check_key(key)
+                return
+            if self._string_is_key:
+                self._key_buf.append(ch)
+            return
+
+        if not self._started:
+            if self._in_fence_header:
+                if ch == "\n":
+                    self._in_fence_header = False
+                return
+            if ch in _WS:
+                return
+            if ch == "`":
+                # Markdown fence (```json\n); skip to the end of the line.
+                self._in_fence_header = True
+                return
+            if ch not in "[{":
+                raise StreamAbort(f"reply starts with {ch!r}, expected a JSON document")
+            self._started = True
+
+        if self._in_scalar:
+            if ch not in ",]}" + _WS:
+                return
+            self._in_scalar = False
+
+        if ch in _WS:
+            return
+
+        top = self._stack[-1] if self._stack else None
+
+        if ch in "[{":
+            self._check_value_type("object" if ch == "{" else "array")
+            self._stack.append(_Frame(ch, self._child_schema()))
+            return
+
+        if ch in "]}":
+            if not top or top.kind != ("[" if ch == "]" else "{"):
+                raise StreamAbort(f"unbalanced {ch!r}")
+            self._stack.pop()
+            if not self._stack:
+                self._done = True
+            return
+
+        if top is None:
+            raise StreamAbort(f"unexpected {ch!r} after the JSON document")
+
+        if ch == ",":
+            if top.kind == "{":
+                top.expect_key = True
+                top.key = None
+            return
+        if ch == ":":
+            if top.kind == "{":
+                top.expect_key = False
+            return
+
+        if ch == '"':
+            self._in_string = True
+            self._string_is_key = top.kind == "{" and top.expect_key
+            self._key_buf = []
+            if not self._string_is_key:
+                self._check_value_type("string")
+            return
+
+        scalar = _scalar_type(ch)
+        if scalar is None or (top.kind == "{" and top.expect_key):
+            raise StreamAbort(f"unexpected {ch!r} in JSON")
+        self._check_value_type(scalar)
+        self._in_scalar = True
+
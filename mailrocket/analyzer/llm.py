@@ -15,6 +15,9 @@ Why this module exists:
 The list of models is configured in `config/config.yaml` under `llm.models`
 as `(provider, name)` tuples. We translate each into the LiteLLM-style
 `<provider>/<name>` model identifier and pass the right API key.
+
+`litellm` (seconds to import) and `jsonschema` are imported on first use,
+so commands that never call a model don't pay for them.
 """
 from __future__ import annotations
 
@@ -24,12 +27,12 @@ import logging
 import os
 import re
 import threading
+import time
+from collections import deque
 from collections.abc import Iterable, Iterator
 from typing import Any
 
-import jsonschema
-import litellm
-
+from mailrocket.analyzer.json_stream import SchemaPrefixGuard, StreamAbort
 from mailrocket.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -58,10 +61,44 @@ def _load_output_schema() -> dict | None:
         return None
 
 
+_VALIDATOR: Any = None
+_VALIDATOR_LOCK = threading.Lock()
+
+
+def _get_validator() -> Any:
+    """Build the schema's validator once (schema checked once, `$ref`s resolved once).
+
+    Validator instances hold no per-call state, so the single instance is
+    shared across calls and threads. Returns None when there is no schema.
+    """
+    global _VALIDATOR
+    if _VALIDATOR is not None:
+        return _VALIDATOR
+    schema = _load_output_schema()
+    if schema is None:
+        return None
+    with _VALIDATOR_LOCK:
+        if _VALIDATOR is None:
+            import jsonschema
+
+            cls = jsonschema.validators.validator_for(schema)
+            cls.check_schema(schema)
+            _VALIDATOR = cls(schema)
+    return _VALIDATOR
+
+
 class SchemaValidationError(RuntimeError):
     """Raised when the LLM response doesn't conform to the output schema."""
 
 
+class StreamAbortedError(SchemaValidationError):
+    """Raised when a streamed response is cut off early because it can't pass the schema."""
+
+
+class RequestCancelledError(RuntimeError):
+    """Raised when the caller cancelled an in-flight call (e.g. a hedge that lost)."""
+
+
 # ---------------------------------------------------------------------------
 # One-time Langfuse + LiteLLM setup
 # ---------------------------------------------------------------------------
@@ -70,17 +107,19 @@ _INIT_LOCK = threading.Lock()
 _INITIALIZED = False
 
 
-def _init_litellm() -> None:
-    """Configure LiteLLM (and Langfuse, if keys are present) exactly once.
+def _init_litellm() -> Any:
+    """Import and configure LiteLLM (and Langfuse, if keys are present) exactly once.
 
-    Safe to call from any thread; no-op after the first call.
+    Safe to call from any thread; returns the `litellm` module.
     """
     global _INITIALIZED
+    import litellm
+
     if _INITIALIZED:
-        return
+        return litellm
     with _INIT_LOCK:
         if _INITIALIZED:
-            return
+            return litellm
 
         # Don't let a single failing provider take the whole pipeline down.
         # LiteLLM raises on 4xx/5xx by default, which is what we want — the
@@ -104,6 +143,7 @@ def _init_litellm() -> None:
             logger.info("Langfuse keys not configured; LLM tracing disabled")
 
         _INITIALIZED = True
+    return litellm
 
 
 # ---------------------------------------------------------------------------
@@ -120,6 +160,7 @@ _TEMPERATURE_BY_PROVIDER = {
     "cerebras": lambda: settings.llm.cerebras_temperature,
     "mistral": lambda: settings.llm.mistral_temperature,
     "github": lambda: settings.llm.github_temperature,
+    "mock": lambda: 0.0,
 }
 
 
@@ -131,6 +172,7 @@ def _api_key_for(provider: str) -> str:
         "cerebras": settings.secrets.cerebras_api_key,
         "mistral": settings.secrets.mistral_api_key,
         "github": settings.secrets.github_token,
+        "mock": "mock",
     }.get(provider, "")
 
 
@@ -162,6 +204,10 @@ def _to_litellm_model(provider: str, name: str) -> tuple[str, dict[str, Any]]:
         # `name: openai/gpt-4o` continue to work unchanged.
         bare = name.split("/", 1)[1] if "/" in name else name
         return f"github/{bare}", {}
+    if provider == "mock":
+        # Never leaves the process: complete_json adds LiteLLM's
+        # `mock_response`/`mock_delay` per call (see mock_llm.py).
+        return f"openai/mock-{name}", {}
 
     raise ValueError(f"Unsupported provider: {provider}")
 
@@ -225,15 +271,146 @@ def validate_response(parsed: Any) -> None:
     Raises ``SchemaValidationError`` if validation fails, which the caller
     treats as a model failure and rotates to the next model.
     """
-    schema = _load_output_schema()
-    if schema is None:
+    validator = _get_validator()
+    if validator is None:
         return
-    try:
-        jsonschema.validate(instance=parsed, schema=schema)
-    except jsonschema.ValidationError as exc:
+    from jsonschema.exceptions import best_match
+
+    # Same error `jsonschema.validate` would pick, without re-checking the
+    # schema and building a new validator on every call.
+    error = best_match(validator.iter_errors(parsed))
+    if error is not None:
         raise SchemaValidationError(
-            f"Response failed schema validation: {exc.message}"
-        ) from exc
+            f"Response failed schema validation: {error.message}"
+        ) from error
+
+
+# ---------------------------------------------------------------------------
+# Token usage + per-attempt ledger
+# ---------------------------------------------------------------------------
+
+
+def _usage_of(response: Any) -> dict[str, int | None]:
+    """Pull prompt/completion/cached token counts off a LiteLLM response or chunk."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_tokens": getattr(details, "cached_tokens", None) if details else None,
+    }
+
+
+def _record_attempt(row: dict[str, Any]) -> None:
+    from mailrocket import metrics
+
+    provider, model = row["provider"], row["model"]
+    metrics.LLM_CALLS.inc(provider=provider, model=model, outcome=row["outcome"])
+    metrics.LLM_LATENCY.observe(row["latency_ms"] / 1000, provider=provider, model=model)
+    for direction in ("prompt", "completion"):
+        if row.get(f"{direction}_tokens"):
+            metrics.LLM_TOKENS.inc(row[f"{direction}_tokens"], provider=provider, model=model, direction=direction)
+
+    if not settings.llm.ledger:
+        return
+    from mailrocket.storage.llm_calls_repo import record_llm_call
+
+    try:
+        record_llm_call(row)
+    except Exception:
+        logger.debug("Failed to queue LLM ledger row", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Streaming path
+# ---------------------------------------------------------------------------
+
+_TTFT_LOCK = threading.Lock()
+_TTFT_MS: dict[str, deque[float]] = {}
+_TTFT_WINDOW = 50
+
+
+def _record_ttft(model_key: str, ms: float) -> None:
+    with _TTFT_LOCK:
+        _TTFT_MS.setdefault(model_key, deque(maxlen=_TTFT_WINDOW)).append(ms)
+
+
+def ttft_stats() -> dict[str, dict[str, float]]:
+    """Time-to-first-token per `provider/name` over the last streamed calls.
+
+    Shape: {"groq/llama-3.1-8b-instant": {"count": 12, "last_ms": 310.0, "avg_ms": 284.5}}
+    """
+    with _TTFT_LOCK:
+        return {
+            key: {
+                "count": len(samples),
+                "last_ms": samples[-1],
+                "avg_ms": sum(samples) / len(samples),
+            }
+            for key, samples in _TTFT_MS.items()
+            if samples
+        }
+
+
+def _stream_text(
+    kwargs: dict[str, Any],
+    model_key: str,
+    cancel_event: threading.Event | None = None,
+    usage: dict[str, int | None] | None = None,
+) -> str:
+    """Run a streamed completion, checking each chunk against the schema.
+
+    Raises ``StreamAbortedError`` (and closes the stream) as soon as the
+    prefix can't be valid, so the caller rotates without paying for the
+    rest of the generation. Setting *cancel_event* stops the stream the same
+    way (used by hedged requests to stop the losing call). Token usage from
+    the final chunk, when the provider sends one, is written into *usage*.
+    """
+    schema = _load_output_schema()
+    guard = SchemaPrefixGuard(schema) if schema is not None else None
+    parts: list[str] = []
+    start = time.perf_counter()
+    first = True
+
+    response = _init_litellm().completion(
+        **kwargs, stream=True, stream_options={"include_usage": True}
+    )
+    try:
+        for chunk in response:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelledError(f"{model_key} cancelled after {sum(map(len, parts))} chars")
+            if usage is not None and getattr(chunk, "usage", None):
+                usage.update(_usage_of(chunk))
+            try:
+                delta = chunk.choices[0].delta.content or ""
+            except (AttributeError, IndexError, KeyError):
+                continue
+            if not delta:
+                continue
+            if first:
+                ttft_ms = (time.perf_counter() - start) * 1000
+                _record_ttft(model_key, ttft_ms)
+                logger.debug("TTFT %s: %.0f ms", model_key, ttft_ms)
+                first = False
+            parts.append(delta)
+            if guard is not None:
+                try:
+                    guard.feed(delta)
+                except StreamAbort as exc:
+                    raise StreamAbortedError(
+                        f"Aborted stream after {sum(map(len, parts))} chars: {exc}"
+                    ) from exc
+    finally:
+        close = getattr(response, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                logger.debug("Error closing LiteLLM stream", exc_info=True)
+
+    return "".join(parts)
 
 
 def complete_json(
@@ -244,6 +421,8 @@ def complete_json(
     max_tokens: int | None = None,
     timeout: float | None = None,
     json_mode: bool = True,
+    stream: bool | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> tuple[Any, str]:
     """Send one chat completion and return (parsed_json, raw_text).
 
@@ -260,8 +439,13 @@ def complete_json(
     ``metadata`` is forwarded to LiteLLM, where Langfuse picks up keys like
     ``trace_id``, ``session_id``, ``tags``, ``generation_name``,
     ``trace_user_id``.
+
+    When *stream* is True (default: ``llm.streaming``), the completion is
+    streamed and checked incrementally; see ``_stream_text``. *cancel_event*
+    stops a streamed call between chunks; a non-streamed call can't be
+    interrupted and raises ``RequestCancelledError`` once it returns.
     """
-    _init_litellm()
+    litellm = _init_litellm()
 
     provider = model_info["provider"]
     name = model_info["name"]
@@ -288,20 +472,72 @@ def complete_json(
     if metadata:
         kwargs["metadata"] = metadata
     kwargs.update(extra)
-
-    response = litellm.completion(**kwargs)
+    if provider == "mock":
+        from mailrocket.analyzer.mock_llm import mock_kwargs
+
+        # LiteLLM's mock path looks up the provider of the bare `mock-<name>`
+        # and prints its "Provider List" banner on every call when that fails.
+        litellm.suppress_debug_info = True
+        kwargs.update(mock_kwargs(name, messages))
+
+    meta = metadata or {}
+    usage: dict[str, int | None] = {}
+    outcome = "error"
+    schema_valid: bool | None = None
+    error: str | None = None
+    started_at = time.time()
+    start = time.perf_counter()
 
     try:
-        text = response.choices[0].message.content or ""
-    except (AttributeError, IndexError, KeyError) as e:
-        raise RuntimeError(f"Unexpected LiteLLM response shape: {e!r}") from e
-
-    parsed = parse_json_response(text)
-
-    if parsed is not None:
-        validate_response(parsed)
-
-    return parsed, text
+        use_stream = settings.llm.streaming if stream is None else stream
+        if use_stream:
+            text = _stream_text(kwargs, f"{provider}/{name}", cancel_event, usage)
+        else:
+            response = litellm.completion(**kwargs)
+            usage.update(_usage_of(response))
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelledError(f"{provider}/{name} cancelled")
+            try:
+                text = response.choices[0].message.content or ""
+            except (AttributeError, IndexError, KeyError) as e:
+                raise RuntimeError(f"Unexpected LiteLLM response shape: {e!r}") from e
+
+        parsed = parse_json_response(text)
+
+        if parsed is None:
+            outcome = "invalid_json"
+        else:
+            validate_response(parsed)
+            schema_valid = True if _get_validator() is not None else None
+            outcome = "ok"
+
+        return parsed, text
+    except StreamAbortedError as e:
+        outcome, schema_valid, error = "aborted", False, str(e)
+        raise
+    except SchemaValidationError as e:
+        outcome, schema_valid, error = "schema_invalid", False, str(e)
+        raise
+    except RequestCancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _record_attempt({
+            "run_id": meta.get("session_id"),
+            "started_at": started_at,
+            "provider": provider,
+            "model": name,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "outcome": outcome,
+            "schema_valid": schema_valid,
+            "error": error[:500] if error else None,
+            "post_uid": meta.get("post_uid"),
+            "prompt_version": meta.get("prompt_version"),
+            **usage,
+        })
 
 
 # Backward-compat shim: scripts/test_models.py used to call `get_llm()` and
@@ -314,10 +550,13 @@ def get_llm(model_info: dict) -> dict:  # pragma: no cover - compat only
 
 
 __all__ = [
+    "RequestCancelledError",
     "SchemaValidationError",
+    "StreamAbortedError",
     "complete_json",
     "model_cycle",
     "parse_json_response",
+    "ttft_stats",
     "validate_response",
     "get_llm",
 ]
@@ -0,0 +1,121 @@
+"""Offline `mock` provider for load-testing the analyze stage.
+
+A model entry like ``{provider: mock, name: flaky}`` never leaves the
+process: ``complete_json`` routes it through LiteLLM's built-in
+``mock_response`` path, so retries, streaming, the ledger, hedging and
+rotation all run exactly as they do against a real provider.
+
+The *name* selects a profile from ``llm.mock_profiles``:
+
+    latency_ms          median latency (default 400)
+    latency_sigma       lognormal spread; 0 = constant (default 0.5)
+    error_rate          fraction of calls raising a 500 (default 0)
+    invalid_rate        fraction of calls answering prose instead of JSON
+    rate_limit_rate     chance that a call starts a 429 burst (default 0)
+    rate_limit_burst    consecutive calls rejected once a burst starts (default 5)
+
+Successful replies are the one-shot example output, re-templated from the
+job text (company, contact emails, links) with a pseudo-random match score.
+"""
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+import threading
+from typing import Any
+
+from mailrocket.settings import settings
+
+_DEFAULT_PROFILE: dict[str, float] = {
+    "latency_ms": 400,
+    "latency_sigma": 0.5,
+    "error_rate": 0.0,
+    "invalid_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "rate_limit_burst": 5,
+}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_URL_RE = re.compile(r"https?://[^\s)>\]]+")
+_COMPANY_RE = re.compile(r"\b(?:at|@|join)\s+([A-Z][\w&.-]*(?:\s+[A-Z][\w&.-]*){0,2})")
+_JOB_BLOCK_RE = re.compile(r"<JOB_POSTINGS>([\s\S]*?)</JOB_POSTINGS>")
+
+_LOCK = threading.Lock()
+_RNG = random.Random()
+_BURST_LEFT: dict[str, int] = {}
+_TEMPLATE: dict | None = None
+
+
+def _profile(name: str) -> dict[str, float]:
+    return {**_DEFAULT_PROFILE, **(settings.llm.mock_profiles.get(name) or {})}
+
+
+def _template() -> dict:
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        path = settings.paths.prompts_dir / "v1" / "examples" / "one_shot.json"
+        _TEMPLATE = json.loads(path.read_text(encoding="utf-8"))["output"][0]
+    return _TEMPLATE
+
+
+def _job_text(messages: list[dict]) -> str:
+    text = "\n".join(str(m.get("content") or "") for m in messages if m.get("role") == "user")
+    m = _JOB_BLOCK_RE.search(text)
+    return m.group(1) if m else text
+
+
+def _analysis(job_text: str, rng: random.Random) -> list[dict]:
+    item = json.loads(json.dumps(_template()))
+    company = _COMPANY_RE.search(job_text)
+    match = rng.randint(30, 95)
+    item["match_percentage"] = match
+    item["should_apply"] = match >= settings.filters.match_threshold
+    item["contact_email"] = sorted(set(_EMAIL_RE.findall(job_text)))[:3]
+    item["application_link"] = sorted(set(_URL_RE.findall(job_text)))[:3]
+    if company:
+        item["company_name"] = company.group(1).strip(" .")
+        item["message_content"]["subject"] = (
+            f"Application for {item['title']} at {item['company_name']}"
+        )
+    return [item]
+
+
+def _sample_delay(profile: dict[str, float], rng: random.Random) -> float:
+    median = max(0.0, float(profile["latency_ms"])) / 1000
+    sigma = max(0.0, float(profile["latency_sigma"]))
+    if median == 0 or sigma == 0:
+        return median
+    return median * math.exp(rng.gauss(0.0, sigma))
+
+
+def mock_kwargs(name: str, messages: list[dict]) -> dict[str, Any]:
+    """LiteLLM kwargs (`mock_response`, `mock_delay`) for one call to mock profile *name*."""
+    profile = _profile(name)
+    with _LOCK:
+        rng = random.Random(_RNG.random())
+        burst_left = _BURST_LEFT.get(name, 0)
+        if burst_left == 0 and rng.random() < float(profile["rate_limit_rate"]):
+            burst_left = int(profile["rate_limit_burst"])
+        if burst_left > 0:
+            _BURST_LEFT[name] = burst_left - 1
+
+    delay = _sample_delay(profile, rng)
+    if burst_left > 0:
+        # Providers reject throttled calls quickly.
+        return {"mock_response": "litellm.RateLimitError", "mock_delay": min(delay, 0.05)}
+    roll = rng.random()
+    if roll < float(profile["error_rate"]):
+        return {"mock_response": "litellm.InternalServerError", "mock_delay": delay}
+    if roll < float(profile["error_rate"]) + float(profile["invalid_rate"]):
+        return {"mock_response": "Sorry, I can't help with that request.", "mock_delay": delay}
+    body = json.dumps(_analysis(_job_text(messages), rng), ensure_ascii=False)
+    return {"mock_response": body, "mock_delay": delay}
+
+
+def seed(value: int) -> None:
+    """Make the mock provider's latency/error sequence reproducible."""
+    with _LOCK:
+        _RNG.seed(value)
+        _BURST_LEFT.clear()
@@ -8,16 +8,24 @@ The optional `trace_metadata` dict is merged into the per-call metadata so
 the resulting Langfuse trace knows which post we were analysing (post_uid,
 post_link, etc.). When Langfuse keys are absent the metadata is simply
 ignored by the no-op callback path.
+
+Hedging (`llm.hedging`): a slow model gets company from the next healthy
+one after its p90 latency; the first valid answer wins. See `_invoke_hedged`.
 """
 from __future__ import annotations
 
 import logging
+import statistics
+import threading
 import time
 import traceback
 import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Any
 
-from mailrocket.analyzer.llm import complete_json, model_cycle
+from mailrocket import timing
+from mailrocket.analyzer.llm import RequestCancelledError, complete_json, model_cycle
 from mailrocket.analyzer.prompts import build_messages, load_resume_text
 from mailrocket.settings import settings
 
@@ -90,6 +98,213 @@ def _build_trace_metadata(
     }
 
 
+# ---------------------------------------------------------------------------
+# Per-model latency / health bookkeeping (feeds the hedging budget)
+# ---------------------------------------------------------------------------
+
+_HEALTH_COOLDOWN_SECONDS = 60.0
+_LATENCY_WINDOW = 50
+_MIN_LATENCY_SAMPLES = 5
+
+_STATS_LOCK = threading.Lock()
+_LATENCIES: dict[str, deque[float]] = {}
+_LAST_FAILURE: dict[str, float] = {}
+_HEDGE_TIMES: deque[float] = deque()
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _model_key(model_info: dict) -> str:
+    return f"{model_info['provider']}/{model_info['name']}"
+
+
+def _record_success(model_info: dict, seconds: float) -> None:
+    with _STATS_LOCK:
+        _LATENCIES.setdefault(_model_key(model_info), deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+
+def _record_failure(model_info: dict) -> None:
+    with _STATS_LOCK:
+        _LAST_FAILURE[_model_key(model_info)] = time.monotonic()
+
+
+def _is_healthy(model_info: dict) -> bool:
+    """A model is healthy unless it failed within the last `_HEALTH_COOLDOWN_SECONDS`."""
+    with _STATS_LOCK:
+        failed_at = _LAST_FAILURE.get(_model_key(model_info))
+    return failed_at is None or time.monotonic() - failed_at > _HEALTH_COOLDOWN_SECONDS
+
+
+def _latency_budget(model_info: dict) -> float:
+    """Seconds to wait on `model_info` before hedging: its p90 latency, floored.
+
+    Falls back to `llm.hedge_default_budget_seconds` until the model has a few
+    successful calls in this process.
+    """
+    with _STATS_LOCK:
+        samples = list(_LATENCIES.get(_model_key(model_info), ()))
+    if len(samples) < _MIN_LATENCY_SAMPLES:
+        budget = settings.llm.hedge_default_budget_seconds
+    else:
+        budget = statistics.quantiles(samples, n=10)[-1]
+    return max(budget, settings.llm.hedge_min_budget_seconds)
+
+
+def _take_hedge_slot() -> bool:
+    """Sliding one-minute window capping hedges at `llm.hedge_max_per_minute`."""
+    now = time.monotonic()
+    with _STATS_LOCK:
+        while _HEDGE_TIMES and now - _HEDGE_TIMES[0] > 60:
+            _HEDGE_TIMES.popleft()
+        if len(_HEDGE_TIMES) >= settings.llm.hedge_max_per_minute:
+            return False
+        _HEDGE_TIMES.append(now)
+        return True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool for hedged calls: a primary and a hedge per concurrent analyze worker."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        workers = 2 * max(1, settings.pipeline.analyze_workers)
+        _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-hedge")
+    return _EXECUTOR
+
+
+def _submit(
+    executor: ThreadPoolExecutor,
+    in_flight: dict[Future, tuple[dict, threading.Event]],
+    model: dict,
+    messages: list[dict],
+    attempt: int,
+    trace_metadata: dict[str, Any] | None,
+) -> threading.Event:
+    """Start one model call on `executor`; the returned event is set once it runs."""
+    cancel = threading.Event()
+    started = threading.Event()
+
+    def run() -> list[dict]:
+        started.set()
+        return _call_model(model, messages, attempt, trace_metadata, cancel)
+
+    in_flight[executor.submit(run)] = (model, cancel)
+    return started
+
+
+# ---------------------------------------------------------------------------
+# Invocation
+# ---------------------------------------------------------------------------
+
+
+class _UnexpectedShape(RuntimeError):
+    """The model answered with JSON we can't coerce into a list of analyses."""
+
+
+def _call_model(
+    current: dict,
+    messages: list[dict],
+    attempt: int,
+    trace_metadata: dict[str, Any] | None,
+    cancel_event: threading.Event | None = None,
+) -> list[dict]:
+    """One model attempt. Returns the normalised result or raises."""
+    metadata = _build_trace_metadata(attempt, current, trace_metadata)
+    start = time.perf_counter()
+    try:
+        with timing.span("analyze.llm_call"):
+            parsed, _raw = complete_json(current, messages, metadata=metadata, cancel_event=cancel_event)
+    except RequestCancelledError:
+        timing.incr("analyze.llm_calls_cancelled")
+        raise
+    except Exception:
+        timing.incr("analyze.llm_calls_failed")
+        _record_failure(current)
+        raise
+
+    normalized = _normalize_result(parsed)
+    if normalized is None:
+        _record_failure(current)
+        raise _UnexpectedShape(f"unexpected shape {type(parsed).__name__}")
+    _record_success(current, time.perf_counter() - start)
+    return normalized
+
+
+def _log_failure(model_info: dict, exc: BaseException) -> None:
+    if isinstance(exc, _UnexpectedShape):
+        logger.warning("Model %s returned %s; cycling to next model", model_info["name"], exc)
+        return
+    logger.warning("Model %s failed: %s", model_info["name"], exc)
+    logger.debug("Traceback: %s", "".join(traceback.format_exception(exc)))
+
+
+def _next_healthy(iterator, exclude: dict, limit: int) -> dict | None:
+    """Advance the shared cycle to the next healthy model other than `exclude`."""
+    for _ in range(limit):
+        candidate = next(iterator)
+        if candidate is not exclude and _is_healthy(candidate):
+            return candidate
+    return None
+
+
+def _invoke_hedged(
+    messages: list[dict],
+    models: list[dict],
+    iterator,
+    trace_metadata: dict[str, Any] | None,
+) -> tuple[list | None, dict]:
+    """Hedged variant of the rotation loop.
+
+    Each round starts the next model in a worker thread. If it hasn't
+    answered within its latency budget (and the per-minute hedge cap
+    allows), the same request also goes to the next healthy model; the
+    first valid response wins and the other call is cancelled. Returns
+    `(result, model_info)`; `result` is None if every attempt failed.
+    """
+    executor = _get_executor()
+    attempt = 0
+    last_model = models[0]
+
+    while attempt < len(models):
+        primary = next(iterator)
+        attempt += 1
+        last_model = primary
+        logger.info("Invoking %s/%s (attempt %d)", primary["provider"], primary["name"], attempt)
+
+        in_flight: dict[Future, tuple[dict, threading.Event]] = {}
+        started = _submit(executor, in_flight, primary, messages, attempt, trace_metadata)
+        budget = _latency_budget(primary)
+        # The budget runs from when the call starts, not while it waits for a thread.
+        started.wait()
+        done, _ = wait(in_flight, timeout=budget)
+        if not done and attempt < len(models) and _take_hedge_slot():
+            hedge = _next_healthy(iterator, primary, len(models))
+            if hedge is not None:
+                attempt += 1
+                last_model = hedge
+                logger.info(
+                    "Hedging: %s/%s silent after %.1fs; also invoking %s/%s (attempt %d)",
+                    primary["provider"], primary["name"], budget,
+                    hedge["provider"], hedge["name"], attempt,
+                )
+                _submit(executor, in_flight, hedge, messages, attempt, trace_metadata)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                model, _cancel = in_flight.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    _log_failure(model, e)
+                    continue
+                for loser, cancel in in_flight.values():
+                    logger.info("Cancelling slower request to %s/%s", loser["provider"], loser["name"])
+                    cancel.set()
+                return result, model
+
+    return None, last_model
+
+
 def _invoke(
     messages: list[dict],
     *,
@@ -103,26 +318,19 @@ def _invoke(
     iterator = _get_iter()
     last_model = models[0]
 
-    for attempt in range(len(models)):
-        current = next(iterator)
-        last_model = current
-        logger.info("Invoking %s/%s (attempt %d)", current["provider"], current["name"], attempt + 1)
-        try:
-            metadata = _build_trace_metadata(attempt + 1, current, trace_metadata)
-            parsed, _raw = complete_json(current, messages, metadata=metadata)
-        except Exception as e:
-            logger.warning("Model %s failed: %s", current["name"], e)
-            logger.debug("Traceback: %s", traceback.format_exc())
-            continue
-
-        normalized = _normalize_result(parsed)
-        if normalized is None:
-            logger.warning(
-                "Model %s returned unexpected shape %s; cycling to next model",
-                current["name"], type(parsed).__name__,
-            )
-            continue
-        return normalized, current
+    if settings.llm.hedging:
+        result, last_model = _invoke_hedged(messages, models, iterator, trace_metadata)
+        if result is not None:
+            return result, last_model
+    else:
+        for attempt in range(len(models)):
+            current = next(iterator)
+            last_model = current
+            logger.info("Invoking %s/%s (attempt %d)", current["provider"], current["name"], attempt + 1)
+            try:
+                return _call_model(current, messages, attempt + 1, trace_metadata), current
+            except Exception as e:
+                _log_failure(current, e)
 
     error_result = [{
         "model_name": last_model["name"],
@@ -147,16 +355,18 @@ def analyze_job_match(
     """
     logger.info("Starting job match analysis")
 
-    params = {
-        "resume": load_resume_text(),
-        "jobs": jobs_text,
-    }
-    messages, prompt_version = build_messages(params)
+    with timing.span("analyze.build_prompt"):
+        params = {
+            "resume": load_resume_text(),
+            "jobs": jobs_text,
+        }
+        messages, prompt_version = build_messages(params)
 
     if trace_metadata is None:
         trace_metadata = {}
     trace_metadata["prompt_version"] = prompt_version
 
-    result, model_info = _invoke(messages, trace_metadata=trace_metadata)
+    with timing.span("analyze.llm"):
+        result, model_info = _invoke(messages, trace_metadata=trace_metadata)
     logger.info("Analysis complete using %s/%s", model_info["provider"], model_info["name"])
     return result, model_info
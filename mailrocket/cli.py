@@ -3,13 +3,128 @@ from __future__ import annotations
 
 import argparse
 import logging
+import re
 import sys
+import time
+from datetime import datetime
 
 from mailrocket.logging_setup import configure_logging
 from mailrocket.settings import settings
 
 logger = logging.getLogger("mailrocket")
 
+# One-shot commands whose metrics are written to the textfile / Pushgateway at
+# exit (`ui` and `daemon` serve /metrics themselves).
+_EXPORTED_COMMANDS = frozenset({"scrape", "analyze", "send", "pipeline", "run-all"})
+
+_WINDOW_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "": 3600}
+
+
+def _parse_window(value: str) -> float:
+    """Parse `30m`, `24h`, `7d` (bare numbers are hours) into seconds."""
+    m = _WINDOW_RE.match(value)
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid window {value!r}; use e.g. 30m, 24h, 7d")
+    return float(m.group(1)) * _WINDOW_UNITS[m.group(2)]
+
+
+def _print_llm_stats(rows: list[dict], window: str) -> None:
+    if not rows:
+        print(f"No LLM calls recorded in the last {window}.")
+        return
+
+    def ms(v: float | None) -> str:
+        return f"{v:.0f}" if v is not None else "-"
+
+    headers = ("MODEL", "CALLS", "OK", "FAIL%", "CALLS/H", "P50 MS", "P95 MS", "TOK IN", "TOK OUT", "CACHED")
+    table = [
+        (
+            f"{r['provider']}/{r['model']}",
+            str(r["calls"]),
+            str(r["ok"]),
+            f"{r['failure_rate'] * 100:.1f}",
+            f"{r['calls_per_hour']:.1f}",
+            ms(r["p50_ms"]),
+            ms(r["p95_ms"]),
+            str(r["prompt_tokens"]),
+            str(r["completion_tokens"]),
+            str(r["cached_tokens"]),
+        )
+        for r in rows
+    ]
+    widths = [max(len(c) for c in col) for col in zip(headers, *table, strict=True)]
+    fmt = "  ".join("{:<" + str(w) + "}" for w in widths)
+    print(f"LLM calls in the last {window}:\n")
+    print(fmt.format(*headers))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in table:
+        print(fmt.format(*row))
+
+
+def _print_runs(runs: list[dict]) -> None:
+    if not runs:
+        print("No runs recorded yet.")
+        return
+    headers = ("RUN", "STAGE", "STATUS", "STARTED", "SECS", "PROGRESS")
+    table = []
+    for r in runs:
+        p = r["progress"]
+        if r["stage"] == "scrape":
+            summary = f"{len(p.get('completed_queries', []))} queries done, {p.get('inserted', 0)} new posts"
+            if p.get("failed_queries"):
+                summary += f", {len(p['failed_queries'])} failed"
+            if r["status"] != "completed" and p.get("current_query"):
+                summary += f"; stopped in #{p.get('query_index', 0) + 1} {p['current_query']!r}"
+        else:
+            summary = ", ".join(f"{k}={v}" for k, v in sorted(p.get("outcomes", {}).items())) or "-"
+            if r["status"] != "completed" and p.get("last_uid") is not None:
+                summary += f"; last finished uid {p['last_uid']}"
+        end = r["finished_at"] or r["updated_at"]
+        table.append((
+            str(r["run_id"]),
+            r["stage"],
+            r["status"],
+            datetime.fromtimestamp(r["started_at"]).strftime("%Y-%m-%d %H:%M"),
+            f"{end - r['started_at']:.0f}",
+            summary,
+        ))
+    widths = [max(len(c) for c in col) for col in zip(headers, *table, strict=True)]
+    fmt = "  ".join("{:<" + str(w) + "}" for w in widths)
+    print(fmt.format(*headers))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in table:
+        print(fmt.format(*row))
+
+
+def _print_outbox(counts: dict[str, int], rows: list[dict]) -> None:
+    if not counts:
+        print("Outbox is empty.")
+        return
+    print("Outbox: " + ", ".join(f"{state}={n}" for state, n in sorted(counts.items())) + "\n")
+    if not rows:
+        return
+    headers = ("ID", "ANALYSIS", "KIND", "RECIPIENT", "STATE", "TRIES", "UPDATED", "LAST ERROR")
+    table = [
+        (
+            str(r["outbox_id"]),
+            str(r["analysis_id"]),
+            r["kind"],
+            r["recipient"],
+            r["state"],
+            str(r["attempts"]),
+            datetime.fromtimestamp(r["updated_at"]).strftime("%Y-%m-%d %H:%M"),
+            (r["last_error"] or "-")[:60],
+        )
+        for r in rows
+    ]
+    widths = [max(len(c) for c in col) for col in zip(headers, *table, strict=True)]
+    fmt = "  ".join("{:<" + str(w) + "}" for w in widths)
+    print(fmt.format(*headers))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in table:
+        print(fmt.format(*row))
+
 
 def _build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -25,8 +140,8 @@ def _build_parser() -> argparse.ArgumentParser:
     sub = p.add_subparsers(dest="command", required=True)
 
     sub.add_parser("init-db", help="Create the SQLite schema if missing")
-    sub.add_parser("scrape", help="Scrape LinkedIn and insert new posts (no analysis, no send)")
-    sub.add_parser("analyze", help="Run LLM on posts pending analysis (no send)")
+    scrape = sub.add_parser("scrape", help="Scrape LinkedIn and insert new posts (no analysis, no send)")
+    analyze = sub.add_parser("analyze", help="Run LLM on posts pending analysis (no send)")
 
     send = sub.add_parser(
         "send",
@@ -38,7 +153,7 @@ def _build_parser() -> argparse.ArgumentParser:
         help="Print what would be sent without contacting Gmail or updating mail_sent",
     )
 
-    sub.add_parser(
+    pipeline = sub.add_parser(
         "pipeline",
         help="scrape + analyze (no send). Use during the day; review and send next morning.",
     )
@@ -49,6 +164,20 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     runall.add_argument("--dry-run", action="store_true")
 
+    for sp in (pipeline, runall):
+        sp.add_argument(
+            "--overlap",
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help="Analyze posts while scraping (default: pipeline.overlap in config)",
+        )
+    for sp in (scrape, analyze, pipeline, runall):
+        sp.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the last incomplete run (skips scrape queries it already finished)",
+        )
+
     ui = sub.add_parser(
         "ui",
         help="Launch the web review UI (read-only posts, editable analyses)",
@@ -57,6 +186,49 @@ def _build_parser() -> argparse.ArgumentParser:
     ui.add_argument("--port", type=int, default=8765, help="Port (default 8765)")
     ui.add_argument("--reload", action="store_true", help="Enable auto-reload (dev)")
 
+    daemon = sub.add_parser(
+        "daemon",
+        help="Run scheduled scrape/analyze/send jobs in one long-lived process (daemon.jobs in config)",
+    )
+    daemon.add_argument("--host", default=None, help="Status endpoint bind address (default daemon.host)")
+    daemon.add_argument("--port", type=int, default=None, help="Status endpoint port (default daemon.port)")
+
+    stats = sub.add_parser("stats", help="Summaries of recorded pipeline activity")
+    stats_sub = stats.add_subparsers(dest="stats_command", required=True)
+    stats_llm = stats_sub.add_parser(
+        "llm",
+        help="Per-model throughput, p50/p95 latency, failure rate and tokens from the llm_calls ledger",
+    )
+    stats_llm.add_argument(
+        "--since",
+        default="24h",
+        help="Time window, e.g. 30m, 24h, 7d (default 24h)",
+    )
+    stats_runs = stats_sub.add_parser(
+        "runs",
+        help="Recent scrape/analyze runs with their status and checkpointed progress",
+    )
+    stats_runs.add_argument("--limit", type=int, default=20, help="Number of runs (default 20)")
+    stats_outbox = stats_sub.add_parser(
+        "outbox",
+        help="Per-recipient send log: counts by state and the latest rows",
+    )
+    stats_outbox.add_argument(
+        "--state",
+        choices=("pending", "sending", "sent", "failed", "unknown"),
+        default=None,
+        help="Only rows in this state",
+    )
+    stats_outbox.add_argument("--limit", type=int, default=20, help="Number of rows (default 20)")
+    stats_perf = stats_sub.add_parser(
+        "perf",
+        help="Stored per-command timing reports (span totals, p50/p95)",
+    )
+    stats_perf.add_argument("--last", type=int, default=1, help="Number of reports (default 1)")
+    stats_perf.add_argument(
+        "--command", dest="for_command", default=None, help="Only reports of this command, e.g. pipeline",
+    )
+
     return p
 
 
@@ -68,6 +240,20 @@ def main(argv: list[str] | None = None) -> int:
 
     logger.info("Command: %s", args.command)
 
+    from mailrocket import timing
+
+    timing.reset()
+    started = time.perf_counter()
+    exit_code = _dispatch(args)
+    timing.finish_report(args.command, exit_code)
+    if args.command in _EXPORTED_COMMANDS:
+        from mailrocket.metrics import export_cli_run
+
+        export_cli_run(args.command, exit_code, time.perf_counter() - started)
+    return exit_code
+
+
+def _dispatch(args: argparse.Namespace) -> int:
     try:
         if args.command == "init-db":
             from mailrocket.storage.schema import init_db
@@ -79,14 +265,14 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "scrape":
             from mailrocket.pipeline import run_scrape
 
-            n = run_scrape()
+            n = run_scrape(resume=args.resume)
             print(f"Scraped and inserted {n} new posts.")
             return 0
 
         if args.command == "analyze":
             from mailrocket.pipeline import run_analyze
 
-            n = run_analyze()
+            n = run_analyze(resume=args.resume)
             print(f"Analyzed {n} posts.")
             return 0
 
@@ -101,7 +287,7 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "pipeline":
             from mailrocket.pipeline import run_pipeline
 
-            new_posts, analyzed = run_pipeline()
+            new_posts, analyzed = run_pipeline(overlap=args.overlap, resume=args.resume)
             print(f"Scraped {new_posts} posts; analyzed {analyzed}.")
             print("Run `mailrocket send` (or `make send`) when you're ready to mail.")
             return 0
@@ -109,11 +295,64 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "run-all":
             from mailrocket.pipeline import run_all
 
-            n, a, s, r = run_all(dry_run=args.dry_run)
+            n, a, s, r = run_all(dry_run=args.dry_run, overlap=args.overlap, resume=args.resume)
             label = "[dry-run] " if args.dry_run else ""
             print(f"{label}Scraped {n}, analyzed {a}, sent {s}, rejected {r}.")
             return 0
 
+        if args.command == "stats" and args.stats_command == "perf":
+            from mailrocket import timing
+            from mailrocket.storage import init_db
+            from mailrocket.storage.perf_repo import recent_perf_reports
+
+            init_db()
+            reports = recent_perf_reports(args.last, command=args.for_command)
+            if not reports:
+                print("No performance reports recorded yet.")
+            for r in reversed(reports):
+                started = datetime.fromtimestamp(r["started_at"]).strftime("%Y-%m-%d %H:%M:%S")
+                print(timing.format_report(r["summary"], title=f"#{r['report_id']} {r['command']} at {started}"))
+                print()
+            return 0
+
+        if args.command == "stats" and args.stats_command == "outbox":
+            from mailrocket.storage import init_db
+            from mailrocket.storage.outbox_repo import list_outbox, outbox_summary
+
+            init_db()
+            _print_outbox(outbox_summary(), list_outbox(args.state, args.limit))
+            return 0
+
+        if args.command == "stats" and args.stats_command == "runs":
+            from mailrocket.storage import init_db
+            from mailrocket.storage.runs_repo import list_runs
+
+            init_db()
+            _print_runs(list_runs(args.limit))
+            return 0
+
+        if args.command == "stats":
+            from mailrocket.storage import init_db
+            from mailrocket.storage.llm_calls_repo import llm_call_stats
+
+            try:
+                seconds = _parse_window(args.since)
+            except argparse.ArgumentTypeError as e:
+                print(str(e), file=sys.stderr)
+                return 2
+            init_db()
+            _print_llm_stats(llm_call_stats(seconds), args.since)
+            return 0
+
+        if args.command == "daemon":
+            from mailrocket.daemon import run_daemon
+
+            run_daemon(
+                host=args.host or settings.daemon.host,
+                port=args.port or settings.daemon.port,
+            )
+            return 0
+
         if args.command == "ui":
             from mailrocket.ui import run as run_ui
 
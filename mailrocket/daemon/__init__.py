@@ -0,0 +1,34 @@
+"""`mailrocket daemon`: scheduled scrape / analyze / send in one warm process."""
+from __future__ import annotations
+
+import logging
+import signal
+
+from mailrocket.daemon.schedule import CronSchedule, IntervalSchedule, parse_schedule
+from mailrocket.daemon.server import start_status_server
+from mailrocket.daemon.service import Daemon
+
+logger = logging.getLogger(__name__)
+
+
+def run_daemon(host: str, port: int) -> None:
+    """Run until SIGINT/SIGTERM, serving state on http://host:port/status."""
+    from mailrocket.storage import init_db
+
+    init_db()
+    daemon = Daemon()
+    server = start_status_server(daemon, host, port)
+
+    def _stop(signum: int, _frame: object) -> None:
+        logger.info("Received signal %d", signum)
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    try:
+        daemon.run_forever()
+    finally:
+        server.shutdown()
+
+
+__all__ = ["CronSchedule", "Daemon", "IntervalSchedule", "parse_schedule", "run_daemon"]
@@ -0,0 +1,116 @@
+"""When-to-run rules for daemon jobs: fixed intervals and 5-field cron.
+
+    every: 10m          interval (s/m/h/d; a bare number is seconds)
+    cron: "0 9 * * 1-5" minute hour day-of-month month day-of-week (local time)
+
+Cron fields accept `*`, `a`, `a-b`, lists `a,b` and steps `*/n`, `a-b/n`.
+Day-of-week is 0-6 with Sunday = 0 (7 is accepted as Sunday too). As in
+classic cron, when both day-of-month and day-of-week are restricted a day
+matching either one fires.
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: str | int | float) -> float:
+    """`90`, `30s`, `10m`, `2h`, `1d` -> seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _DURATION_RE.match(value)
+    if not m:
+        raise ValueError(f"invalid duration {value!r}; use e.g. 30s, 10m, 2h")
+    return float(m.group(1)) * _DURATION_UNITS[m.group(2)]
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, when: datetime) -> datetime:
+        return when + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _parse_field(field: str, lo: int, hi: int) -> set[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        base, _, step_s = part.partition("/")
+        step = int(step_s) if step_s else 1
+        if step <= 0:
+            raise ValueError(f"bad step in {field!r}")
+        if base == "*":
+            start, end = lo, hi
+        elif "-" in base:
+            a, b = base.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = int(base)
+            end = hi if step_s else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"{field!r} out of range {lo}-{hi}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expr: str) -> None:
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields, got {expr!r}")
+        self.expr = expr
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        dows = _parse_field(fields[4], 0, 7)
+        self.weekdays = {d % 7 for d in dows}
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    def _day_matches(self, d: datetime) -> bool:
+        dom = d.day in self.days
+        dow = (d.isoweekday() % 7) in self.weekdays
+        if self._dom_any or self._dow_any:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, when: datetime) -> datetime:
+        """First matching minute strictly after `when`."""
+        t = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"cron expression {self.expr!r} never fires")
+
+    def __str__(self) -> str:
+        return f"cron {self.expr}"
+
+
+def parse_schedule(job_cfg: dict) -> IntervalSchedule | CronSchedule:
+    """Build the schedule from a job's `every:` or `cron:` key."""
+    if job_cfg.get("cron"):
+        return CronSchedule(str(job_cfg["cron"]))
+    if job_cfg.get("every") is not None:
+        return IntervalSchedule(parse_duration(job_cfg["every"]))
+    raise ValueError("job needs either `every:` or `cron:`")
@@ -0,0 +1,77 @@
+"""Tiny local HTTP endpoint for the daemon (stdlib only).
+
+    GET  /status             uptime + per-job state (JSON)
+    GET  /healthz            {"ok": true}
+    GET  /metrics            Prometheus / OpenMetrics text (`mailrocket.metrics`)
+    POST /jobs/<name>/run    start a job now (202, or 409 if its stage is running)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from mailrocket import metrics
+from mailrocket.daemon.service import Daemon
+
+logger = logging.getLogger(__name__)
+
+
+def _handler_for(daemon: Daemon) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload: Any) -> None:
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path in ("/", "/status"):
+                self._send(200, daemon.status())
+            elif self.path == "/healthz":
+                self._send(200, {"ok": True})
+            elif self.path == "/metrics":
+                openmetrics = metrics.wants_openmetrics(self.headers.get("Accept"))
+                body = metrics.render(openmetrics=openmetrics).encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    metrics.OPENMETRICS_CONTENT_TYPE if openmetrics else metrics.PROMETHEUS_CONTENT_TYPE,
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 3 or parts[0] != "jobs" or parts[2] != "run":
+                self._send(404, {"error": "not found"})
+                return
+            name = parts[1]
+            if name not in daemon.jobs:
+                self._send(404, {"error": f"unknown job {name!r}"})
+                return
+            if daemon.trigger(name):
+                self._send(202, {"started": name})
+            else:
+                self._send(409, {"error": f"{name}: its stage is already running"})
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            logger.debug("status http: " + format, *args)
+
+    return Handler
+
+
+def start_status_server(daemon: Daemon, host: str, port: int) -> ThreadingHTTPServer:
+    """Serve the daemon's state on a background thread; call `.shutdown()` to stop."""
+    server = ThreadingHTTPServer((host, port), _handler_for(daemon))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="daemon-http", daemon=True).start()
+    logger.info("Daemon status at http://%s:%d/status", host, port)
+    return server
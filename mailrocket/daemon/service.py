@@ -0,0 +1,224 @@
+"""Long-running process that runs the pipeline stages on a schedule.
+
+One warm process replaces cron + `make pipeline`: settings, litellm, the
+prompt and schema caches and the model health stats are loaded once and
+reused by every run. Each job (`daemon.jobs` in config.yaml) runs on its
+own thread when due. Runs are serialised per stage, not per job: a job
+whose stage is still running (under any job name; `pipeline` occupies
+both scrape and analyze) is skipped, so two runs never share a Chrome
+profile or an analyze backlog. Each run gets a performance report in
+`perf_reports` (command `daemon:<job>`); runs that overlap share one.
+State is served as JSON by `mailrocket.daemon.server`.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from mailrocket import timing
+from mailrocket.daemon.schedule import CronSchedule, IntervalSchedule, parse_schedule
+from mailrocket.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Stages a job occupies while it runs; anything not listed occupies itself.
+_STAGE_SCOPE = {"pipeline": ("scrape", "analyze")}
+
+
+def _occupied_stages(stage: str) -> tuple[str, ...]:
+    return _STAGE_SCOPE.get(stage, (stage,))
+
+
+def _stage_runner(stage: str, cfg: dict) -> Callable[[], Any]:
+    from mailrocket import pipeline
+
+    resume = bool(cfg.get("resume", False))
+    if stage == "scrape":
+        return lambda: pipeline.run_scrape(resume=resume)
+    if stage == "analyze":
+        return lambda: pipeline.run_analyze(resume=resume)
+    if stage == "send":
+        dry_run = bool(cfg.get("dry_run", False))
+        return lambda: pipeline.run_send(dry_run=dry_run)
+    if stage == "pipeline":
+        overlap = cfg.get("overlap")
+        return lambda: pipeline.run_pipeline(overlap=overlap, resume=resume)
+    raise ValueError(f"Unknown daemon job stage: {stage!r}")
+
+
+@dataclass
+class Job:
+    name: str
+    stage: str
+    schedule: IntervalSchedule | CronSchedule
+    run: Callable[[], Any]
+    next_run: datetime
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped_overlaps: int = 0
+    last_started: datetime | None = None
+    last_finished: datetime | None = None
+    last_duration_s: float | None = None
+    last_result: Any = None
+    last_error: str | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        def iso(d: datetime | None) -> str | None:
+            return d.isoformat(timespec="seconds") if d else None
+
+        return {
+            "stage": self.stage,
+            "schedule": str(self.schedule),
+            "running": self.running,
+            "next_run": iso(self.next_run),
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_overlaps": self.skipped_overlaps,
+            "last_started": iso(self.last_started),
+            "last_finished": iso(self.last_finished),
+            "last_duration_s": self.last_duration_s,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class Daemon:
+    def __init__(self, jobs_cfg: dict[str, dict] | None = None) -> None:
+        jobs_cfg = settings.daemon.jobs if jobs_cfg is None else jobs_cfg
+        now = datetime.now()
+        self.started_at = now
+        self.jobs: dict[str, Job] = {}
+        for name, cfg in jobs_cfg.items():
+            cfg = cfg or {}
+            if cfg.get("enabled", True) is False:
+                continue
+            schedule = parse_schedule(cfg)
+            stage = cfg.get("stage", name)
+            self.jobs[name] = Job(
+                name=name,
+                stage=stage,
+                schedule=schedule,
+                run=_stage_runner(stage, cfg),
+                next_run=now if cfg.get("run_on_start") else schedule.next_after(now),
+            )
+        self._stage_locks = {
+            stage: threading.Lock() for job in self.jobs.values() for stage in _occupied_stages(job.stage)
+        }
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        # Timing is process-global: the report covers every job since the first
+        # of the currently running ones started.
+        self._perf_lock = threading.Lock()
+        self._perf_running = 0
+        self._perf_jobs: list[str] = []
+        self._perf_failed = False
+
+    # -- control -------------------------------------------------------------
+
+    def trigger(self, name: str) -> bool:
+        """Start job `name` now. False if a job on any of its stages is running."""
+        job = self.jobs[name]
+        held: list[threading.Lock] = []
+        for stage in sorted(_occupied_stages(job.stage)):
+            lock = self._stage_locks[stage]
+            if not lock.acquire(blocking=False):
+                for acquired in held:
+                    acquired.release()
+                job.skipped_overlaps += 1
+                logger.warning("Job %s: stage %s is still running; skipping this run", name, stage)
+                return False
+            held.append(lock)
+        job.running = True
+        t = threading.Thread(target=self._run_job, args=(job, held), name=f"job-{name}", daemon=True)
+        self._threads = [th for th in self._threads if th.is_alive()] + [t]
+        t.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run_job(self, job: Job, locks: list[threading.Lock]) -> None:
+        with self._perf_lock:
+            if self._perf_running == 0:
+                timing.reset()
+                self._perf_jobs, self._perf_failed = [], False
+            self._perf_running += 1
+            if job.name not in self._perf_jobs:
+                self._perf_jobs.append(job.name)
+        job.last_started = datetime.now()
+        start = time.perf_counter()
+        logger.info("Job %s started", job.name)
+        try:
+            result = job.run()
+            job.last_result = list(result) if isinstance(result, tuple) else result
+            job.last_error = None
+            logger.info("Job %s finished: %s", job.name, job.last_result)
+        except Exception as e:
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            logger.error("Job %s failed: %s", job.name, "".join(traceback.format_exception(e)))
+        finally:
+            job.runs += 1
+            job.last_duration_s = round(time.perf_counter() - start, 3)
+            job.last_finished = datetime.now()
+            job.running = False
+            for lock in locks:
+                lock.release()
+            self._finish_perf_report(failed=job.last_error is not None)
+
+    def _finish_perf_report(self, failed: bool) -> None:
+        with self._perf_lock:
+            self._perf_running -= 1
+            self._perf_failed = self._perf_failed or failed
+            if self._perf_running == 0:
+                timing.finish_report("daemon:" + "+".join(self._perf_jobs), 1 if self._perf_failed else 0)
+
+    # -- loop ----------------------------------------------------------------
+
+    def run_forever(self, shutdown_grace_seconds: float = 30.0) -> None:
+        if not self.jobs:
+            logger.warning("No daemon jobs configured (config.yaml -> daemon.jobs)")
+        for job in self.jobs.values():
+            logger.info("Job %s: %s, next run %s", job.name, job.schedule, job.next_run.isoformat(timespec="seconds"))
+        if any(j.stage in ("analyze", "pipeline") for j in self.jobs.values()):
+            threading.Thread(target=_warm_llm_client, name="warm-llm", daemon=True).start()
+
+        while not self._stop.is_set():
+            now = datetime.now()
+            for job in self.jobs.values():
+                if job.next_run <= now:
+                    # Schedule from now, not from the missed slot: no catch-up bursts.
+                    job.next_run = job.schedule.next_after(now)
+                    self.trigger(job.name)
+            wake = min((j.next_run for j in self.jobs.values()), default=None)
+            timeout = 60.0 if wake is None else max(0.5, (wake - datetime.now()).total_seconds())
+            self._stop.wait(min(timeout, 60.0))
+
+        logger.info("Daemon stopping; waiting up to %.0fs for running jobs", shutdown_grace_seconds)
+        deadline = time.monotonic() + shutdown_grace_seconds
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "uptime_s": round((datetime.now() - self.started_at).total_seconds()),
+            "jobs": {name: job.snapshot() for name, job in self.jobs.items()},
+        }
+
+
+def _warm_llm_client() -> None:
+    """Pay the litellm import once, at startup, instead of in the first analyze run."""
+    try:
+        from mailrocket.analyzer.llm import _init_litellm
+
+        _init_litellm()
+    except Exception:
+        logger.warning("Could not preload the LLM client", exc_info=True)
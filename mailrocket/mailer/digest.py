@@ -0,0 +1,109 @@
+"""Self-review digest: one summary of a whole send run instead of a copy per email.
+
+With `email.self_review_mode: digest`, `run_send` collects a `ReviewEntry`
+for every draft that went out. At the end of the run it mails one
+plain-text summary to `email.self_review_mail` and, if
+`email.self_review_report_dir` is set, writes the same summary as an HTML
+file there.
+"""
+from __future__ import annotations
+
+import html
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from mailrocket import timing
+from mailrocket.mailer.transport import Transport
+from mailrocket.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReviewEntry:
+    analysis_id: int
+    subject: str
+    company_name: str
+    post_link: str
+    model_name: str
+    sent_to: list[str] = field(default_factory=list)
+    not_sent: list[str] = field(default_factory=list)
+
+
+def _title(entries: list[ReviewEntry], when: datetime) -> str:
+    return f"MailRocket: {len(entries)} application(s) sent {when:%Y-%m-%d %H:%M}"
+
+
+def format_text(entries: list[ReviewEntry], when: datetime) -> tuple[str, str]:
+    """(subject, body) of the digest email."""
+    lines = [_title(entries, when), ""]
+    for i, e in enumerate(entries, 1):
+        lines.append(f"{i}. {e.subject}")
+        if e.company_name:
+            lines.append(f"   Company: {e.company_name}")
+        lines.append(f"   Sent to: {', '.join(e.sent_to)}")
+        if e.not_sent:
+            lines.append(f"   Not sent: {', '.join(e.not_sent)}")
+        lines.append(f"   Post: {e.post_link or '-'}")
+        lines.append(f"   Model: {e.model_name or 'N/A'}")
+        lines.append("")
+    return _title(entries, when), "\n".join(lines)
+
+
+def _link(url: str) -> str:
+    return f'<a href="{html.escape(url)}">post</a>' if url else "-"
+
+
+def render_html(entries: list[ReviewEntry], when: datetime) -> str:
+    rows = "\n".join(
+        "<tr>"
+        f"<td>{e.analysis_id}</td>"
+        f"<td>{html.escape(e.subject)}</td>"
+        f"<td>{html.escape(e.company_name or '')}</td>"
+        f"<td>{html.escape(', '.join(e.sent_to))}</td>"
+        f"<td>{html.escape(', '.join(e.not_sent))}</td>"
+        f"<td>{_link(e.post_link)}</td>"
+        f"<td>{html.escape(e.model_name or 'N/A')}</td>"
+        "</tr>"
+        for e in entries
+    )
+    title = html.escape(_title(entries, when))
+    return (
+        "<!doctype html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title>"
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left;vertical-align:top}</style>"
+        f"</head><body><h1>{title}</h1>\n<table>\n"
+        "<tr><th>ID</th><th>Subject</th><th>Company</th><th>Sent to</th><th>Not sent</th>"
+        "<th>Post</th><th>Model</th></tr>\n"
+        f"{rows}\n</table></body></html>\n"
+    )
+
+
+def deliver_digest(entries: list[ReviewEntry], transport: Transport) -> None:
+    """Mail the digest and/or write the HTML report, as configured. Never raises."""
+    if not entries:
+        return
+    when = datetime.now()
+    report_dir = settings.email.self_review_report_dir
+    if report_dir is not None:
+        try:
+            report_dir.mkdir(parents=True, exist_ok=True)
+            path = report_dir / f"send-{when:%Y%m%d-%H%M%S}.html"
+            n = 1
+            while path.exists():
+                n += 1
+                path = report_dir / f"send-{when:%Y%m%d-%H%M%S}-{n}.html"
+            path.write_text(render_html(entries, when), encoding="utf-8")
+            logger.info("Self-review report written to %s", path)
+        except OSError:
+            logger.exception("Could not write self-review report to %s", report_dir)
+    if settings.email.self_review_mail:
+        subject, body = format_text(entries, when)
+        try:
+            with timing.span("send.self_review"):
+                transport.send(subject, body, settings.email.self_review_mail, settings.email.from_mail)
+            logger.info("Self-review digest (%d drafts) sent to %s", len(entries), settings.email.self_review_mail)
+        except Exception:
+            logger.exception("Failed to send self-review digest")
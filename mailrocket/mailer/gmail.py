@@ -1,27 +1,47 @@
-"""Gmail API wrapper. Reads OAuth credentials from settings.secrets paths."""
+"""Gmail API wrapper. Reads OAuth credentials from settings.secrets paths.
+
+The Google client libraries are imported on first send, so `send --dry-run`
+and other non-sending commands start without them. `GmailClient` keeps the
+credentials and the built service for every later send in the process.
+"""
 from __future__ import annotations
 
 import base64
+import json
 import logging
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import socket
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-
+from mailrocket import timing
+from mailrocket.mailer.mime import build_mime_bytes
+from mailrocket.mailer.ratelimit import TokenBucket, gmail_limiter
+from mailrocket.mailer.transport import DeliveryUnknown, Transport
 from mailrocket.settings import settings
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
 logger = logging.getLogger(__name__)
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 
 
+def _save_token(creds: Credentials) -> None:
+    token_path = settings.secrets.gmail_token_path
+    token_path.parent.mkdir(parents=True, exist_ok=True)
+    with token_path.open("w", encoding="utf-8") as f:
+        f.write(creds.to_json())
+
+
 def get_gmail_credentials() -> Credentials:
     """Load OAuth credentials, refreshing or running the flow as needed."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     client_secret_path = settings.secrets.gmail_client_secret_path
     token_path = settings.secrets.gmail_token_path
 
@@ -40,14 +60,200 @@ def get_gmail_credentials() -> Credentials:
                 )
             flow = InstalledAppFlow.from_client_secrets_file(str(client_secret_path), SCOPES)
             creds = flow.run_local_server(port=0)
-
-        token_path.parent.mkdir(parents=True, exist_ok=True)
-        with token_path.open("w", encoding="utf-8") as f:
-            f.write(creds.to_json())
+        _save_token(creds)
 
     return creds
 
 
+def build_message(
+    subject: str,
+    body: str,
+    to_email: str,
+    from_email: str,
+    pdf_file_path: Path | str | None = None,
+) -> dict:
+    """The Gmail API `body` for a plaintext (optionally PDF-attached) email."""
+    raw = build_mime_bytes(subject, body, to_email, from_email, pdf_file_path)
+    return {"raw": base64.urlsafe_b64encode(raw).decode()}
+
+
+_RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for Gmail's 429 and 403 rate-limit errors (worth retrying later)."""
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None)
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    try:
+        errors = json.loads(exc.content)["error"].get("errors", [])  # type: ignore[attr-defined]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return False
+    return any(e.get("reason") in _RATE_LIMIT_REASONS for e in errors)
+
+
+def is_rate_limited_result(result: Any) -> bool:
+    return isinstance(result, BaseException) and is_rate_limited(result)
+
+
+def _never_connected(exc: BaseException) -> bool:
+    # ServerNotFoundError is httplib2's DNS failure (not imported here).
+    return isinstance(exc, (ConnectionRefusedError, socket.gaierror)) or type(exc).__name__ == "ServerNotFoundError"
+
+
+def _may_have_sent(exc: BaseException) -> bool:
+    """A 5xx reply, or the connection dropping or timing out mid-request:
+    Gmail may have accepted the message anyway."""
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is not None:
+        return int(status) >= 500
+    return isinstance(exc, OSError) and not _never_connected(exc)
+
+
+def _as_delivery_unknown(exc: BaseException) -> BaseException:
+    return DeliveryUnknown(f"{type(exc).__name__}: {exc}") if _may_have_sent(exc) else exc
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits and failures to reach Gmail at all: certainly not sent, may work later.
+
+    Failures after Gmail may have accepted the message surface as
+    `DeliveryUnknown` and are never retried.
+    """
+    return is_rate_limited(exc) or _never_connected(exc)
+
+
+class GmailClient(Transport):
+    """Credentials + built Gmail service, created on first send and reused.
+
+    The service is built from the discovery document bundled with
+    google-api-python-client (`static_discovery=True`), so no discovery
+    request is made. The token is refreshed, and `token.json` rewritten,
+    only once it has actually expired. Every send takes a token from
+    `limiter` (default: the `send.rate_per_second` bucket).
+
+    httplib2 connections are not thread-safe, so each thread that sends
+    gets its own service; the credentials are shared.
+    """
+
+    name = "gmail"
+
+    def __init__(self, limiter: TokenBucket | None = None) -> None:
+        self._creds: Credentials | None = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.limiter = limiter or gmail_limiter()
+
+    def _ensure_service(self):
+        with self._lock:
+            if self._creds is None:
+                with timing.span("send.gmail_auth"):
+                    self._creds = get_gmail_credentials()
+            elif not self._creds.valid:
+                from google.auth.transport.requests import Request
+
+                with timing.span("send.gmail_auth"):
+                    self._creds.refresh(Request())
+                    _save_token(self._creds)
+                logger.info("Refreshed Gmail access token")
+
+        service = getattr(self._local, "service", None)
+        if service is None:
+            from googleapiclient.discovery import build
+
+            with timing.span("send.gmail_build"):
+                service = self._local.service = build(
+                    "gmail", "v1", credentials=self._creds, static_discovery=True, cache_discovery=False,
+                )
+        return service
+
+    def send(
+        self,
+        subject: str,
+        body: str,
+        to_email: str,
+        from_email: str,
+        pdf_file_path: Path | str | None = None,
+    ) -> dict:
+        """Send one email; same arguments as `send_email_via_gmail_api`."""
+        service = self._ensure_service()
+        message = build_message(subject, body, to_email, from_email, pdf_file_path)
+        self.limiter.acquire()
+        with timing.span("send.gmail_api"):
+            try:
+                return service.users().messages().send(userId="me", body=message).execute()
+            except Exception as e:
+                if _may_have_sent(e):
+                    raise DeliveryUnknown(f"{type(e).__name__}: {e}") from e
+                raise
+
+    def send_batch(
+        self,
+        messages: list[tuple[str, dict]],
+        batch_size: int | None = None,
+        rate_limit_retries: int | None = None,
+    ) -> dict[str, Any]:
+        """Send `(request_id, build_message(...))` pairs in Gmail batch requests.
+
+        Returns {request_id: API response dict, or the exception for that
+        message}; `DeliveryUnknown` where Gmail may have accepted it anyway.
+        Gmail charges each message in a batch against the per-second quota,
+        so while the limiter is on a request carries at most its burst of
+        messages and the batches are paced by it. Messages rejected for rate
+        limiting are retried, with backoff, up to `send.rate_limit_retries`
+        times.
+        """
+        service = self._ensure_service()
+        batch_size = batch_size or settings.send.batch_size
+        if self.limiter.rate > 0:
+            batch_size = min(batch_size, max(1, int(self.limiter.burst)))
+        retries = settings.send.rate_limit_retries if rate_limit_retries is None else rate_limit_retries
+        results: dict[str, Any] = {}
+        todo = list(messages)
+
+        for attempt in range(retries + 1):
+            for i in range(0, len(todo), batch_size):
+                chunk = todo[i:i + batch_size]
+
+                def on_response(request_id: str, response: Any, exception: Exception | None) -> None:
+                    results[request_id] = _as_delivery_unknown(exception) if exception is not None else response
+
+                batch = service.new_batch_http_request(callback=on_response)
+                for request_id, body in chunk:
+                    batch.add(service.users().messages().send(userId="me", body=body), request_id=request_id)
+                self.limiter.acquire(len(chunk))
+                try:
+                    with timing.span("send.gmail_batch"):
+                        batch.execute()
+                except Exception as e:
+                    # The whole HTTP batch failed (network, auth): every message in it failed.
+                    for request_id, _ in chunk:
+                        results.setdefault(request_id, _as_delivery_unknown(e))
+                timing.incr("send.gmail_batches")
+
+            todo = [(rid, body) for rid, body in todo if is_rate_limited_result(results.get(rid))]
+            if not todo or attempt == retries:
+                break
+            delay = 2 ** attempt * 5
+            logger.warning("%d message(s) rate-limited by Gmail; retrying in %ds", len(todo), delay)
+            time.sleep(delay)
+        return results
+
+
+_DEFAULT_CLIENT: GmailClient | None = None
+
+
+def default_client() -> GmailClient:
+    """Process-wide client used when callers don't bring their own."""
+    global _DEFAULT_CLIENT
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = GmailClient()
+    return _DEFAULT_CLIENT
+
+
 def send_email_via_gmail_api(
     subject: str,
     body: str,
@@ -56,33 +262,4 @@ def send_email_via_gmail_api(
     pdf_file_path: Path | str | None = None,
 ) -> dict:
     """Send a plaintext (optionally PDF-attached) email through the Gmail API."""
-    creds = get_gmail_credentials()
-    service = build("gmail", "v1", credentials=creds)
-
-    if pdf_file_path:
-        pdf_path = Path(pdf_file_path)
-        if not pdf_path.exists():
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-
-        message = MIMEMultipart()
-        message["to"] = to_email
-        message["subject"] = subject
-        if from_email:
-            message["From"] = from_email
-        message.attach(MIMEText(body, "plain"))
-
-        with pdf_path.open("rb") as pdf_file:
-            attachment = MIMEApplication(pdf_file.read(), _subtype="pdf")
-            attachment.add_header(
-                "Content-Disposition", f'attachment; filename="{pdf_path.name}"'
-            )
-            message.attach(attachment)
-    else:
-        message = MIMEText(body)
-        message["to"] = to_email
-        message["subject"] = subject
-        if from_email:
-            message["From"] = from_email
-
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-    return service.users().messages().send(userId="me", body={"raw": raw}).execute()
+    return default_client().send(subject, body, to_email, from_email, pdf_file_path)
@@ -0,0 +1,95 @@
+"""RFC 5322 message bytes for outgoing mail, with the resume attachment cached.
+
+Base64-encoding the resume PDF and serialising it dominated send-stage CPU
+when it was redone for every recipient. The attachment part is now encoded
+once and kept (keyed by path, mtime and size, so replacing the file picks up
+the new one). Each message is then the small multipart head (headers + text
+part) from the `email` package with the cached part spliced in before the
+closing boundary.
+
+The text part goes through `EmailMessage.set_content`, which picks 7bit
+only when every line fits the 998-byte SMTP limit (RFC 5321) and
+quoted-printable or base64 otherwise; drafts are often one long line per
+paragraph.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import uuid
+from email.message import EmailMessage
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from pathlib import Path
+
+from mailrocket import timing
+
+logger = logging.getLogger(__name__)
+
+_CACHE_LOCK = threading.Lock()
+_ATTACHMENTS: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+# Fixed per process so the cached part can be spliced into any message.
+_BOUNDARY = f"===============mailrocket-{uuid.uuid4().hex}=="
+
+
+def _attachment_part(pdf_path: Path) -> bytes:
+    """Serialised MIME part for `pdf_path`, re-encoded only when the file changes."""
+    try:
+        st = os.stat(pdf_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}") from None
+    key, version = str(pdf_path), (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        cached = _ATTACHMENTS.get(key)
+    if cached is not None and cached[0] == version:
+        timing.incr("send.attachment_cache_hits")
+        return cached[1]
+
+    with timing.span("send.attachment_encode"):
+        part = MIMEApplication(pdf_path.read_bytes(), _subtype="pdf")
+        part.add_header("Content-Disposition", f'attachment; filename="{pdf_path.name}"')
+        encoded = part.as_bytes()
+    with _CACHE_LOCK:
+        _ATTACHMENTS[key] = (version, encoded)
+    logger.info("Encoded attachment %s (%d KB)", pdf_path.name, len(encoded) // 1024)
+    return encoded
+
+
+def _text_part(body: str) -> EmailMessage:
+    part = EmailMessage()
+    part.set_content(body)
+    return part
+
+
+def build_mime_bytes(
+    subject: str,
+    body: str,
+    to_email: str,
+    from_email: str,
+    pdf_file_path: Path | str | None = None,
+) -> bytes:
+    """A plaintext email, optionally with the PDF attached, as bytes."""
+    with timing.span("send.build_message"):
+        if not pdf_file_path:
+            message = _text_part(body)
+            message["to"] = to_email
+            message["subject"] = subject
+            if from_email:
+                message["From"] = from_email
+            return message.as_bytes()
+
+        attachment = _attachment_part(Path(pdf_file_path))
+        boundary = _BOUNDARY if _BOUNDARY not in body else f"===============mailrocket-{uuid.uuid4().hex}=="
+        message = MIMEMultipart(boundary=boundary)
+        message["to"] = to_email
+        message["subject"] = subject
+        if from_email:
+            message["From"] = from_email
+        message.attach(_text_part(body))
+
+        head = message.as_bytes()
+        close = f"--{boundary}--".encode()
+        cut = head.rindex(close)
+        return head[:cut] + f"--{boundary}\n".encode() + attachment + b"\n" + head[cut:]
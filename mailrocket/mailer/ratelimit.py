@@ -0,0 +1,74 @@
+"""Token-bucket rate limiter for outgoing mail.
+
+Gmail meters the API per user: 250 quota units per second, and
+`messages.send` costs 100 units, so 2.5 sends/s is the ceiling (batched
+requests are still charged per message). `send.rate_per_second` and
+`send.burst` set the bucket; every send, single or in a batch, takes one
+token. In `concurrent` mode each recipient domain also has its own bucket
+(`send.domain_rate_per_minute`), so one company never gets a burst.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from mailrocket import timing
+from mailrocket.settings import settings
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float, span: str = "send.rate_limit_wait") -> None:
+        """`rate_per_second <= 0` disables limiting. Waits are timed as `span`."""
+        self.rate = rate_per_second
+        self.span = span
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int = 1) -> float:
+        """Take `n` tokens, sleeping until they are available. Returns seconds waited.
+
+        Tokens are reserved before sleeping (the balance may go negative), so
+        concurrent callers queue up fairly instead of racing for refills.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            with timing.span(self.span):
+                time.sleep(wait)
+        return wait
+
+
+def gmail_limiter() -> TokenBucket:
+    return TokenBucket(settings.send.rate_per_second, settings.send.burst)
+
+
+class KeyedBuckets:
+    """One `TokenBucket` per key (e.g. recipient domain), created on first use."""
+
+    def __init__(self, rate_per_second: float, burst: float, span: str) -> None:
+        self.rate = rate_per_second
+        self.burst = burst
+        self.span = span
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, n: int = 1) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, self.span)
+        return bucket.acquire(n)
+
+
+def domain_limiter() -> KeyedBuckets:
+    return KeyedBuckets(settings.send.domain_rate_per_minute / 60, settings.send.domain_burst, "send.domain_wait")
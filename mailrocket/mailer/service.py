@@ -1,13 +1,33 @@
-"""Mailer orchestration: decide -> send -> log -> bookkeeping."""
+"""Mailer orchestration: decide -> send -> log -> bookkeeping.
+
+`decide_and_send_email` decides on and sends one draft (used for dry runs).
+Real sends go through the outbox (`storage/outbox_repo.py`). The pipeline
+turns each prepared draft into `Delivery`s, one per outbox row, and
+`send_deliveries` sends them one by one (`send.mode: sequential`), in
+Gmail batch requests (`batch`) or from a thread pool (`concurrent`). Each
+row is claimed right before its API call and its result is written back
+right after, so no recipient is mailed twice. Messages leave through the
+configured transport (`mailer/transport.py`: Gmail, SMTP or a Maildir).
+Pacing comes from the transport's token bucket and the per-domain buckets
+(`mailer/ratelimit.py`).
+"""
 from __future__ import annotations
 
 import logging
 import time
-from typing import Callable
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
+from mailrocket import metrics, timing
 from mailrocket.mailer.decisions import should_send_email
-from mailrocket.mailer.gmail import send_email_via_gmail_api
+from mailrocket.mailer.gmail import build_message, is_rate_limited
+from mailrocket.mailer.ratelimit import KeyedBuckets, domain_limiter
+from mailrocket.mailer.transport import DeliveryUnknown, Transport, get_transport, is_retryable
 from mailrocket.settings import settings
+from mailrocket.storage import outbox_repo
 
 logger = logging.getLogger(__name__)
 
@@ -15,65 +35,256 @@ logger = logging.getLogger(__name__)
 SendFunc = Callable[..., dict]
 
 
-def decide_and_send_email(
-    job_data: dict,
-    job_post: dict,
-    *,
-    send_func: SendFunc | None = None,
-    dry_run: bool = False,
-) -> tuple[bool, str]:
-    """Decide whether to send the prepared draft for `job_data`, then send it.
+@dataclass
+class PreparedEmail:
+    """A draft that passed `should_send_email`, ready to go out."""
 
-    Returns (sent, reason). `sent` is True only if at least one email actually
-    went out (or would have gone out, in dry-run mode).
-    """
-    send_func = send_func or send_email_via_gmail_api
+    subject: str
+    body: str
+    recipients: list[str]
+    from_mail: str
+    pdf_path: Path | None
+    review_body: str | None = None  # self-review copy, sent once a recipient succeeds
+    post_link: str = ""
+    model_name: str = ""
+    company_name: str = ""
+
+
+@dataclass
+class Delivery:
+    """One outbox row to send: a draft to one recipient, or its self-review copy."""
 
+    outbox_id: int
+    analysis_id: int
+    to: str
+    email: PreparedEmail
+    review: bool = False
+
+    @property
+    def body(self) -> str:
+        return self.email.review_body if self.review and self.email.review_body else self.email.body
+
+
+def prepare_email(job_data: dict, job_post: dict) -> tuple[PreparedEmail | None, str]:
+    """Apply the send rules to `job_data`. Returns (email, "") or (None, skip reason)."""
     ok, reason = should_send_email(job_data)
     if not ok:
         logger.info("Skip post=%s reason=%s", job_post.get("post_link"), reason)
-        return False, reason
+        return None, reason
 
     subject = job_data["message_content"]["subject"]
     body = job_data["message_content"]["body"]
     contact_emails = job_data["contact_email"]
-    from_mail = settings.email.from_mail
     pdf_path = settings.paths.resume_pdf if settings.paths.resume_pdf and settings.paths.resume_pdf.exists() else None
 
+    review_body = None
+    if settings.email.self_review_mail and settings.email.self_review_mode == "per_message":
+        review_body = (
+            body
+            + "\n\nMail Sent to "
+            + ", ".join(contact_emails)
+            + f".\nJob Post URL: {job_post.get('post_link', '')}\n"
+            f"AI Model Used: {job_data.get('model_name', 'N/A')}\n"
+        )
+
     logger.info(
         "Drafted email subject=%r recipients=%d post=%s",
         subject, len(contact_emails), job_post.get("post_link"),
     )
+    return PreparedEmail(
+        subject, body, list(contact_emails), settings.email.from_mail, pdf_path, review_body,
+        post_link=job_post.get("post_link") or "",
+        model_name=job_data.get("model_name") or "",
+        company_name=job_data.get("company_name") or "",
+    ), ""
+
+
+def decide_and_send_email(
+    job_data: dict,
+    job_post: dict,
+    *,
+    send_func: SendFunc | None = None,
+    dry_run: bool = False,
+) -> tuple[bool, str]:
+    """Decide whether to send the prepared draft for `job_data`, then send it.
+
+    Returns (sent, reason). `sent` is True only if at least one email actually
+    went out (or would have gone out, in dry-run mode).
+    """
+    send_func = send_func or get_transport().send
+
+    email, reason = prepare_email(job_data, job_post)
+    if email is None:
+        return False, reason
 
     if dry_run:
-        logger.info("[dry-run] Would send to %s from %s", contact_emails, from_mail)
-        return True, f"dry-run: would send to {len(contact_emails)} recipients"
+        logger.info("[dry-run] Would send to %s from %s", email.recipients, email.from_mail)
+        return True, f"dry-run: would send to {len(email.recipients)} recipients"
 
     sent_count = 0
-    for email in contact_emails:
+    for to in email.recipients:
         try:
-            send_func(subject, body, email, from_mail, pdf_file_path=pdf_path)
+            with timing.span("send.recipient"):
+                send_func(email.subject, email.body, to, email.from_mail, pdf_file_path=email.pdf_path)
             sent_count += 1
-            logger.info("Sent to %s", email)
+            timing.incr("send.recipients_sent")
+            logger.info("Sent to %s", to)
         except Exception:
-            logger.exception("Failed to send to %s", email)
+            timing.incr("send.recipients_failed")
+            metrics.SEND_FAILURES.inc()
+            logger.exception("Failed to send to %s", to)
 
     if sent_count == 0:
         return False, "All recipients failed"
 
-    if settings.email.self_review_mail:
-        review_body = (
-            body
-            + "\n\nMail Sent to "
-            + ", ".join(contact_emails)
-            + f".\nJob Post URL: {job_post.get('post_link', '')}\n"
-            f"AI Model Used: {job_data.get('model_name', 'N/A')}\n"
-        )
+    if email.review_body is not None:
         try:
-            send_func(subject, review_body, settings.email.self_review_mail, from_mail, pdf_file_path=pdf_path)
+            with timing.span("send.self_review"):
+                send_func(
+                    email.subject, email.review_body, settings.email.self_review_mail,
+                    email.from_mail, pdf_file_path=email.pdf_path,
+                )
             logger.info("Self-review copy sent to %s", settings.email.self_review_mail)
         except Exception:
             logger.exception("Failed to send self-review copy")
 
-    time.sleep(2)
-    return True, f"Sent to {sent_count}/{len(contact_emails)} recipients"
+    return True, f"Sent to {sent_count}/{len(email.recipients)} recipients"
+
+
+def _recipient_domain(address: str) -> str:
+    return address.rsplit("@", 1)[-1].strip().lower()
+
+
+def _record(d: Delivery, result: Any) -> None:
+    """Write one send's result (API response or exception) to its outbox row."""
+    if not isinstance(result, BaseException):
+        with timing.span("send.db_write"):
+            outbox_repo.mark_sent(d.outbox_id, (result or {}).get("id"))
+        timing.incr("send.recipients_sent")
+        logger.info("Sent analysis_id=%s to %s", d.analysis_id, d.to)
+        return
+    error = f"{type(result).__name__}: {result}"
+    if isinstance(result, DeliveryUnknown):
+        with timing.span("send.db_write"):
+            outbox_repo.mark_unknown(d.outbox_id, error)
+        timing.incr("send.recipients_unknown")
+        logger.warning(
+            "Sending analysis_id=%s to %s may have succeeded; not retrying (outbox row %s is 'unknown'): %s",
+            d.analysis_id, d.to, d.outbox_id, error,
+        )
+        return
+    with timing.span("send.db_write"):
+        state = outbox_repo.mark_failed(d.outbox_id, error, is_retryable(result), settings.send.max_attempts)
+    if state == "pending":
+        timing.incr("send.recipients_deferred")
+        logger.warning("Could not send analysis_id=%s to %s (will retry): %s", d.analysis_id, d.to, error)
+    else:
+        timing.incr("send.recipients_failed")
+        metrics.SEND_FAILURES.inc()
+        logger.warning("Failed to send analysis_id=%s to %s: %s", d.analysis_id, d.to, error)
+
+
+def _send_one(client: Transport, d: Delivery, domains: KeyedBuckets | None = None) -> None:
+    """Claim `d`, send it (retrying Gmail rate limits) and record the result."""
+    with timing.span("send.db_write"):
+        if not outbox_repo.claim(d.outbox_id):
+            logger.info("Outbox row %s already taken; skipping %s", d.outbox_id, d.to)
+            return
+    retries = settings.send.rate_limit_retries
+    result: Any = None
+    for attempt in range(retries + 1):
+        if domains is not None:
+            domains.acquire(_recipient_domain(d.to))
+        try:
+            with timing.span("send.self_review" if d.review else "send.recipient"):
+                result = client.send(d.email.subject, d.body, d.to, d.email.from_mail, pdf_file_path=d.email.pdf_path)
+            break
+        except Exception as e:
+            result = e
+            if not is_rate_limited(e) or attempt == retries:
+                break
+            delay = 2 ** attempt * 5
+            logger.warning("Rate-limited sending to %s; retrying in %ds", d.to, delay)
+            time.sleep(delay)
+    _record(d, result)
+
+
+def _send_batched(deliveries: list[Delivery], client: Transport) -> None:
+    """Gmail batch requests of `send.batch_size`; each chunk is claimed just before it goes out."""
+    size = settings.send.batch_size
+    for i in range(0, len(deliveries), size):
+        chunk: list[Delivery] = []
+        messages: list[tuple[str, dict]] = []
+        for d in deliveries[i:i + size]:
+            try:
+                message = build_message(d.email.subject, d.body, d.to, d.email.from_mail, d.email.pdf_path)
+            except Exception as e:
+                if outbox_repo.claim(d.outbox_id):
+                    _record(d, e)
+                continue
+            with timing.span("send.db_write"):
+                if not outbox_repo.claim(d.outbox_id):
+                    continue
+            chunk.append(d)
+            messages.append((str(d.outbox_id), message))
+        if not chunk:
+            continue
+        results = client.send_batch(messages, batch_size=size)
+        for d in chunk:
+            _record(d, results.get(str(d.outbox_id), DeliveryUnknown("no response in batch")))
+
+
+def _interleave_by_domain(deliveries: list[Delivery]) -> list[Delivery]:
+    """Reorder deliveries round-robin across recipient domains.
+
+    Keeps several recipients at one domain from occupying every worker
+    while they wait on that domain's bucket.
+    """
+    by_domain: dict[str, list[Delivery]] = {}
+    for d in deliveries:
+        by_domain.setdefault(_recipient_domain(d.to), []).append(d)
+    queues = list(by_domain.values())
+    out: list[Delivery] = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        out += [q[i] for q in queues if i < len(q)]
+    return out
+
+
+def _send_concurrently(deliveries: list[Delivery], client: Transport, order: list[int]) -> Iterator[int]:
+    """Send from `send.concurrency` threads, each recipient domain under its own bucket."""
+    domains = domain_limiter()
+    with ThreadPoolExecutor(max_workers=settings.send.concurrency, thread_name_prefix="send") as pool:
+        futures: dict[int, list[Future]] = {}
+        for d in _interleave_by_domain(deliveries):
+            futures.setdefault(d.analysis_id, []).append(pool.submit(_send_one, client, d, domains))
+        for analysis_id in order:
+            for future in futures[analysis_id]:
+                future.result()
+            yield analysis_id
+
+
+def send_deliveries(deliveries: list[Delivery], client: Transport, mode: str | None = None) -> Iterator[int]:
+    """Send `deliveries` the `send.mode` way, recording each result in the outbox.
+
+    Yields each analysis_id, in the order the deliveries were given, once all
+    of its deliveries are done. The caller can finalize drafts in order
+    while later ones are still sending (concurrent mode).
+    """
+    mode = mode or settings.send.mode
+    if mode == "batch" and not hasattr(client, "send_batch"):
+        logger.info("The %s transport has no batch API; sending one by one", client.name)
+        mode = "sequential"
+    order = list(dict.fromkeys(d.analysis_id for d in deliveries))
+    if mode == "concurrent":
+        yield from _send_concurrently(deliveries, client, order)
+    elif mode == "batch":
+        _send_batched(deliveries, client)
+        yield from order
+    else:
+        by_draft: dict[int, list[Delivery]] = {}
+        for d in deliveries:
+            by_draft.setdefault(d.analysis_id, []).append(d)
+        for analysis_id in order:
+            for d in by_draft[analysis_id]:
+                _send_one(client, d)
+            yield analysis_id
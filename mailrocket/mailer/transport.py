@@ -0,0 +1,282 @@
+"""Mail transports: how a built message leaves the machine.
+
+    transport:
+      kind: gmail     # Gmail API over OAuth (default)
+      kind: smtp      # any SMTP relay, or a local aiosmtpd sink for tests
+      kind: maildir   # write each message into a local Maildir; nothing is sent
+
+Every transport has the same `send(subject, body, to, from, pdf)` as
+`GmailClient.send` and returns a dict with the message `id`.
+`get_transport()` returns the process-wide instance for `transport.kind`.
+Only Gmail has `send_batch`; `send.mode: batch` sends one by one with the
+others.
+"""
+from __future__ import annotations
+
+import logging
+import mailbox
+import re
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+from mailrocket import timing
+from mailrocket.mailer.mime import build_mime_bytes
+from mailrocket.mailer.ratelimit import TokenBucket
+from mailrocket.settings import SmtpConfig, settings
+
+logger = logging.getLogger(__name__)
+
+# A pooled SMTP connection idle for longer than this is checked with NOOP
+# before reuse; servers commonly drop idle clients after 60-300 s.
+_SMTP_IDLE_CHECK_SECONDS = 30.0
+
+_EOL_RE = re.compile(rb"\r?\n")
+_DOT_RE = re.compile(rb"(?m)^\.")
+
+
+class DeliveryUnknown(Exception):
+    """The message was handed over but no verdict came back: it may have been
+    delivered, so the send must not be repeated automatically."""
+
+
+class Transport:
+    name = "base"
+
+    def send(
+        self,
+        subject: str,
+        body: str,
+        to_email: str,
+        from_email: str,
+        pdf_file_path: Path | str | None = None,
+    ) -> dict:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release connections; the transport stays usable and reconnects on demand."""
+
+
+def _with_headers(raw: bytes, from_email: str) -> tuple[str, bytes]:
+    """Prepend the Message-ID and Date headers Gmail would otherwise add."""
+    domain = from_email.rsplit("@", 1)[-1] if "@" in from_email else "mailrocket.local"
+    message_id = make_msgid(domain=domain)
+    head = f"Message-ID: {message_id}\nDate: {formatdate(localtime=True)}\n".encode()
+    return message_id, head + raw
+
+
+class SmtpTransport(Transport):
+    """SMTP relay; each sending thread keeps one connection open across messages.
+
+    When the server advertises PIPELINING (RFC 2920), MAIL FROM, RCPT TO and
+    DATA go out in one write, so a message costs two round trips instead
+    of four. Credentials come from `smtp.username` / `smtp.password` in
+    secrets.yaml (no login when empty).
+    """
+
+    name = "smtp"
+
+    def __init__(self, cfg: SmtpConfig | None = None, limiter: TokenBucket | None = None) -> None:
+        self.cfg = cfg or settings.transport.smtp
+        self.username = settings.secrets.smtp_username
+        self.password = settings.secrets.smtp_password
+        self.limiter = limiter or TokenBucket(self.cfg.rate_per_second, max(1.0, self.cfg.rate_per_second))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: list[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        cfg = self.cfg
+        with timing.span("send.smtp_connect"):
+            if cfg.ssl:
+                conn: smtplib.SMTP = smtplib.SMTP_SSL(
+                    cfg.host, cfg.port, timeout=cfg.timeout_seconds, context=ssl.create_default_context(),
+                )
+            else:
+                conn = smtplib.SMTP(cfg.host, cfg.port, timeout=cfg.timeout_seconds)
+            conn.ehlo()
+            if cfg.starttls and not cfg.ssl and conn.has_extn("starttls"):
+                conn.starttls(context=ssl.create_default_context())
+                conn.ehlo()
+            if self.username:
+                conn.login(self.username, self.password)
+        with self._lock:
+            self._open.append(conn)
+        logger.info("Connected to SMTP %s:%s (pipelining=%s)", cfg.host, cfg.port, conn.has_extn("pipelining"))
+        return conn
+
+    def _discard(self, conn: smtplib.SMTP) -> None:
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+        self._local.conn = None
+
+    def _connection(self) -> smtplib.SMTP:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and time.monotonic() - self._local.last_used > _SMTP_IDLE_CHECK_SECONDS:
+            try:
+                if conn.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self._discard(conn)
+                conn = None
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._local.last_used = time.monotonic()
+        return conn
+
+    def _sendmail(self, conn: smtplib.SMTP, sender: str, recipient: str, msg: bytes) -> None:
+        """MAIL FROM, RCPT TO and DATA, then the message.
+
+        Errors up to the DATA reply mean the message was never handed over.
+        Once the message is out, only an explicit reply is conclusive: a lost
+        connection or timeout there raises `DeliveryUnknown`.
+        """
+        if self.cfg.pipelining and conn.has_extn("pipelining"):
+            conn.send(f"MAIL FROM:<{sender}>\r\nRCPT TO:<{recipient}>\r\nDATA\r\n".encode())
+            mail, rcpt, data = conn.getreply(), conn.getreply(), conn.getreply()
+            if data[0] == 354 and (mail[0] != 250 or rcpt[0] not in (250, 251)):
+                conn.send(b".\r\n")  # some servers accept DATA anyway: end it empty
+                conn.getreply()
+        else:
+            mail = conn.mail(sender)
+            rcpt = conn.rcpt(recipient) if mail[0] == 250 else (503, b"MAIL FROM refused")
+            data = conn.docmd("DATA") if rcpt[0] in (250, 251) else (503, b"RCPT TO refused")
+        if mail[0] != 250:
+            conn.rset()
+            raise smtplib.SMTPSenderRefused(mail[0], mail[1], sender)
+        if rcpt[0] not in (250, 251):
+            conn.rset()
+            raise smtplib.SMTPRecipientsRefused({recipient: rcpt})
+        if data[0] != 354:
+            conn.rset()
+            raise smtplib.SMTPDataError(*data)
+        try:
+            conn.send(_DOT_RE.sub(b"..", msg) + b".\r\n")
+            code, resp = conn.getreply()
+        except OSError as e:  # includes SMTPServerDisconnected
+            raise DeliveryUnknown(f"no reply after the message was sent: {type(e).__name__}: {e}") from e
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+
+    def send(
+        self,
+        subject: str,
+        body: str,
+        to_email: str,
+        from_email: str,
+        pdf_file_path: Path | str | None = None,
+    ) -> dict:
+        sender = from_email or self.username
+        message_id, raw = _with_headers(build_mime_bytes(subject, body, to_email, sender, pdf_file_path), sender)
+        msg = _EOL_RE.sub(b"\r\n", raw)
+        if not msg.endswith(b"\r\n"):
+            msg += b"\r\n"
+        self.limiter.acquire()
+        conn = self._connection()
+        try:
+            with timing.span("send.smtp"):
+                self._sendmail(conn, sender, to_email, msg)
+        except (smtplib.SMTPServerDisconnected, DeliveryUnknown):
+            self._discard(conn)
+            raise
+        except smtplib.SMTPException:
+            raise  # the server replied, so the connection is still usable
+        except OSError:
+            self._discard(conn)
+            raise
+        finally:
+            self._local.last_used = time.monotonic()
+        return {"id": message_id}
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._open = self._open, []
+        for conn in conns:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+        self._local = threading.local()
+
+
+class MaildirTransport(Transport):
+    """Delivers into a local Maildir (`transport.maildir`) instead of sending.
+
+    For integration runs and send-stage benchmarks without any network;
+    open the folder with a mail client or `mailbox.Maildir`.
+    """
+
+    name = "maildir"
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or settings.transport.maildir
+        self._box = mailbox.Maildir(self.path, create=True)
+        self._lock = threading.Lock()  # Maildir's unique-name counter isn't thread-safe
+
+    def send(
+        self,
+        subject: str,
+        body: str,
+        to_email: str,
+        from_email: str,
+        pdf_file_path: Path | str | None = None,
+    ) -> dict:
+        message_id, raw = _with_headers(
+            build_mime_bytes(subject, body, to_email, from_email, pdf_file_path), from_email,
+        )
+        with timing.span("send.maildir"), self._lock:
+            self._box.add(raw)
+        return {"id": message_id}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a failed send certainly did not go out and may work on a later run.
+
+    SMTP 4xx replies are temporary and 5xx are not; a refusal, even of the
+    message itself, means the server did not take it (RFC 5321 4.2.5).
+    Network errors count only from before the message is handed over: the
+    transports raise `DeliveryUnknown` (never retried) after that.
+    """
+    if isinstance(exc, DeliveryUnknown):
+        return False
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, (ConnectionError, TimeoutError, socket.gaierror, smtplib.SMTPServerDisconnected)):
+        return True
+    from mailrocket.mailer.gmail import is_retryable as gmail_retryable
+
+    return gmail_retryable(exc)
+
+
+_TRANSPORT: Transport | None = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Process-wide transport for `transport.kind`."""
+    global _TRANSPORT
+    kind = settings.transport.kind
+    if kind == "gmail":
+        from mailrocket.mailer.gmail import default_client
+
+        return default_client()
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            if kind == "smtp":
+                _TRANSPORT = SmtpTransport()
+            elif kind == "maildir":
+                _TRANSPORT = MaildirTransport()
+            else:
+                raise ValueError(f"Unknown transport.kind {kind!r}; expected gmail, smtp or maildir")
+        return _TRANSPORT
@@ -0,0 +1,282 @@
+"""Prometheus / OpenMetrics metrics, kept in-process (stdlib only).
+
+Hot paths update module-level metrics:
+
+    POSTS_SCRAPED.inc(query=query)
+    LLM_CALLS.inc(provider="groq", model="...", outcome="ok")
+
+`render()` produces the text exposition format served at `/metrics` by the
+review UI and the daemon. For one-shot CLI runs, `export_cli_run()` writes
+the same text to a node_exporter textfile and/or PUTs it to a Pushgateway
+(`metrics:` in config.yaml). Queue-depth gauges are read from the DB when
+scraped, so they are correct in any process.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from mailrocket.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self, openmetrics: bool) -> list[str]:
+        family = self.name
+        if self.kind == "counter" and openmetrics:
+            family = self.name.removesuffix("_total")
+        lines = [f"# HELP {family} {self.help}", f"# TYPE {family} {self.kind}"]
+        lines += [f"{name}{labels} {_fmt(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _labels(self.label_names, k), v) for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        callback: Callable[[], dict[LabelValues, float]] | None = None,
+    ) -> None:
+        """`callback` computes all label sets at scrape time instead of `set()`."""
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception:
+                logger.debug("Gauge %s callback failed", self.name, exc_info=True)
+                return []
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [(self.name, _labels(self.label_names, k), v) for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((k, (list(c), t[0])) for k, (c, t) in self._values.items())
+        out: list[tuple[str, str, float]] = []
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets, counts, strict=True):
+                running += n
+                le = f'le="{_fmt(bound)}"'
+                out.append((f"{self.name}_bucket", _labels(self.label_names, key, le), running))
+            out.append((f"{self.name}_count", _labels(self.label_names, key), running))
+            out.append((f"{self.name}_sum", _labels(self.label_names, key), total))
+        return out
+
+
+_REGISTRY: list[_Metric] = []
+
+
+def _register(metric: _Metric) -> _Metric:
+    _REGISTRY.append(metric)
+    return metric
+
+
+def render(openmetrics: bool = False) -> str:
+    """Text exposition of every registered metric."""
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines += metric.render(openmetrics)
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def wants_openmetrics(accept_header: str | None) -> bool:
+    return "application/openmetrics-text" in (accept_header or "")
+
+
+# -- queue depth, read from the DB at scrape time ----------------------------
+
+
+def _queue_depth() -> dict[LabelValues, float]:
+    from mailrocket.storage.analysis_repo import status_counts
+    from mailrocket.storage.jobs_repo import queue_status
+
+    counts = status_counts()
+    jobs = queue_status()
+    return {
+        ("analysis",): counts.get("unanalyzed", 0),
+        ("email",): counts.get("pending", 0),
+        ("analysis_parked",): jobs.get("parked", 0),
+    }
+
+
+# -- the metrics ----------------------------------------------------------------
+
+POSTS_SCRAPED = _register(Counter(
+    "mailrocket_posts_scraped_total", "New posts stored by the scraper.", ("query",)))
+SCRAPE_QUERIES = _register(Counter(
+    "mailrocket_scrape_queries_total", "Search queries run, by result.", ("result",)))
+LLM_CALLS = _register(Counter(
+    "mailrocket_llm_calls_total", "LLM attempts by model and outcome.", ("provider", "model", "outcome")))
+LLM_LATENCY = _register(Histogram(
+    "mailrocket_llm_call_duration_seconds", "LLM attempt latency.", ("provider", "model")))
+LLM_TOKENS = _register(Counter(
+    "mailrocket_llm_tokens_total", "Tokens used, by direction.", ("provider", "model", "direction")))
+ANALYSES = _register(Counter(
+    "mailrocket_posts_analyzed_total", "Posts processed by the analyze stage, by outcome.", ("outcome",)))
+EMAILS = _register(Counter(
+    "mailrocket_emails_total", "Emails handled by the send stage, by result.", ("result",)))
+SEND_FAILURES = _register(Counter(
+    "mailrocket_send_failures_total", "Recipients whose Gmail send raised."))
+SPAN_SECONDS = _register(Histogram(
+    "mailrocket_span_duration_seconds", "Durations of mailrocket.timing spans.", ("span",)))
+QUEUE_DEPTH = _register(Gauge(
+    "mailrocket_queue_depth", "Posts waiting for analysis / analyses waiting to be mailed.",
+    ("queue",), callback=_queue_depth))
+LAST_RUN = _register(Gauge(
+    "mailrocket_last_run_timestamp_seconds", "End time of the last CLI run.", ("command",)))
+LAST_RUN_OK = _register(Gauge(
+    "mailrocket_last_run_success", "1 if the last CLI run exited 0.", ("command",)))
+LAST_RUN_DURATION = _register(Gauge(
+    "mailrocket_last_run_duration_seconds", "Wall time of the last CLI run.", ("command",)))
+
+
+# -- exporting one-shot CLI runs --------------------------------------------------
+
+
+def _write_textfile(path: Path, text: str) -> None:
+    # node_exporter may read at any moment: write aside, then rename.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _push(url: str, job: str, instance: str, text: str) -> None:
+    target = (
+        f"{url.rstrip('/')}/metrics/job/{urllib.parse.quote(job, safe='')}"
+        f"/instance/{urllib.parse.quote(instance, safe='')}"
+    )
+    req = urllib.request.Request(
+        target, data=text.encode(), method="PUT", headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+    )
+    with urllib.request.urlopen(req, timeout=settings.metrics.push_timeout_seconds) as resp:
+        resp.read()
+
+
+def export_cli_run(command: str, exit_code: int, wall_seconds: float) -> None:
+    """Record the run gauges, then write the textfile / push, as configured."""
+    cfg = settings.metrics
+    if not cfg.textfile and not cfg.pushgateway_url:
+        return
+    LAST_RUN.set(time.time(), command=command)
+    LAST_RUN_OK.set(1 if exit_code == 0 else 0, command=command)
+    LAST_RUN_DURATION.set(round(wall_seconds, 3), command=command)
+    text = render()
+    if cfg.textfile:
+        try:
+            path = cfg.textfile.with_name(cfg.textfile.name.replace("{command}", command))
+            _write_textfile(path, text)
+        except OSError:
+            logger.warning("Could not write metrics textfile %s", cfg.textfile, exc_info=True)
+    if cfg.pushgateway_url:
+        try:
+            _push(cfg.pushgateway_url, cfg.job, command, text)
+        except Exception as e:
+            logger.warning("Could not push metrics to %s: %s", cfg.pushgateway_url, e)
@@ -1,7 +1,8 @@
 """Three-stage pipeline. Each stage uses the DB as its queue:
 
     scrape  : new posts -> linkedin_posts (analysed=0)
-    analyze : analysed=0 posts -> post_analysis (mail_sent=-1) + analysed=1
+    analyze : analysed=0 posts -> post_analysis (mail_sent=-1) + analysed=1,
+              claimed under a lease so concurrent analyze runs don't collide
     send    : mail_sent=-1 analyses -> Gmail; mail_sent=1 (sent) or 0 (rejected)
 
 The stages are deliberately independent so they can be run on different
@@ -12,82 +13,335 @@ from __future__ import annotations
 
 import json
 import logging
+import queue
 import sqlite3
+import threading
 import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
 
+from mailrocket import metrics, timing
 from mailrocket.settings import settings
-from mailrocket.storage import init_db
+from mailrocket.storage import init_db, outbox_repo
 from mailrocket.storage.analysis_repo import (
+    copy_analysis_from,
     fetch_pending_emails,
     insert_analysis,
     mark_mail_sent,
 )
-from mailrocket.storage.posts_repo import (
-    insert_post,
-    mark_analyzed,
-    read_unanalyzed,
+from mailrocket.storage.dedup_repo import find_representative
+from mailrocket.storage.jobs_repo import (
+    LeaseLostError,
+    claim_batch,
+    extend_leases,
+    new_worker_id,
+    release_claim,
+    return_claims,
+    start_attempt,
 )
+from mailrocket.storage.posts_repo import insert_post, mark_analyzed
+from mailrocket.storage.runs_repo import finish_run, latest_incomplete_run, save_progress, start_run
 
 logger = logging.getLogger(__name__)
 
 
 def _ensure_db() -> None:
+    # init_db is idempotent; running it every time also creates tables added
+    # after the DB file was first made.
     if not settings.paths.db.exists():
         logger.info("DB not found at %s; initialising", settings.paths.db)
-        init_db()
-
-
-def run_scrape() -> int:
-    """Stage 1: scrape LinkedIn and insert posts. Returns count of new posts."""
+    init_db()
+
+
+def _reuse_duplicate_analysis(uid: int, worker_id: str | None = None) -> bool:
+    """Copy the analysis of `uid`'s near-duplicate representative, if it has one."""
+    if not settings.dedup.enabled:
+        return False
+    rep = find_representative(uid)
+    if rep is None:
+        return False
+    return copy_analysis_from(uid, rep, lease_owner=worker_id) > 0
+
+
+@contextmanager
+def _tracked_run(
+    stage: str, resume: bool, initial: dict[str, Any], worker: str | None = None
+) -> Iterator[tuple[int, dict]]:
+    """Record a `pipeline_runs` row for `stage`; yields (run_id, progress dict).
+
+    With `resume`, the latest incomplete run's progress is carried over and
+    that run is marked `resumed`. The final status is set on exit:
+    completed, interrupted (Ctrl-C) or failed. A stage that returns with
+    `progress["failed_queries"]` left over also ends `failed`, so it can be
+    resumed.
+    """
+    progress = dict(initial)
+    prev = latest_incomplete_run(stage) if resume else None
+    if prev is not None:
+        progress.update(prev["progress"])
+        progress["resumed_from"] = prev["run_id"]
+        finish_run(prev["run_id"], "resumed")
+        logger.info("Resuming %s run %d (status: %s)", stage, prev["run_id"], prev["status"])
+    elif resume:
+        logger.info("No incomplete %s run to resume; starting a new one", stage)
+    run_id = start_run(stage, progress, worker=worker)
+    status = "failed"
+    try:
+        yield run_id, progress
+        status = "failed" if progress.get("failed_queries") else "completed"
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        finish_run(run_id, status, progress)
+        if status != "completed":
+            logger.warning("%s run %d %s; continue it with --resume", stage, run_id, status)
+
+
+@timing.timed("stage.scrape")
+def run_scrape(on_insert: Callable[[int], None] | None = None, resume: bool = False) -> int:
+    """Stage 1: scrape LinkedIn and insert posts. Returns count of new posts.
+
+    `on_insert(uid)` is called after each new post is committed. Progress is
+    checkpointed per post; `resume` skips the queries the last incomplete run
+    finished. A half-done or failed query is scrolled again from the top (a
+    fresh browser can't restore the scroll position), but posts already in
+    the DB are skipped and count against its max_results. A run with failed
+    queries ends `failed` rather than `completed`.
+    """
     from mailrocket.scraper.linkedin import scrape_linkedin_feed
 
     _ensure_db()
     inserted = 0
-    for post in scrape_linkedin_feed():
-        try:
-            insert_post(post)
-            inserted += 1
-        except sqlite3.IntegrityError:
-            logger.info("Duplicate post skipped: %s", post.get("post_link"))
-        except Exception:
-            logger.exception("Failed to insert post: %s", post.get("post_link"))
-        time.sleep(settings.scraper.per_query_delay_seconds)
+    initial = {"completed_queries": [], "yielded": {}, "inserted": 0}
+    with _tracked_run("scrape", resume, initial) as (run_id, progress):
+        completed: list[str] = progress["completed_queries"]
+        yielded: dict[str, int] = progress["yielded"]
+        # Queries a resumed run saw fail are run again, so start the list afresh.
+        failed: list[str] = []
+        progress["failed_queries"] = failed
+
+        def query_started(index: int, query: str) -> None:
+            progress.update(query_index=index, current_query=query)
+            save_progress(run_id, progress)
+
+        def query_done(index: int, query: str) -> None:
+            if query not in completed:
+                completed.append(query)
+            save_progress(run_id, progress)
+
+        def query_failed(index: int, query: str) -> None:
+            if query not in failed:
+                failed.append(query)
+            save_progress(run_id, progress)
+
+        for post in scrape_linkedin_feed(
+            skip_queries=completed,
+            already_yielded=yielded,
+            on_query_start=query_started,
+            on_query_done=query_done,
+            on_query_failed=query_failed,
+        ):
+            query = post.get("query") or progress.get("current_query") or ""
+            yielded[query] = yielded.get(query, 0) + 1
+            try:
+                with timing.span("scrape.db_write"):
+                    uid = insert_post(post)
+                inserted += 1
+                progress["inserted"] += 1
+                metrics.POSTS_SCRAPED.inc(query=query)
+                if on_insert is not None:
+                    on_insert(uid)
+            except sqlite3.IntegrityError:
+                logger.info("Duplicate post skipped: %s", post.get("post_link"))
+            except Exception:
+                logger.exception("Failed to insert post: %s", post.get("post_link"))
+            with timing.span("pipeline.checkpoint"):
+                save_progress(run_id, progress)
+            with timing.span("scrape.throttle"):
+                time.sleep(settings.scraper.per_query_delay_seconds)
+    if failed:
+        logger.warning("Scrape stage: %d query(ies) failed: %s", len(failed), ", ".join(failed))
     logger.info("Scrape stage finished. New posts: %d", inserted)
     return inserted
 
 
-def run_analyze() -> int:
-    """Stage 2: pick `analysed=0` posts, run LLM, persist analyses. Returns count analyzed."""
+@timing.timed("analyze.post")
+def _analyze_post(post: dict, worker_id: str) -> str:
+    """Analyze one claimed post. Returns the outcome: analyzed, deduplicated,
+    skipped, failed or lost (lease taken over by another worker)."""
     from mailrocket.analyzer.service import analyze_job_match
 
+    q = settings.queue
+    uid = post["uid"]
+    if not start_attempt(uid, worker_id, q.lease_seconds):
+        logger.warning("Lease on post uid=%s expired before work on it started; leaving it", uid)
+        return "lost"
+    try:
+        jobs_text = post.get("post_text") or ""
+        if not jobs_text:
+            logger.info("Skipping post uid=%s with empty post_text", uid)
+            mark_analyzed(uid)
+            return "skipped"
+
+        with timing.span("analyze.dedup_lookup"):
+            reused = _reuse_duplicate_analysis(uid, worker_id)
+        if reused:
+            return "deduplicated"
+
+        results, model_info = analyze_job_match(
+            jobs_text,
+            trace_metadata={
+                "post_uid": uid,
+                "post_link": post.get("post_link"),
+                "query": post.get("query"),
+            },
+        )
+        with timing.span("analyze.db_write"):
+            insert_analysis(uid, results, model_used=model_info.get("name"), lease_owner=worker_id)
+        return "analyzed"
+    except LeaseLostError as e:
+        logger.warning("Dropping result for post uid=%s: %s", uid, e)
+        return "lost"
+    except Exception as e:
+        logger.exception("Analysis failed for post uid=%s", uid)
+        release_claim(
+            uid, worker_id, f"{type(e).__name__}: {e}",
+            max_attempts=q.max_attempts,
+            retry_delay_seconds=q.retry_delay_seconds,
+        )
+        return "failed"
+
+
+def _log_analyze_summary(outcomes: Counter) -> None:
+    from mailrocket.analyzer.llm import ttft_stats
+
+    logger.info(
+        "Analyze stage finished. Posts analyzed: %d (near-duplicates reused: %d, failed: %d)",
+        outcomes["analyzed"], outcomes["deduplicated"], outcomes["failed"],
+    )
+    for model_key, stats in sorted(ttft_stats().items()):
+        logger.info(
+            "TTFT %s: avg=%.0fms last=%.0fms over %d streamed call(s)",
+            model_key, stats["avg_ms"], stats["last_ms"], stats["count"],
+        )
+
+
+@timing.timed("stage.analyze")
+def run_analyze(resume: bool = False) -> int:
+    """Stage 2: claim `analysed=0` posts, run LLM, persist analyses. Returns count analyzed.
+
+    Posts are claimed in leased batches (`storage/jobs_repo.py`), so several
+    `analyze` processes can share the DB without analysing a post twice.
+    Finished posts are never re-claimed, and on Ctrl-C the rest of the batch
+    is handed back, so the next run picks up where this one stopped. A
+    process killed outright leaves its batch leased until
+    `queue.lease_seconds` pass. `resume` also carries the run record
+    (outcome counts, last finished uid) forward.
+    """
     _ensure_db()
-    pending = read_unanalyzed()
-    logger.info("Found %d posts pending analysis", len(pending))
-
-    analyzed = 0
-    for post in pending:
-        try:
-            jobs_text = post.get("post_text") or ""
-            if not jobs_text:
-                logger.info("Skipping post uid=%s with empty post_text", post["uid"])
-                mark_analyzed(post["uid"])
-                continue
-
-            results, model_info = analyze_job_match(
-                jobs_text,
-                trace_metadata={
-                    "post_uid": post["uid"],
-                    "post_link": post.get("post_link"),
-                    "query": post.get("query"),
-                },
-            )
-            insert_analysis(post["uid"], results, model_used=model_info.get("name"))
-            analyzed += 1
-        except Exception:
-            logger.exception("Analysis failed for post uid=%s", post.get("uid"))
-
-    logger.info("Analyze stage finished. Posts analyzed: %d", analyzed)
-    return analyzed
+    q = settings.queue
+    worker_id = new_worker_id()
+    logger.info("Analyze worker %s claiming batches of %d", worker_id, q.batch_size)
+
+    outcomes: Counter = Counter()
+    initial = {"outcomes": {}, "last_uid": None}
+    with _tracked_run("analyze", resume, initial, worker=worker_id) as (run_id, progress):
+        while True:
+            with timing.span("analyze.claim"):
+                batch = claim_batch(worker_id, q.batch_size, q.lease_seconds, q.max_attempts)
+            if not batch:
+                break
+            remaining = [p["uid"] for p in batch]
+            try:
+                for post in batch:
+                    extend_leases(worker_id, remaining, q.lease_seconds)
+                    outcome = _analyze_post(post, worker_id)
+                    remaining.remove(post["uid"])
+                    outcomes[outcome] += 1
+                    timing.incr(f"analyze.posts_{outcome}")
+                    metrics.ANALYSES.inc(outcome=outcome)
+                    if outcome in ("analyzed", "deduplicated", "skipped"):
+                        progress["last_uid"] = post["uid"]
+                    counts = progress["outcomes"]
+                    counts[outcome] = counts.get(outcome, 0) + 1
+                    with timing.span("pipeline.checkpoint"):
+                        save_progress(run_id, progress)
+            except BaseException:
+                # Ctrl-C (or a crash) mid-batch: a resumed run gets a new worker
+                # id, so hand the unfinished posts back instead of leaving them
+                # leased for `queue.lease_seconds`.
+                return_claims(worker_id, remaining)
+                raise
+
+    _log_analyze_summary(outcomes)
+    return outcomes["analyzed"]
+
+
+def run_overlapped(resume: bool = False) -> tuple[int, int]:
+    """scrape + analyze at the same time. Returns (new_posts, analyzed).
+
+    The scraper stays on this thread (Selenium isn't thread-safe) and hands
+    each new uid to `pipeline.analyze_workers` threads through a queue of
+    `pipeline.handoff_queue_size`. A full queue blocks the scraper until a
+    worker frees a slot. Older pending posts and retries are picked up by
+    a normal `run_analyze` pass at the end.
+    """
+    _ensure_db()
+    q = settings.queue
+    cfg = settings.pipeline
+    handoff: queue.Queue[int | None] = queue.Queue(maxsize=max(1, cfg.handoff_queue_size))
+    outcomes: Counter = Counter()
+    outcomes_lock = threading.Lock()
+    blocked = 0.0
+
+    def worker(n: int) -> None:
+        worker_id = f"{new_worker_id()}/{n}"
+        while True:
+            uid = handoff.get()
+            if uid is None:
+                return
+            try:
+                for post in claim_batch(worker_id, 1, q.lease_seconds, q.max_attempts, only_uids=[uid]):
+                    outcome = _analyze_post(post, worker_id)
+                    timing.incr(f"analyze.posts_{outcome}")
+                    metrics.ANALYSES.inc(outcome=outcome)
+                    with outcomes_lock:
+                        outcomes[outcome] += 1
+            except Exception:
+                logger.exception("Analyze worker %d failed on post uid=%s", n, uid)
+
+    def hand_off(uid: int) -> None:
+        nonlocal blocked
+        start = time.perf_counter()
+        handoff.put(uid)
+        waited = time.perf_counter() - start
+        blocked += waited
+        timing.observe("pipeline.handoff_wait", waited)
+
+    workers = [
+        threading.Thread(target=worker, args=(n,), name=f"analyze-{n}", daemon=True)
+        for n in range(max(1, cfg.analyze_workers))
+    ]
+    for t in workers:
+        t.start()
+    try:
+        new_posts = run_scrape(on_insert=hand_off, resume=resume)
+    finally:
+        for _ in workers:
+            handoff.put(None)
+        for t in workers:
+            t.join()
+
+    logger.info(
+        "Overlapped analyze: %d analyzed while scraping (%d reused, %d failed); "
+        "scraper waited %.1fs on the analyze queue",
+        outcomes["analyzed"], outcomes["deduplicated"], outcomes["failed"], blocked,
+    )
+    analyzed = outcomes["analyzed"] + run_analyze(resume=resume)
+    return new_posts, analyzed
 
 
 def _decorate_with_postfix_and_closer(analysis: dict) -> dict:
@@ -106,75 +360,213 @@ def _decorate_with_postfix_and_closer(analysis: dict) -> dict:
     return analysis
 
 
+def _row_to_analysis(row: dict) -> dict:
+    """Rebuild the analysis dict `decide_and_send_email` expects from a pending row."""
+    analysis = json.loads(row["full_analysis_json"]) if row["full_analysis_json"] else {}
+    analysis["model_name"] = row["model_used"] or "N/A"
+
+    contact_email_raw = row["contact_email"]
+    try:
+        analysis["contact_email"] = json.loads(contact_email_raw) if contact_email_raw else []
+    except (TypeError, json.JSONDecodeError):
+        analysis["contact_email"] = []
+
+    analysis["message_content"] = {
+        "subject": row["subject"] or analysis.get("message_content", {}).get("subject"),
+        "body": row["body"] or analysis.get("message_content", {}).get("body"),
+    }
+    return analysis
+
+
+@timing.timed("stage.send")
 def run_send(dry_run: bool = False) -> tuple[int, int]:
-    """Stage 3: send pending analyses. Returns (sent_count, rejected_count)."""
-    from mailrocket.mailer.service import decide_and_send_email
+    """Stage 3: send pending analyses. Returns (sent_count, rejected_count).
+
+    Drafts that pass the send rules go out through the outbox (one row per
+    recipient, see `storage/outbox_repo.py`) in the `send.mode` way:
+    sequential, Gmail batch requests, or a pool of worker threads. One
+    transport (`transport.kind`: the Gmail client, SMTP or a Maildir)
+    serves every send in the run, paced by its token bucket.
+    """
+    from mailrocket.mailer.service import decide_and_send_email, prepare_email
 
     _ensure_db()
+    if not dry_run:
+        expired = outbox_repo.expire_stale()
+        if expired:
+            logger.warning(
+                "%d outbox row(s) were mid-send when a previous run died; marked unknown, not resent",
+                expired,
+            )
     rows = fetch_pending_emails()
     if not rows:
         logger.info("No pending emails to send")
         return (0, 0)
 
-    logger.info("Found %d pending analyses; %s", len(rows), "dry-run" if dry_run else "sending")
+    mode = "dry-run" if dry_run else settings.send.mode
+    logger.info("Found %d pending analyses; mode=%s", len(rows), mode)
 
     sent_count = 0
     rejected_count = 0
+    prepared = {}
 
     for row in rows:
         try:
-            analysis = json.loads(row["full_analysis_json"]) if row["full_analysis_json"] else {}
-            analysis["model_name"] = row["model_used"] or "N/A"
-
-            contact_email_raw = row["contact_email"]
-            try:
-                analysis["contact_email"] = json.loads(contact_email_raw) if contact_email_raw else []
-            except (TypeError, json.JSONDecodeError):
-                analysis["contact_email"] = []
-
-            analysis["message_content"] = {
-                "subject": row["subject"] or analysis.get("message_content", {}).get("subject"),
-                "body": row["body"] or analysis.get("message_content", {}).get("body"),
-            }
+            analysis = _row_to_analysis(row)
 
             if not analysis["message_content"]["subject"] or not analysis["message_content"]["body"]:
                 logger.info("Skipping analysis_id=%s: empty subject/body", row["analysis_id"])
                 if not dry_run:
                     mark_mail_sent(row["analysis_id"], False)
                 rejected_count += 1
+                metrics.EMAILS.inc(result="rejected")
                 continue
 
             analysis = _decorate_with_postfix_and_closer(analysis)
             job_post = {"post_link": row["post_link"]}
 
-            sent, reason = decide_and_send_email(analysis, job_post, dry_run=dry_run)
+            if dry_run:
+                sent, reason = decide_and_send_email(analysis, job_post, dry_run=True)
+            else:
+                email, reason = prepare_email(analysis, job_post)
+                if email is not None:
+                    prepared[row["analysis_id"]] = email
+                    continue
+                sent = False
             logger.info("[%s] %s", row["analysis_id"], reason)
 
             if not dry_run:
-                mark_mail_sent(row["analysis_id"], sent)
+                with timing.span("send.db_write"):
+                    mark_mail_sent(row["analysis_id"], sent)
             if sent:
                 sent_count += 1
             else:
                 rejected_count += 1
-
-            time.sleep(2)
+            metrics.EMAILS.inc(result="dry_run" if sent else "rejected")
         except Exception:
+            metrics.EMAILS.inc(result="error")
             logger.exception("Error processing analysis_id=%s", row.get("analysis_id"))
 
+    if prepared:
+        s, r = _send_prepared(prepared)
+        sent_count += s
+        rejected_count += r
+
     logger.info("Send stage finished. sent=%d rejected=%d", sent_count, rejected_count)
     return sent_count, rejected_count
 
 
-def run_pipeline() -> tuple[int, int]:
-    """Daily-use combo: scrape + analyze (no send). Returns (new_posts, analyzed)."""
-    new_posts = run_scrape()
-    analyzed = run_analyze()
+def _finalize_draft(analysis_id: int) -> tuple[str | None, dict[str, str]]:
+    """Set `mail_sent` from the draft's outbox rows.
+
+    Returns ("sent" / "rejected", {recipient: state}), or None as the result
+    while recipients are still waiting for a retry (draft stays pending).
+    `unknown` rows (possibly delivered) count as reached.
+    """
+    states = outbox_repo.recipient_states(analysis_id)
+    total = len(states)
+    reached = sum(1 for s in states.values() if s in ("sent", "unknown"))
+    waiting = sum(1 for s in states.values() if s in ("pending", "sending"))
+    if waiting:
+        logger.info("[%s] reached %d/%d; %d recipient(s) left for the next run", analysis_id, reached, total, waiting)
+        metrics.EMAILS.inc(result="deferred")
+        return None, states
+    sent = reached > 0
+    logger.info(
+        "[%s] %s", analysis_id, f"Sent to {reached}/{total} recipients" if sent else "All recipients failed",
+    )
+    with timing.span("send.db_write"):
+        if not mark_mail_sent(analysis_id, sent):
+            logger.warning("[%s] outcome already recorded; left unchanged", analysis_id)
+    metrics.EMAILS.inc(result="sent" if sent else "rejected")
+    return ("sent" if sent else "rejected"), states
+
+
+def _send_prepared(emails: dict) -> tuple[int, int]:
+    """Send prepared drafts through the outbox and record each one's outcome.
+
+    Returns (sent, rejected). Only recipients whose outbox row is still
+    pending are sent to, so a draft left half-done by an earlier run picks
+    up where it stopped. Drafts are finalized on this thread in row order.
+    Self-review follows `email.self_review_mode`: per-message copies go out
+    afterwards for drafts that reached someone; a digest of all of them
+    goes out once at the end (`mailer/digest.py`).
+    """
+    from mailrocket.mailer.digest import ReviewEntry, deliver_digest
+    from mailrocket.mailer.service import Delivery, send_deliveries
+    from mailrocket.mailer.transport import get_transport
+
+    client = get_transport()
+    sent_count = rejected_count = finalized = 0
+    reviews: list = []
+    digest: list[ReviewEntry] = []
+    try:
+        deliveries = []
+        for analysis_id, email in emails.items():
+            outbox_repo.enqueue(analysis_id, email.recipients)
+            deliveries += [
+                Delivery(r["outbox_id"], analysis_id, r["recipient"], email)
+                for r in outbox_repo.pending_rows(analysis_id)
+            ]
+        with_deliveries = {d.analysis_id for d in deliveries}
+
+        finished = send_deliveries(deliveries, client)
+        for analysis_id, email in emails.items():
+            if analysis_id in with_deliveries:
+                next(finished)
+            result, states = _finalize_draft(analysis_id)
+            finalized += 1
+            if result == "sent":
+                sent_count += 1
+                if email.review_body is not None and settings.email.self_review_mail:
+                    outbox_repo.enqueue(analysis_id, [settings.email.self_review_mail], kind="review")
+                    reviews += [
+                        Delivery(r["outbox_id"], analysis_id, r["recipient"], email, review=True)
+                        for r in outbox_repo.pending_rows(analysis_id, kind="review")
+                    ]
+                if settings.email.self_review_mode == "digest":
+                    digest.append(ReviewEntry(
+                        analysis_id, email.subject, email.company_name, email.post_link, email.model_name,
+                        sent_to=[r for r, s in states.items() if s in ("sent", "unknown")],
+                        not_sent=[r for r, s in states.items() if s not in ("sent", "unknown")],
+                    ))
+            elif result == "rejected":
+                rejected_count += 1
+        for _ in finished:
+            pass
+
+        for _ in send_deliveries(reviews, client):
+            pass
+    except Exception:
+        left = len(emails) - finalized
+        logger.exception("Sending failed; %d draft(s) left pending", left)
+        if left:
+            metrics.EMAILS.inc(left, result="error")
+    finally:
+        try:
+            deliver_digest(digest, client)
+        finally:
+            client.close()
+    return sent_count, rejected_count
+
+
+def run_pipeline(overlap: bool | None = None, resume: bool = False) -> tuple[int, int]:
+    """Daily-use combo: scrape + analyze (no send). Returns (new_posts, analyzed).
+
+    `overlap` (default: `pipeline.overlap`) analyzes posts while scraping.
+    `resume` continues the last incomplete scrape / analyze runs.
+    """
+    if settings.pipeline.overlap if overlap is None else overlap:
+        return run_overlapped(resume=resume)
+    new_posts = run_scrape(resume=resume)
+    analyzed = run_analyze(resume=resume)
     return new_posts, analyzed
 
 
-def run_all(dry_run: bool = False) -> tuple[int, int, int, int]:
+def run_all(
+    dry_run: bool = False, overlap: bool | None = None, resume: bool = False
+) -> tuple[int, int, int, int]:
     """Full pipeline. Returns (new_posts, analyzed, sent, rejected)."""
-    new_posts = run_scrape()
-    analyzed = run_analyze()
+    new_posts, analyzed = run_pipeline(overlap=overlap, resume=resume)
     sent, rejected = run_send(dry_run=dry_run)
     return new_posts, analyzed, sent, rejected
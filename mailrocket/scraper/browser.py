@@ -35,6 +35,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from mailrocket import timing
 from mailrocket.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -489,10 +490,10 @@ def perform_search(
         logger.warning("Ignoring unsupported date_posted=%r (allowed: %s)", date_posted, _VALID_DATE_POSTED)
 
     logger.info("Navigating to search URL: %s", url)
-    driver.get(url)
-
     try:
-        _find_first_present(driver, _SEARCH_RESULTS_SELECTORS, timeout=20)
+        with timing.span("scrape.search"):
+            driver.get(url)
+            _find_first_present(driver, _SEARCH_RESULTS_SELECTORS, timeout=20)
     except TimeoutException:
         logger.warning(
             "Search results did not render within 20s. URL=%s title=%r",
@@ -518,14 +519,16 @@ def initialize_and_login(username: str, password: str, headless: bool | None = N
     holds a LinkedIn session, we skip credentials. If headless is False and
     no creds are provided, the user is prompted to sign in manually.
     """
-    driver = setup_driver(headless=headless)
+    with timing.span("scrape.browser_start"):
+        driver = setup_driver(headless=headless)
     logger.info(
         "Browser initialized (headless=%s)",
         settings.scraper.headless if headless is None else headless,
     )
 
     try:
-        login_to_linkedin(driver, username, password)
+        with timing.span("scrape.login"):
+            login_to_linkedin(driver, username, password)
         time.sleep(2)
 
         if check_login_errors(driver):
@@ -8,6 +8,7 @@ from __future__ import annotations
 import logging
 import re
 import time
+from collections.abc import Callable, Iterable
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Generator, List, Optional
@@ -15,6 +16,7 @@ from typing import Dict, Generator, List, Optional
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 
+from mailrocket import metrics, timing
 from mailrocket.scraper.browser import dump_debug, initialize_and_login, perform_search
 from mailrocket.scraper.query_builder import FixedSizeStore, contains_email, read_queries_from_file
 from mailrocket.settings import settings
@@ -199,6 +201,7 @@ def scrape_linkedin_posts_for_query(
             By.XPATH, "//li[contains(@class, 'artdeco-card mb2')]"
         )
 
+    @timing.timed("scrape.scroll")
     def trigger_load_more(posts: List) -> None:
         """Try several strategies to nudge the lazy-column into loading more posts.
 
@@ -248,7 +251,8 @@ def scrape_linkedin_posts_for_query(
         dumped_stuck = False
 
         while scroll_attempts < max_attempts and total < max_results:
-            current_posts = get_visible_posts()
+            with timing.span("scrape.find_posts"):
+                current_posts = get_visible_posts()
             current_count = len(current_posts)
             new_count = current_count - previous_count
             logger.info("Visible posts=%d new=%d", current_count, new_count)
@@ -260,8 +264,11 @@ def scrape_linkedin_posts_for_query(
                     if total >= max_results:
                         break
                     try:
-                        post_html = post.get_attribute("outerHTML")
-                        post_data = parse_post_html(post_html)
+                        with timing.span("scrape.read_html"):
+                            post_html = post.get_attribute("outerHTML")
+                        with timing.span("scrape.parse"):
+                            post_data = parse_post_html(post_html)
+                        timing.incr("scrape.posts_seen")
 
                         if not post_data or not post_data.get("post_text"):
                             continue
@@ -273,12 +280,16 @@ def scrape_linkedin_posts_for_query(
                             continue
                         if link:
                             recent_posts_store.insert(link)
-                            if check_post_exists(link):
+                            with timing.span("scrape.db_check"):
+                                known = check_post_exists(link)
+                            if known:
                                 logger.info("Already in DB: %s", link)
+                                timing.incr("scrape.posts_already_stored")
                                 continue
 
                         post_data["query"] = query
                         logger.info("Yielding post: %s", link)
+                        timing.incr("scrape.posts_yielded")
                         yield post_data
                         total += 1
 
@@ -299,7 +310,9 @@ def scrape_linkedin_posts_for_query(
             trigger_load_more(current_posts)
 
     except Exception:
-        logger.exception("Scraping interrupted for query: %s", query)
+        # The caller decides what a failed query means (see scrape_linkedin_feed).
+        logger.warning("Scraping interrupted for query '%s' after %d posts", query, total)
+        raise
 
     logger.info("Finished query '%s' with %d posts", query, total)
 
@@ -308,24 +321,56 @@ def scrape_linkedin_feed(
     queries_file: Path | str | None = None,
     username: str | None = None,
     password: str | None = None,
+    *,
+    skip_queries: Iterable[str] = (),
+    already_yielded: dict[str, int] | None = None,
+    on_query_start: Callable[[int, str], None] | None = None,
+    on_query_done: Callable[[int, str], None] | None = None,
+    on_query_failed: Callable[[int, str], None] | None = None,
 ) -> Generator[Dict, None, None]:
-    """Top-level generator: log in once per query, yield parsed posts as they're found."""
+    """Top-level generator: log in once per query, yield parsed posts as they're found.
+
+    Resume hooks (see `pipeline.run_scrape`): queries in `skip_queries` are
+    not run; `already_yielded[query]` posts count against that query's
+    max_results. `on_query_done` fires only for queries that ran without error;
+    a query that raised (login, browser or page errors) gets `on_query_failed`
+    instead and the feed moves on to the next one.
+    """
     queries_file = Path(queries_file) if queries_file else settings.paths.queries
     username = username or settings.secrets.linkedin_username
     password = password or settings.secrets.linkedin_password
+    skip = set(skip_queries)
+    already_yielded = already_yielded or {}
 
     queries = read_queries_from_file(queries_file)
     logger.info("Loaded %d search queries from %s", len(queries), queries_file)
+    if skip:
+        logger.info("Skipping %d query(ies) finished by the resumed run", len(skip))
 
-    for query, max_results, sort_by_latest in queries:
+    for index, (query, max_results, sort_by_latest) in enumerate(queries):
+        if query in skip:
+            continue
+        remaining = max_results - already_yielded.get(query, 0)
+        if remaining <= 0:
+            if on_query_done is not None:
+                on_query_done(index, query)
+            continue
         driver = None
         try:
             logger.info("Processing query: '%s' - opening fresh browser", query)
+            if on_query_start is not None:
+                on_query_start(index, query)
             driver = initialize_and_login(username, password)
-            for post in scrape_linkedin_posts_for_query(driver, query, max_results, sort_by_latest):
+            for post in scrape_linkedin_posts_for_query(driver, query, remaining, sort_by_latest):
                 yield post
+            metrics.SCRAPE_QUERIES.inc(result="ok")
+            if on_query_done is not None:
+                on_query_done(index, query)
         except Exception:
+            metrics.SCRAPE_QUERIES.inc(result="failed")
             logger.exception("Failed to process query '%s'; moving on", query)
+            if on_query_failed is not None:
+                on_query_failed(index, query)
             continue
         finally:
             if driver:
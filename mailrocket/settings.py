@@ -21,6 +21,10 @@ from typing import Any
 
 import yaml
 
+# libyaml's loader is ~10x faster than the pure-Python one; every command
+# parses the config at import, so prefer it when PyYAML was built with it.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_DIR = REPO_ROOT / "config"
 
@@ -54,6 +58,8 @@ class EmailDefaults:
     self_review_mail: str
     subject_postfix: str
     body_closer: str
+    self_review_mode: str  # per_message | digest | off
+    self_review_report_dir: Path | None
 
 
 @dataclass(frozen=True)
@@ -88,6 +94,89 @@ class LLMConfig:
     mistral_temperature: float
     github_temperature: float
     few_shot: bool
+    streaming: bool
+    hedging: bool
+    hedge_max_per_minute: int
+    hedge_default_budget_seconds: float
+    hedge_min_budget_seconds: float
+    ledger: bool
+    mock_profiles: dict
+
+
+@dataclass(frozen=True)
+class DedupConfig:
+    enabled: bool
+    similarity_threshold: float
+    num_perm: int
+    lsh_bands: int
+    shingle_size: int
+
+
+@dataclass(frozen=True)
+class QueueConfig:
+    batch_size: int
+    lease_seconds: float
+    max_attempts: int
+    retry_delay_seconds: float
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    overlap: bool
+    analyze_workers: int
+    handoff_queue_size: int
+
+
+@dataclass(frozen=True)
+class DaemonConfig:
+    host: str
+    port: int
+    jobs: dict
+
+
+@dataclass(frozen=True)
+class SendConfig:
+    mode: str
+    batch_size: int
+    rate_per_second: float
+    burst: float
+    rate_limit_retries: int
+    concurrency: int
+    domain_rate_per_minute: float
+    domain_burst: float
+    max_attempts: int
+
+
+@dataclass(frozen=True)
+class SmtpConfig:
+    host: str
+    port: int
+    starttls: bool
+    ssl: bool
+    timeout_seconds: float
+    pipelining: bool
+    rate_per_second: float
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    kind: str  # gmail | smtp | maildir
+    smtp: SmtpConfig
+    maildir: Path
+
+
+@dataclass(frozen=True)
+class PerfConfig:
+    enabled: bool
+    print_report: bool
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    textfile: Path | None
+    pushgateway_url: str
+    job: str
+    push_timeout_seconds: float
 
 
 @dataclass(frozen=True)
@@ -102,6 +191,8 @@ class Secrets:
     github_token: str
     gmail_client_secret_path: Path
     gmail_token_path: Path
+    smtp_username: str
+    smtp_password: str
     langfuse_public_key: str
     langfuse_secret_key: str
     langfuse_host: str
@@ -116,6 +207,14 @@ class Settings:
     scraper: ScraperConfig
     logging: LoggingConfig
     llm: LLMConfig
+    dedup: DedupConfig
+    queue: QueueConfig
+    pipeline: PipelineConfig
+    daemon: DaemonConfig
+    send: SendConfig
+    transport: TransportConfig
+    perf: PerfConfig
+    metrics: MetricsConfig
     secrets: Secrets
 
 
@@ -123,7 +222,7 @@ def _load_yaml(path: Path) -> dict[str, Any]:
     if not path.exists():
         return {}
     with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+        data = yaml.load(f, Loader=_YamlLoader) or {}
     if not isinstance(data, dict):
         raise ValueError(f"Expected a mapping at top level of {path}, got {type(data)}")
     return data
@@ -160,10 +259,36 @@ def _env_override(env_name: str, current: Any) -> Any:
     return raw
 
 
+def _models_override(current: list[dict]) -> list[dict]:
+    """`MAILROCKET_LLM_MODELS="mock/fast,groq/llama-3.1-8b-instant"` replaces `llm.models`."""
+    raw = os.environ.get("MAILROCKET_LLM_MODELS")
+    if not raw:
+        return current
+    models = []
+    for item in raw.split(","):
+        provider, _, name = item.strip().partition("/")
+        if provider and name:
+            models.append({"provider": provider, "name": name})
+    return models
+
+
+def _choice(key: str, value: Any, allowed: tuple[str, ...]) -> str:
+    """`value` if it is one of `allowed`; a typo must not fall back silently."""
+    if value not in allowed:
+        raise ValueError(f"{key} must be one of {', '.join(allowed)}; got {value!r}")
+    return value
+
+
 def _load_config_dict() -> dict[str, Any]:
     example = _load_yaml(CONFIG_DIR / "config.example.yaml")
     user = _load_yaml(CONFIG_DIR / "config.yaml")
-    return _deep_merge(example, user)
+    merged = _deep_merge(example, user)
+    # `daemon.jobs` is a set of jobs, not defaults: the user's map replaces
+    # the example's so example jobs can't be added behind their back.
+    user_jobs = (user.get("daemon") or {}).get("jobs")
+    if user_jobs is not None:
+        merged["daemon"]["jobs"] = user_jobs
+    return merged
 
 
 def _load_secrets_dict() -> dict[str, Any]:
@@ -212,6 +337,14 @@ def load_settings() -> Settings:
         self_review_mail=_env_override("MAILROCKET_SELF_REVIEW_MAIL", email_cfg.get("self_review_mail", "")),
         subject_postfix=_env_override("MAILROCKET_SUBJECT_POSTFIX", email_cfg.get("subject_postfix", "")),
         body_closer=body_closer,
+        self_review_mode=_choice(
+            "email.self_review_mode",
+            _env_override("MAILROCKET_SELF_REVIEW_MODE", email_cfg.get("self_review_mode", "per_message")),
+            ("per_message", "digest", "off"),
+        ),
+        self_review_report_dir=_resolve_path(
+            _env_override("MAILROCKET_SELF_REVIEW_REPORT_DIR", email_cfg.get("self_review_report_dir")),
+        ),
     )
 
     filt_cfg = cfg.get("filters", {})
@@ -238,7 +371,7 @@ def load_settings() -> Settings:
 
     llm_cfg = cfg.get("llm", {})
     llm = LLMConfig(
-        models=tuple(llm_cfg.get("models", [])),
+        models=tuple(_models_override(llm_cfg.get("models", []))),
         groq_temperature=float(llm_cfg.get("groq_temperature", 0.4)),
         google_temperature=float(llm_cfg.get("google_temperature", 0.2)),
         openrouter_temperature=float(llm_cfg.get("openrouter_temperature", 0.4)),
@@ -246,11 +379,101 @@ def load_settings() -> Settings:
         mistral_temperature=float(llm_cfg.get("mistral_temperature", 0.4)),
         github_temperature=float(llm_cfg.get("github_temperature", 0.4)),
         few_shot=bool(_env_override("MAILROCKET_FEW_SHOT", llm_cfg.get("few_shot", False))),
+        streaming=bool(_env_override("MAILROCKET_LLM_STREAMING", llm_cfg.get("streaming", False))),
+        hedging=bool(_env_override("MAILROCKET_LLM_HEDGING", llm_cfg.get("hedging", False))),
+        hedge_max_per_minute=int(llm_cfg.get("hedge_max_per_minute", 4)),
+        hedge_default_budget_seconds=float(llm_cfg.get("hedge_default_budget_seconds", 20)),
+        hedge_min_budget_seconds=float(llm_cfg.get("hedge_min_budget_seconds", 3)),
+        ledger=bool(_env_override("MAILROCKET_LLM_LEDGER", llm_cfg.get("ledger", True))),
+        mock_profiles=dict(llm_cfg.get("mock_profiles") or {}),
+    )
+
+    dedup_cfg = cfg.get("dedup", {})
+    dedup = DedupConfig(
+        enabled=bool(_env_override("MAILROCKET_DEDUP_ENABLED", dedup_cfg.get("enabled", True))),
+        similarity_threshold=float(_env_override("MAILROCKET_DEDUP_SIMILARITY_THRESHOLD", dedup_cfg.get("similarity_threshold", 0.75))),
+        num_perm=int(dedup_cfg.get("num_perm", 128)),
+        lsh_bands=int(dedup_cfg.get("lsh_bands", 32)),
+        shingle_size=int(dedup_cfg.get("shingle_size", 3)),
+    )
+
+    queue_cfg = cfg.get("queue", {})
+    queue = QueueConfig(
+        batch_size=int(_env_override("MAILROCKET_QUEUE_BATCH_SIZE", queue_cfg.get("batch_size", 5))),
+        lease_seconds=float(_env_override("MAILROCKET_QUEUE_LEASE_SECONDS", queue_cfg.get("lease_seconds", 600))),
+        max_attempts=int(_env_override("MAILROCKET_QUEUE_MAX_ATTEMPTS", queue_cfg.get("max_attempts", 3))),
+        retry_delay_seconds=float(queue_cfg.get("retry_delay_seconds", 300)),
+    )
+
+    pipe_cfg = cfg.get("pipeline", {})
+    pipeline = PipelineConfig(
+        overlap=bool(_env_override("MAILROCKET_PIPELINE_OVERLAP", pipe_cfg.get("overlap", False))),
+        analyze_workers=int(_env_override("MAILROCKET_PIPELINE_ANALYZE_WORKERS", pipe_cfg.get("analyze_workers", 2))),
+        handoff_queue_size=int(pipe_cfg.get("handoff_queue_size", 10)),
+    )
+
+    daemon_cfg = cfg.get("daemon", {})
+    daemon = DaemonConfig(
+        host=_env_override("MAILROCKET_DAEMON_HOST", daemon_cfg.get("host", "127.0.0.1")),
+        port=int(_env_override("MAILROCKET_DAEMON_PORT", daemon_cfg.get("port", 8766))),
+        jobs=dict(daemon_cfg.get("jobs") or {}),
+    )
+
+    send_cfg = cfg.get("send", {})
+    send = SendConfig(
+        mode=_choice(
+            "send.mode",
+            _env_override("MAILROCKET_SEND_MODE", send_cfg.get("mode", "sequential")),
+            ("sequential", "batch", "concurrent"),
+        ),
+        batch_size=max(1, min(100, int(send_cfg.get("batch_size", 50)))),
+        rate_per_second=float(_env_override("MAILROCKET_SEND_RATE_PER_SECOND", send_cfg.get("rate_per_second", 2.0))),
+        burst=float(send_cfg.get("burst", 5)),
+        rate_limit_retries=int(send_cfg.get("rate_limit_retries", 2)),
+        concurrency=max(1, min(16, int(_env_override("MAILROCKET_SEND_CONCURRENCY", send_cfg.get("concurrency", 4))))),
+        domain_rate_per_minute=float(_env_override("MAILROCKET_SEND_DOMAIN_RATE_PER_MINUTE", float(send_cfg.get("domain_rate_per_minute", 6)))),
+        domain_burst=float(send_cfg.get("domain_burst", 2)),
+        max_attempts=max(1, int(send_cfg.get("max_attempts", 3))),
+    )
+
+    transport_cfg = cfg.get("transport", {})
+    smtp_cfg = transport_cfg.get("smtp", {}) or {}
+    transport = TransportConfig(
+        kind=_choice(
+            "transport.kind",
+            _env_override("MAILROCKET_TRANSPORT", transport_cfg.get("kind", "gmail")),
+            ("gmail", "smtp", "maildir"),
+        ),
+        smtp=SmtpConfig(
+            host=_env_override("MAILROCKET_SMTP_HOST", smtp_cfg.get("host", "localhost")),
+            port=int(_env_override("MAILROCKET_SMTP_PORT", smtp_cfg.get("port", 587))),
+            starttls=bool(_env_override("MAILROCKET_SMTP_STARTTLS", bool(smtp_cfg.get("starttls", True)))),
+            ssl=bool(smtp_cfg.get("ssl", False)),
+            timeout_seconds=float(smtp_cfg.get("timeout_seconds", 30)),
+            pipelining=bool(_env_override("MAILROCKET_SMTP_PIPELINING", bool(smtp_cfg.get("pipelining", True)))),
+            rate_per_second=float(smtp_cfg.get("rate_per_second", 0)),
+        ),
+        maildir=_resolve_path(_env_override("MAILROCKET_MAILDIR", transport_cfg.get("maildir", "data/outbox_maildir"))),
+    )
+
+    perf_cfg = cfg.get("perf", {})
+    perf = PerfConfig(
+        enabled=bool(_env_override("MAILROCKET_PERF_ENABLED", perf_cfg.get("enabled", True))),
+        print_report=bool(_env_override("MAILROCKET_PERF_PRINT_REPORT", perf_cfg.get("print_report", True))),
+    )
+
+    metrics_cfg = cfg.get("metrics", {})
+    metrics = MetricsConfig(
+        textfile=_resolve_path(_env_override("MAILROCKET_METRICS_TEXTFILE", metrics_cfg.get("textfile"))),
+        pushgateway_url=_env_override("MAILROCKET_METRICS_PUSHGATEWAY_URL", metrics_cfg.get("pushgateway_url") or ""),
+        job=metrics_cfg.get("job", "mailrocket"),
+        push_timeout_seconds=float(metrics_cfg.get("push_timeout_seconds", 5)),
     )
 
     li = sec.get("linkedin", {}) or {}
     gm = sec.get("gmail", {}) or {}
     lf = sec.get("langfuse", {}) or {}
+    smtp_sec = sec.get("smtp", {}) or {}
     secrets = Secrets(
         linkedin_username=_env_override("MAILROCKET_SECRET_LINKEDIN_USERNAME", li.get("username", "")),
         linkedin_password=_env_override("MAILROCKET_SECRET_LINKEDIN_PASSWORD", li.get("password", "")),
@@ -262,6 +485,8 @@ def load_settings() -> Settings:
         github_token=_env_override("MAILROCKET_SECRET_GITHUB_TOKEN", sec.get("github_token", "")),
         gmail_client_secret_path=_resolve_path(_env_override("MAILROCKET_SECRET_GMAIL_CLIENT_SECRET_PATH", gm.get("client_secret_path", "data/gmail/client_secret.json"))),
         gmail_token_path=_resolve_path(_env_override("MAILROCKET_SECRET_GMAIL_TOKEN_PATH", gm.get("token_path", "data/gmail/token.json"))),
+        smtp_username=_env_override("MAILROCKET_SECRET_SMTP_USERNAME", smtp_sec.get("username", "")),
+        smtp_password=_env_override("MAILROCKET_SECRET_SMTP_PASSWORD", smtp_sec.get("password", "")),
         langfuse_public_key=_env_override("MAILROCKET_SECRET_LANGFUSE_PUBLIC_KEY", lf.get("public_key", "")),
         langfuse_secret_key=_env_override("MAILROCKET_SECRET_LANGFUSE_SECRET_KEY", lf.get("secret_key", "")),
         langfuse_host=_env_override("MAILROCKET_SECRET_LANGFUSE_HOST", lf.get("host", "https://cloud.langfuse.com")),
@@ -275,6 +500,14 @@ def load_settings() -> Settings:
         scraper=scraper,
         logging=logging_cfg,
         llm=llm,
+        dedup=dedup,
+        queue=queue,
+        pipeline=pipeline,
+        daemon=daemon,
+        send=send,
+        transport=transport,
+        perf=perf,
+        metrics=metrics,
         secrets=secrets,
     )
 
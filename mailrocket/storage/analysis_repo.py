@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any
 
 from mailrocket.storage.connection import get_conn
+from mailrocket.storage.jobs_repo import finish_claim
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +17,13 @@ def insert_analysis(
     analysis_list: list[dict],
     model_used: str | None = None,
     db_path: Path | None = None,
+    lease_owner: str | None = None,
 ) -> int:
     """Insert analysis rows for a given post and mark the post analysed.
 
-    Returns the number of rows inserted.
+    With `lease_owner`, the post's `analysis_jobs` claim is completed in the
+    same transaction; if that worker no longer holds it, nothing is written
+    and `LeaseLostError` is raised. Returns the number of rows inserted.
     """
     if not isinstance(analysis_list, list):
         raise TypeError(
@@ -34,6 +38,8 @@ def insert_analysis(
     inserted = 0
     with get_conn(db_path) as conn:
         cur = conn.cursor()
+        if lease_owner is not None:
+            finish_claim(cur, post_uid, lease_owner)
         for a in analysis_list:
             resolved_model = model_used or a.get("model_name", "unknown")
             cur.execute(
@@ -70,6 +76,53 @@ def insert_analysis(
     return inserted
 
 
+def copy_analysis_from(
+    post_uid: int,
+    source_uid: int,
+    db_path: Path | None = None,
+    lease_owner: str | None = None,
+) -> int:
+    """Reuse the latest analysis of near-duplicate `source_uid` for `post_uid`.
+
+    The copy is stored with mail_sent = 0 so the same job is not mailed twice,
+    and `model_used = "duplicate-of:<source_uid>"` so the UI shows where it came
+    from. Marks `post_uid` analysed. Returns the number of rows copied (0 if the
+    source has no analysis yet, in which case nothing is changed).
+    `lease_owner` completes the post's queue claim as in `insert_analysis`.
+    """
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO post_analysis (
+                post_uid, match_percentage, experience_gap,
+                contact_email, contact_number, application_link,
+                company_name, should_apply, subject, body,
+                mail_sent, full_analysis_json, model_used
+            )
+            SELECT
+                ?, match_percentage, experience_gap,
+                contact_email, contact_number, application_link,
+                company_name, should_apply, subject, body,
+                0, full_analysis_json, ?
+            FROM post_analysis
+            WHERE post_uid = ?
+            ORDER BY analysis_id DESC LIMIT 1;
+            """,
+            (post_uid, f"duplicate-of:{source_uid}", source_uid),
+        )
+        copied = cur.rowcount
+        if copied and lease_owner is not None:
+            finish_claim(cur, post_uid, lease_owner)
+        if copied:
+            cur.execute("UPDATE linkedin_posts SET analysed = 1 WHERE uid = ?;", (post_uid,))
+        cur.close()
+
+    if copied:
+        logger.info("Copied analysis of post_uid=%d to near-duplicate post_uid=%d", source_uid, post_uid)
+    return copied
+
+
 def fetch_pending_emails(db_path: Path | None = None) -> list[dict]:
     """Return joined rows for analyses where mail_sent = -1 (i.e. not yet attempted)."""
     sql = """
@@ -86,15 +139,21 @@ def fetch_pending_emails(db_path: Path | None = None) -> list[dict]:
     return rows
 
 
-def mark_mail_sent(analysis_id: int, sent: bool, db_path: Path | None = None) -> None:
-    """Set `mail_sent` to 1 (sent) or 0 (rejected/failed)."""
+def mark_mail_sent(analysis_id: int, sent: bool, db_path: Path | None = None) -> bool:
+    """Set `mail_sent` to 1 (sent) or 0 (rejected/failed) on a pending row.
+
+    Idempotent: a row whose outcome is already recorded is left alone.
+    Returns False in that case.
+    """
     with get_conn(db_path) as conn:
         cur = conn.cursor()
         cur.execute(
-            "UPDATE post_analysis SET mail_sent = ? WHERE analysis_id = ?;",
+            "UPDATE post_analysis SET mail_sent = ? WHERE analysis_id = ? AND mail_sent = -1;",
             (1 if sent else 0, analysis_id),
         )
+        changed = cur.rowcount > 0
         cur.close()
+    return changed
 
 
 def count_unsent(db_path: Path | None = None) -> int:
@@ -0,0 +1,47 @@
+"""Per-table write counters (`change_counters`) and the row change feed (`change_log`).
+
+Triggers bump a table's counter on every insert, update and delete, from
+any process. A reader that caches something derived from the table keeps
+the version it was computed at, and recomputes once the version moves.
+
+`change_log` says *which* posts changed: one row per new post, new or
+edited analysis and mail status change, tailed by the UI's live updates.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+from mailrocket.storage.connection import get_conn
+
+
+def change_versions(db_path: Path | None = None) -> dict[str, int]:
+    """{table name: version} for every counted table."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT name, version FROM change_counters;")
+        versions = {r["name"]: r["version"] for r in cur.fetchall()}
+        cur.close()
+    return versions
+
+
+def latest_change_seq(db_path: Path | None = None) -> int:
+    """Sequence number of the newest `change_log` row (0 if empty)."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log;")
+        seq = cur.fetchone()[0]
+        cur.close()
+    return seq
+
+
+def changes_since(seq: int, limit: int = 500, db_path: Path | None = None) -> list[dict]:
+    """`change_log` rows after `seq`, oldest first: [{"seq", "kind", "post_uid"}, ...]."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT seq, kind, post_uid FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?;",
+            (int(seq), int(limit)),
+        )
+        rows = [dict(r) for r in cur.fetchall()]
+        cur.close()
+    return rows
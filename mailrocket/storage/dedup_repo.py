@@ -0,0 +1,114 @@
+"""Near-duplicate index over `linkedin_posts.post_text` (`post_minhash` + `post_lsh_buckets`).
+
+Each inserted post gets a MinHash signature and one bucket row per LSH band.
+Posts sharing a bucket are candidates; the candidate with the highest
+estimated similarity at or above `dedup.similarity_threshold` becomes the
+post's `duplicate_of`, always pointing at the cluster representative (the
+oldest post of the cluster), so the analyze stage only has to look one hop.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+from pathlib import Path
+
+from mailrocket.settings import settings
+from mailrocket.storage import minhash
+from mailrocket.storage.connection import get_conn
+
+logger = logging.getLogger(__name__)
+
+
+def index_post(
+    cur: sqlite3.Cursor,
+    post_uid: int,
+    post_text: str | None,
+) -> int | None:
+    """Index one post on an open cursor; returns its representative uid or None.
+
+    Runs inside the caller's transaction so the post row and its index rows
+    commit (or roll back) together.
+    """
+    cfg = settings.dedup
+    sig = minhash.signature(
+        post_text or "", num_perm=cfg.num_perm, shingle_size=cfg.shingle_size
+    )
+    if sig is None:
+        return None
+    keys = minhash.band_keys(sig, cfg.lsh_bands)
+
+    candidates: set[int] = set()
+    for band, key in enumerate(keys):
+        cur.execute(
+            "SELECT post_uid FROM post_lsh_buckets WHERE band = ? AND bucket = ?;",
+            (band, key),
+        )
+        candidates.update(r[0] for r in cur.fetchall() if r[0] != post_uid)
+
+    best_uid: int | None = None
+    best_sim = 0.0
+    for uid in sorted(candidates):
+        cur.execute(
+            "SELECT signature, duplicate_of FROM post_minhash WHERE post_uid = ?;",
+            (uid,),
+        )
+        row = cur.fetchone()
+        if row is None:
+            continue
+        sim = minhash.estimate_similarity(sig, minhash.from_blob(row[0]))
+        if sim >= cfg.similarity_threshold and sim > best_sim:
+            best_sim = sim
+            best_uid = row[1] if row[1] is not None else uid
+
+    cur.execute(
+        """
+        INSERT OR REPLACE INTO post_minhash (post_uid, signature, duplicate_of, similarity)
+        VALUES (?, ?, ?, ?);
+        """,
+        (post_uid, minhash.to_blob(sig), best_uid, best_sim if best_uid is not None else None),
+    )
+    cur.execute("DELETE FROM post_lsh_buckets WHERE post_uid = ?;", (post_uid,))
+    cur.executemany(
+        "INSERT OR IGNORE INTO post_lsh_buckets (band, bucket, post_uid) VALUES (?, ?, ?);",
+        [(band, key, post_uid) for band, key in enumerate(keys)],
+    )
+
+    if best_uid is not None:
+        logger.info(
+            "Post uid=%d is a near-duplicate of uid=%d (similarity %.2f)",
+            post_uid, best_uid, best_sim,
+        )
+    return best_uid
+
+
+def find_representative(post_uid: int, db_path: Path | None = None) -> int | None:
+    """Return the cluster representative uid for `post_uid`, or None if it's unique."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT duplicate_of FROM post_minhash WHERE post_uid = ?;", (post_uid,))
+        row = cur.fetchone()
+        cur.close()
+    return row[0] if row else None
+
+
+def reindex_all(db_path: Path | None = None) -> tuple[int, int]:
+    """Rebuild the index for every post in uid order. Returns (indexed, duplicates).
+
+    Needed once for DBs that predate the index, and after changing
+    `num_perm`, `lsh_bands` or `shingle_size` (old signatures are incomparable).
+    """
+    indexed = 0
+    duplicates = 0
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM post_lsh_buckets;")
+        cur.execute("DELETE FROM post_minhash;")
+        cur.execute("SELECT uid, post_text FROM linkedin_posts ORDER BY uid;")
+        posts = cur.fetchall()
+        for row in posts:
+            if index_post(cur, row["uid"], row["post_text"]) is not None:
+                duplicates += 1
+            indexed += 1
+        cur.close()
+    logger.info("Re-indexed %d post(s); %d near-duplicate(s)", indexed, duplicates)
+    return indexed, duplicates
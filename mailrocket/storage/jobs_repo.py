@@ -0,0 +1,303 @@
+"""Lease-based work queue for the analyze stage (`analysis_jobs` table).
+
+Any number of `analyze` processes, on one machine or several sharing the DB
+file, can run at once:
+
+    claim_batch     take up to N unclaimed posts under a lease (BEGIN IMMEDIATE,
+                    so two workers never get the same post)
+    start_attempt   count an attempt on one post as its processing starts
+    extend_leases   keep the rest of a batch claimed while working through it
+    finish_claim    called inside the transaction that stores the analysis;
+                    raises `LeaseLostError` (rolling the insert back) if the
+                    lease expired and the post was handed to someone else
+    release_claim   give a failed post back for a retry after a delay, or park
+                    it once it has used `max_attempts`
+    return_claims   hand posts back untouched when a run stops early (Ctrl-C)
+
+A worker that dies simply stops renewing; its posts become claimable again
+when the lease runs out. Attempts are counted per post when work on it
+starts, not at claim time, so only the post a worker died on is charged.
+Expired leases that already used every attempt are parked instead of
+retried, so one poison post can't crash every worker while its batch-mates
+go through.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from mailrocket.storage.connection import get_conn
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when a worker tries to complete a post it no longer holds."""
+
+
+def new_worker_id() -> str:
+    """`host:pid:random`, unique per analyze run."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def claim_batch(
+    worker_id: str,
+    batch_size: int,
+    lease_seconds: float,
+    max_attempts: int,
+    db_path: Path | None = None,
+    *,
+    only_uids: list[int] | None = None,
+) -> list[dict]:
+    """Claim up to `batch_size` posts for `worker_id`; returns the post rows (uid order).
+
+    `only_uids` restricts the claim to those posts (e.g. ones just scraped).
+    """
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        # Enqueue new posts; drop jobs whose post got analysed some other way.
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO analysis_jobs (post_uid)
+            SELECT uid FROM linkedin_posts WHERE analysed = 0;
+            """
+        )
+        cur.execute(
+            """
+            DELETE FROM analysis_jobs
+            WHERE post_uid IN (
+                SELECT j.post_uid FROM analysis_jobs j
+                JOIN linkedin_posts lp ON lp.uid = j.post_uid
+                WHERE lp.analysed = 1
+            );
+            """
+        )
+        # Expired leases with no attempts left: the worker died on this post
+        # every time. Park rather than hand it out again.
+        cur.execute(
+            """
+            UPDATE analysis_jobs
+            SET parked_at = ?, claimed_by = NULL, lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'lease expired')
+            WHERE parked_at IS NULL AND attempts >= ?
+              AND (lease_expires_at IS NULL OR lease_expires_at <= ?);
+            """,
+            (now, max_attempts, now),
+        )
+        parked = cur.rowcount
+        only = ""
+        if only_uids:
+            only = f"AND post_uid IN ({', '.join('?' * len(only_uids))})"
+        cur.execute(
+            f"""
+            SELECT post_uid FROM analysis_jobs
+            WHERE parked_at IS NULL
+              AND (lease_expires_at IS NULL OR lease_expires_at <= ?)
+              {only}
+            ORDER BY post_uid
+            LIMIT ?;
+            """,
+            (now, *(only_uids or ()), batch_size),
+        )
+        uids = [r["post_uid"] for r in cur.fetchall()]
+        rows: list[dict] = []
+        if uids:
+            marks = ", ".join("?" * len(uids))
+            cur.execute(
+                f"""
+                UPDATE analysis_jobs
+                SET claimed_by = ?, lease_expires_at = ?
+                WHERE post_uid IN ({marks});
+                """,
+                (worker_id, now + lease_seconds, *uids),
+            )
+            cur.execute(f"SELECT * FROM linkedin_posts WHERE uid IN ({marks}) ORDER BY uid;", uids)
+            rows = [dict(r) for r in cur.fetchall()]
+        cur.close()
+
+    if parked:
+        logger.warning("Parked %d post(s) whose leases expired after %d attempts", parked, max_attempts)
+    for r in rows:
+        if r.get("other_data"):
+            try:
+                r["other_data"] = json.loads(r["other_data"])
+            except json.JSONDecodeError:
+                pass
+    return rows
+
+
+def start_attempt(
+    post_uid: int,
+    worker_id: str,
+    lease_seconds: float,
+    db_path: Path | None = None,
+) -> bool:
+    """Count an attempt on `post_uid` and renew its lease, right before working on it.
+
+    False if `worker_id` no longer holds the post.
+    """
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE analysis_jobs SET attempts = attempts + 1, lease_expires_at = ?
+            WHERE post_uid = ? AND claimed_by = ?;
+            """,
+            (time.time() + lease_seconds, post_uid, worker_id),
+        )
+        started = cur.rowcount > 0
+        cur.close()
+    return started
+
+
+def extend_leases(
+    worker_id: str,
+    uids: list[int],
+    lease_seconds: float,
+    db_path: Path | None = None,
+) -> int:
+    """Push the lease of `worker_id`'s posts in `uids` out to now + lease_seconds."""
+    if not uids:
+        return 0
+    marks = ", ".join("?" * len(uids))
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            UPDATE analysis_jobs SET lease_expires_at = ?
+            WHERE claimed_by = ? AND post_uid IN ({marks});
+            """,
+            (time.time() + lease_seconds, worker_id, *uids),
+        )
+        renewed = cur.rowcount
+        cur.close()
+    return renewed
+
+
+def finish_claim(cur: sqlite3.Cursor, post_uid: int, worker_id: str) -> None:
+    """Delete `post_uid`'s job on the caller's transaction, if `worker_id` still holds it.
+
+    Raises `LeaseLostError` otherwise, so the caller's writes roll back.
+    """
+    cur.execute(
+        "DELETE FROM analysis_jobs WHERE post_uid = ? AND claimed_by = ?;",
+        (post_uid, worker_id),
+    )
+    if cur.rowcount == 0:
+        raise LeaseLostError(f"post_uid={post_uid} is no longer leased to {worker_id}")
+
+
+def return_claims(worker_id: str, uids: list[int], db_path: Path | None = None) -> int:
+    """Make `worker_id`'s posts in `uids` claimable again right away.
+
+    For a run that stops before working on them: no attempt is counted and
+    no retry delay applies. Returns how many were still held.
+    """
+    if not uids:
+        return 0
+    marks = ", ".join("?" * len(uids))
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            UPDATE analysis_jobs SET claimed_by = NULL, lease_expires_at = NULL
+            WHERE claimed_by = ? AND post_uid IN ({marks});
+            """,
+            (worker_id, *uids),
+        )
+        returned = cur.rowcount
+        cur.close()
+    return returned
+
+
+def release_claim(
+    post_uid: int,
+    worker_id: str,
+    error: str | None,
+    *,
+    max_attempts: int,
+    retry_delay_seconds: float,
+    db_path: Path | None = None,
+) -> bool:
+    """Give a failed post back. Returns True if it was parked (attempts exhausted)."""
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE analysis_jobs
+            SET claimed_by = NULL,
+                lease_expires_at = ?,
+                last_error = ?,
+                parked_at = CASE WHEN attempts >= ? THEN ? END
+            WHERE post_uid = ? AND claimed_by = ?;
+            """,
+            (now + retry_delay_seconds, (error or "")[:500] or None, max_attempts, now,
+             post_uid, worker_id),
+        )
+        released = cur.rowcount
+        cur.execute("SELECT parked_at FROM analysis_jobs WHERE post_uid = ?;", (post_uid,))
+        row = cur.fetchone()
+        cur.close()
+    parked = bool(released) and row is not None and row["parked_at"] is not None
+    if parked:
+        logger.warning("Parked post uid=%s after %d failed attempts", post_uid, max_attempts)
+    return parked
+
+
+def queue_status(db_path: Path | None = None) -> dict[str, Any]:
+    """Counts of queued / leased / waiting-to-retry / parked jobs, plus the parked rows."""
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT
+                SUM(parked_at IS NULL AND claimed_by IS NULL
+                    AND (lease_expires_at IS NULL OR lease_expires_at <= ?)) AS ready,
+                SUM(parked_at IS NULL AND claimed_by IS NOT NULL AND lease_expires_at > ?) AS leased,
+                SUM(parked_at IS NULL AND claimed_by IS NULL AND lease_expires_at > ?) AS retry_wait,
+                SUM(parked_at IS NULL AND claimed_by IS NOT NULL AND lease_expires_at <= ?) AS expired,
+                SUM(parked_at IS NOT NULL) AS parked
+            FROM analysis_jobs;
+            """,
+            (now, now, now, now),
+        )
+        counts = {k: int(v or 0) for k, v in dict(cur.fetchone()).items()}
+        cur.execute(
+            """
+            SELECT post_uid, attempts, last_error, parked_at
+            FROM analysis_jobs WHERE parked_at IS NOT NULL ORDER BY post_uid;
+            """
+        )
+        counts["parked_posts"] = [dict(r) for r in cur.fetchall()]
+        cur.close()
+    return counts
+
+
+def requeue_parked(post_uid: int | None = None, db_path: Path | None = None) -> int:
+    """Un-park one post (or all of them) with a fresh attempt count."""
+    sql = """
+        UPDATE analysis_jobs
+        SET parked_at = NULL, attempts = 0, claimed_by = NULL, lease_expires_at = NULL
+        WHERE parked_at IS NOT NULL
+    """
+    params: tuple[Any, ...] = ()
+    if post_uid is not None:
+        sql += " AND post_uid = ?"
+        params = (post_uid,)
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(sql + ";", params)
+        n = cur.rowcount
+        cur.close()
+    return n
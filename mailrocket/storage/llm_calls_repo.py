@@ -0,0 +1,181 @@
+"""Ledger of every LLM attempt (`llm_calls` table) + the aggregates behind `mailrocket stats llm`.
+
+`record_llm_call(row)` is called from the analyzer hot path, so it only
+enqueues. A single daemon thread drains the queue and writes rows in
+batches (`executemany` in one transaction), flushing every
+`_FLUSH_EVERY` rows or `_FLUSH_INTERVAL_SECONDS`, and once more at exit.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from mailrocket.storage.connection import get_conn
+from mailrocket.timing import percentile
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS: tuple[str, ...] = (
+    "run_id",
+    "started_at",
+    "provider",
+    "model",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "latency_ms",
+    "outcome",
+    "schema_valid",
+    "error",
+    "post_uid",
+    "prompt_version",
+)
+
+_FLUSH_EVERY = 50
+_FLUSH_INTERVAL_SECONDS = 2.0
+_STOP = object()
+
+
+class _BatchWriter:
+    def __init__(self, db_path: Path | None = None) -> None:
+        self._db_path = db_path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="llm-ledger", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: dict[str, Any]) -> None:
+        self._queue.put(row)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        from mailrocket.storage.schema import init_db
+
+        try:
+            init_db(self._db_path)
+        except Exception:
+            logger.exception("LLM ledger could not initialise the DB; ledger disabled")
+            return
+
+        batch: list[dict[str, Any]] = []
+        deadline = time.monotonic() + _FLUSH_INTERVAL_SECONDS
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= _FLUSH_EVERY or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + _FLUSH_INTERVAL_SECONDS
+
+    def _flush(self, batch: list[dict[str, Any]]) -> None:
+        if not batch:
+            return
+        sql = (
+            f"INSERT INTO llm_calls ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(_COLUMNS))});"
+        )
+        try:
+            with get_conn(self._db_path) as conn:
+                conn.executemany(sql, [tuple(r.get(c) for c in _COLUMNS) for r in batch])
+        except Exception:
+            logger.exception("Failed to write %d LLM ledger row(s)", len(batch))
+
+
+_WRITER: _BatchWriter | None = None
+_WRITER_LOCK = threading.Lock()
+
+
+def record_llm_call(row: dict[str, Any]) -> None:
+    """Queue one `llm_calls` row (keys from `_COLUMNS`; missing keys become NULL)."""
+    global _WRITER
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                _WRITER = _BatchWriter()
+                atexit.register(flush_llm_calls)
+    _WRITER.submit(row)
+
+
+def flush_llm_calls() -> None:
+    """Write everything queued so far and stop the writer (a new one starts on demand)."""
+    global _WRITER
+    with _WRITER_LOCK:
+        writer, _WRITER = _WRITER, None
+    if writer is not None:
+        writer.close()
+
+
+def llm_call_stats(since_seconds: float, db_path: Path | None = None) -> list[dict[str, Any]]:
+    """Per-model aggregates over the last `since_seconds`, busiest model first.
+
+    Keys: provider, model, calls, ok, failed, failure_rate, calls_per_hour,
+    p50_ms, p95_ms (latency of successful calls), prompt_tokens,
+    completion_tokens, cached_tokens, outcomes (dict outcome -> count).
+    """
+    cutoff = time.time() - since_seconds
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT provider, model, outcome, latency_ms,
+                   COALESCE(prompt_tokens, 0) AS prompt_tokens,
+                   COALESCE(completion_tokens, 0) AS completion_tokens,
+                   COALESCE(cached_tokens, 0) AS cached_tokens
+            FROM llm_calls
+            WHERE started_at >= ?;
+            """,
+            (cutoff,),
+        )
+        rows = cur.fetchall()
+        cur.close()
+
+    hours = max(since_seconds / 3600, 1e-9)
+    by_model: dict[tuple[str, str], dict[str, Any]] = {}
+    for r in rows:
+        key = (r["provider"], r["model"])
+        agg = by_model.setdefault(key, {
+            "provider": r["provider"],
+            "model": r["model"],
+            "calls": 0,
+            "ok": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+            "outcomes": {},
+            "_latencies": [],
+        })
+        agg["calls"] += 1
+        agg["outcomes"][r["outcome"]] = agg["outcomes"].get(r["outcome"], 0) + 1
+        agg["prompt_tokens"] += r["prompt_tokens"]
+        agg["completion_tokens"] += r["completion_tokens"]
+        agg["cached_tokens"] += r["cached_tokens"]
+        if r["outcome"] == "ok":
+            agg["ok"] += 1
+            if r["latency_ms"] is not None:
+                agg["_latencies"].append(r["latency_ms"])
+
+    out: list[dict[str, Any]] = []
+    for agg in by_model.values():
+        latencies = sorted(agg.pop("_latencies"))
+        agg["failed"] = agg["calls"] - agg["ok"]
+        agg["failure_rate"] = agg["failed"] / agg["calls"]
+        agg["calls_per_hour"] = agg["calls"] / hours
+        agg["p50_ms"] = percentile(latencies, 50)
+        agg["p95_ms"] = percentile(latencies, 95)
+        out.append(agg)
+    out.sort(key=lambda a: a["calls"], reverse=True)
+    return out
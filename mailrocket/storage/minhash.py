@@ -0,0 +1,106 @@
+"""MinHash signatures + LSH banding for near-duplicate post detection.
+
+Pure functions, no I/O. `dedup_repo` persists what this module computes.
+
+The same job is often reposted by several recruiters with small edits
+(different greeting, signature, contact line). Exact `post_link` matching
+can't catch those, but the word-shingle Jaccard similarity of the two texts
+stays high. MinHash estimates that similarity from fixed-size signatures,
+and LSH banding turns "find similar signatures" into equality lookups on a
+handful of bucket keys, which is an indexed query in SQLite.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+import zlib
+from array import array
+from functools import lru_cache
+
+# Mersenne prime larger than any 32-bit shingle hash.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SEED = 0x6D61696C  # fixed so signatures are stable across processes
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop URLs and punctuation, collapse whitespace."""
+    text = _URL_RE.sub(" ", (text or "").lower())
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def shingles(text: str, size: int) -> set[int]:
+    """Return the set of hashed word `size`-grams of the normalised text.
+
+    Texts shorter than `size` words yield a single shingle of the whole text
+    so short posts still get a signature.
+    """
+    words = normalize_text(text).split()
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> tuple[tuple[int, int], ...]:
+    rng = random.Random(_SEED)
+    return tuple(
+        (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)
+    )
+
+
+def signature(text: str, *, num_perm: int, shingle_size: int) -> array | None:
+    """Compute the MinHash signature (`num_perm` unsigned 32-bit ints).
+
+    Returns None for empty text; those posts are never considered duplicates.
+    """
+    hashed = shingles(text, shingle_size)
+    if not hashed:
+        return None
+    sig = array("I")
+    for a, b in _permutations(num_perm):
+        sig.append(min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashed))
+    return sig
+
+
+def to_blob(sig: array) -> bytes:
+    return struct.pack(f"<{len(sig)}I", *sig)
+
+
+def from_blob(blob: bytes) -> array:
+    return array("I", struct.unpack(f"<{len(blob) // 4}I", blob))
+
+
+def band_keys(sig: array, bands: int) -> list[int]:
+    """Split `sig` into `bands` equal rows and hash each into a signed 63-bit key.
+
+    Two posts become LSH candidates if any band key matches. With `r` rows
+    per band, the probability of that is `1 - (1 - s**r)**bands` for true
+    similarity `s`.
+    """
+    if bands <= 0 or len(sig) % bands:
+        raise ValueError(f"num_perm={len(sig)} is not divisible by lsh_bands={bands}")
+    rows = len(sig) // bands
+    keys: list[int] = []
+    for i in range(bands):
+        chunk = struct.pack(f"<{rows}I", *sig[i * rows:(i + 1) * rows])
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little") >> 1)
+    return keys
+
+
+def estimate_similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity: the fraction of equal signature slots."""
+    if len(a) != len(b) or not a:
+        return 0.0
+    return sum(1 for x, y in zip(a, b, strict=True) if x == y) / len(a)
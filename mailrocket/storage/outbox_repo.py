@@ -0,0 +1,212 @@
+"""Per-recipient send log (`outbox` table) for exactly-once delivery.
+
+Every draft gets one row per recipient, plus one for its self-review copy
+(`email.self_review_mode: per_message`),
+keyed by an idempotency key derived from (analysis_id, kind, recipient).
+The sender claims a row right before the API call:
+
+    pending -> sending   claim
+    sending -> sent      Gmail accepted it (message id stored)
+    sending -> pending   it certainly didn't go out and may later (rate
+                         limit, connect failure, SMTP 4xx), until
+                         `send.max_attempts` claims have been used -> failed
+    sending -> failed    permanent error (e.g. invalid address)
+    sending -> unknown   it may have gone out: no verdict after the message
+                         was handed over (`mark_unknown`: 5xx, timeout,
+                         dropped connection), or the process died mid-send
+                         (`expire_stale`)
+
+`unknown` rows are never resent automatically, since Gmail may already
+have accepted them.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any
+
+from mailrocket.storage.connection import get_conn
+
+# No single send (or batch, with its rate-limit backoff) holds a claim this long.
+STALE_SENDING_SECONDS = 900
+
+
+def idempotency_key(analysis_id: int, recipient: str, kind: str = "recipient") -> str:
+    raw = f"{analysis_id}:{kind}:{recipient.strip().lower()}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def enqueue(
+    analysis_id: int,
+    recipients: list[str],
+    kind: str = "recipient",
+    db_path: Path | None = None,
+) -> None:
+    """Add a pending row per recipient; rows that already exist are left as they are.
+
+    Pending rows for addresses no longer in `recipients` (edited out in the
+    review UI) are dropped.
+    """
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            DELETE FROM outbox
+            WHERE analysis_id = ? AND kind = ? AND state = 'pending'
+              AND recipient NOT IN ({",".join("?" * len(recipients))});
+            """,
+            (analysis_id, kind, *recipients),
+        )
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO outbox
+                (analysis_id, recipient, kind, idempotency_key, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            [(analysis_id, r, kind, idempotency_key(analysis_id, r, kind), now, now) for r in recipients],
+        )
+        cur.close()
+
+
+def pending_rows(analysis_id: int, kind: str = "recipient", db_path: Path | None = None) -> list[dict]:
+    """Rows of `analysis_id` still waiting to be sent, oldest first."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT * FROM outbox
+            WHERE analysis_id = ? AND kind = ? AND state = 'pending'
+            ORDER BY outbox_id;
+            """,
+            (analysis_id, kind),
+        )
+        rows = [dict(r) for r in cur.fetchall()]
+        cur.close()
+    return rows
+
+
+def claim(outbox_id: int, db_path: Path | None = None) -> bool:
+    """Move a pending row to `sending`. False if someone else already has it."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE outbox SET state = 'sending', attempts = attempts + 1, updated_at = ?
+            WHERE outbox_id = ? AND state = 'pending';
+            """,
+            (time.time(), outbox_id),
+        )
+        claimed = cur.rowcount > 0
+        cur.close()
+    return claimed
+
+
+def mark_sent(outbox_id: int, gmail_message_id: str | None, db_path: Path | None = None) -> None:
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE outbox SET state = 'sent', gmail_message_id = ?, last_error = NULL, updated_at = ?
+            WHERE outbox_id = ?;
+            """,
+            (gmail_message_id, time.time(), outbox_id),
+        )
+        cur.close()
+
+
+def mark_failed(
+    outbox_id: int,
+    error: str,
+    retryable: bool,
+    max_attempts: int,
+    db_path: Path | None = None,
+) -> str:
+    """Record a failed attempt. Returns the new state (`pending` or `failed`)."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE outbox
+            SET state = CASE WHEN ? AND attempts < ? THEN 'pending' ELSE 'failed' END,
+                last_error = ?, updated_at = ?
+            WHERE outbox_id = ?;
+            """,
+            (int(retryable), max_attempts, error[:500], time.time(), outbox_id),
+        )
+        cur.execute("SELECT state FROM outbox WHERE outbox_id = ?;", (outbox_id,))
+        row = cur.fetchone()
+        cur.close()
+    return row["state"] if row else "failed"
+
+
+def mark_unknown(outbox_id: int, error: str, db_path: Path | None = None) -> None:
+    """The send may have gone out: park the row, never to be resent automatically."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE outbox SET state = 'unknown', last_error = ?, updated_at = ? WHERE outbox_id = ?;",
+            (error[:500], time.time(), outbox_id),
+        )
+        cur.close()
+
+
+def expire_stale(older_than: float = STALE_SENDING_SECONDS, db_path: Path | None = None) -> int:
+    """Mark claims left in `sending` by a dead process as `unknown`; returns how many."""
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE outbox SET state = 'unknown', last_error = 'send interrupted', updated_at = ?
+            WHERE state = 'sending' AND updated_at < ?;
+            """,
+            (now, now - older_than),
+        )
+        expired = cur.rowcount
+        cur.close()
+    return expired
+
+
+def recipient_states(analysis_id: int, db_path: Path | None = None) -> dict[str, str]:
+    """{recipient: state} over the recipient rows of one draft."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT recipient, state FROM outbox
+            WHERE analysis_id = ? AND kind = 'recipient'
+            ORDER BY outbox_id;
+            """,
+            (analysis_id,),
+        )
+        states = {r["recipient"]: r["state"] for r in cur.fetchall()}
+        cur.close()
+    return states
+
+
+def outbox_summary(db_path: Path | None = None) -> dict[str, int]:
+    """{state: count} over every row."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT state, COUNT(*) AS n FROM outbox GROUP BY state;")
+        counts = {r["state"]: r["n"] for r in cur.fetchall()}
+        cur.close()
+    return counts
+
+
+def list_outbox(state: str | None = None, limit: int = 20, db_path: Path | None = None) -> list[dict]:
+    """Most recently updated rows first, optionally only those in `state`."""
+    sql = "SELECT * FROM outbox"
+    params: tuple[Any, ...] = ()
+    if state:
+        sql += " WHERE state = ?"
+        params = (state,)
+    sql += " ORDER BY updated_at DESC, outbox_id DESC LIMIT ?;"
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(sql, (*params, limit))
+        rows = [dict(r) for r in cur.fetchall()]
+        cur.close()
+    return rows
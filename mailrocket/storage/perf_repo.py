@@ -0,0 +1,51 @@
+"""Stored per-command performance reports (`perf_reports` table)."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from mailrocket.storage.connection import get_conn
+
+
+def insert_perf_report(
+    command: str,
+    report: dict[str, Any],
+    exit_code: int | None = None,
+    db_path: Path | None = None,
+) -> int:
+    """Store a `timing.summary()` dict; returns its report_id."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO perf_reports (command, started_at, wall_s, exit_code, summary)
+            VALUES (?, ?, ?, ?, ?);
+            """,
+            (command, report["started_at"], report["wall_s"], exit_code, json.dumps(report)),
+        )
+        report_id = cur.lastrowid
+        cur.close()
+    return report_id
+
+
+def recent_perf_reports(
+    limit: int = 1,
+    command: str | None = None,
+    db_path: Path | None = None,
+) -> list[dict[str, Any]]:
+    """Newest first; each row's `summary` is decoded back into a dict."""
+    sql = "SELECT * FROM perf_reports"
+    params: tuple[Any, ...] = ()
+    if command:
+        sql += " WHERE command = ?"
+        params = (command,)
+    sql += " ORDER BY report_id DESC LIMIT ?;"
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(sql, (*params, limit))
+        rows = [dict(r) for r in cur.fetchall()]
+        cur.close()
+    for r in rows:
+        r["summary"] = json.loads(r["summary"])
+    return rows
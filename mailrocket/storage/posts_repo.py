@@ -1,20 +1,30 @@
 """CRUD for the `linkedin_posts` table."""
 from __future__ import annotations
 
+import base64
+import binascii
 import json
 import logging
+import re
 import sqlite3
+import unicodedata
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from mailrocket.settings import settings
 from mailrocket.storage.connection import get_conn
+from mailrocket.storage.dedup_repo import index_post
 
 logger = logging.getLogger(__name__)
 
 
 def insert_post(post_data: dict[str, Any], db_path: Path | None = None) -> int:
-    """Insert a scraped post; raises sqlite3.IntegrityError on duplicate post_link."""
+    """Insert a scraped post; raises sqlite3.IntegrityError on duplicate post_link.
+
+    When `dedup.enabled`, the post is MinHash-indexed in the same transaction.
+    """
     data = dict(post_data)
     if isinstance(data.get("post_date"), datetime):
         data["post_date"] = data["post_date"].isoformat()
@@ -42,6 +52,8 @@ def insert_post(post_data: dict[str, Any], db_path: Path | None = None) -> int:
             )
             uid = cur.lastrowid
             logger.info("Inserted post uid=%d", uid)
+            if settings.dedup.enabled:
+                index_post(cur, uid, data.get("post_text"))
             return uid
         except sqlite3.IntegrityError as e:
             raise sqlite3.IntegrityError(
@@ -73,6 +85,8 @@ def read_posts(filters: dict[str, Any] | None = None, db_path: Path | None = Non
     if filters:
         sql += " WHERE " + " AND ".join(f"{k} = ?" for k in filters)
         params.extend(filters.values())
+    # uid order means a near-duplicate's (older) representative is analysed first.
+    sql += " ORDER BY uid"
 
     with get_conn(db_path) as conn:
         cur = conn.cursor()
@@ -100,16 +114,109 @@ def mark_analyzed(uid: int, db_path: Path | None = None) -> None:
         cur.close()
 
 
+# Sort keys per UI sort option, as (expression, direction). Each ends in the
+# unique `lp.uid`, so the tuple pins down a row's position; a page cursor
+# is that tuple for the last row shown (keyset pagination).
+# NULL match_percentage (unanalyzed posts) bubble to the bottom regardless
+# of direction. `relevance` (FTS5 bm25, best first) needs a search query.
+_SORT_KEYS: dict[str, tuple[tuple[str, str], ...]] = {
+    "relevance":  (("posts_fts.rank", "ASC"), ("lp.uid", "DESC")),
+    "latest":     (("lp.post_date", "DESC"), ("lp.uid", "DESC")),
+    "oldest":     (("lp.post_date", "ASC"), ("lp.uid", "ASC")),
+    "match_desc": (("(pa.match_percentage IS NULL)", "ASC"),
+                   ("COALESCE(pa.match_percentage, -1)", "DESC"), ("lp.uid", "DESC")),
+    "match_asc":  (("(pa.match_percentage IS NULL)", "ASC"),
+                   ("COALESCE(pa.match_percentage, -1)", "ASC"), ("lp.uid", "DESC")),
+}
+
 SORT_OPTIONS: dict[str, str] = {
-    "latest":     "lp.post_date DESC, lp.uid DESC",
-    "oldest":     "lp.post_date ASC, lp.uid ASC",
-    # NULL match_percentage (unanalyzed posts) bubble to the bottom
-    # regardless of direction.
-    "match_desc": "(pa.match_percentage IS NULL), pa.match_percentage DESC, lp.uid DESC",
-    "match_asc":  "(pa.match_percentage IS NULL), pa.match_percentage ASC, lp.uid DESC",
+    name: ", ".join(f"{expr} {direction}" for expr, direction in keys)
+    for name, keys in _SORT_KEYS.items()
 }
 
 
+def encode_cursor(sort: str, values: list[Any]) -> str:
+    raw = json.dumps([sort, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> list[Any]:
+    """Key values from `encode_cursor`. ValueError if malformed or from another sort."""
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("malformed cursor") from None
+    if not isinstance(decoded, list) or len(decoded) != len(_SORT_KEYS[sort]) + 1 or decoded[0] != sort:
+        raise ValueError(f"cursor does not belong to sort={sort!r}")
+    if not all(v is None or isinstance(v, (str, int, float)) for v in decoded[1:]):
+        raise ValueError("malformed cursor")
+    return decoded[1:]
+
+
+def _after(keys: tuple[tuple[str, str], ...], values: list[Any]) -> tuple[str, list[Any]]:
+    """WHERE clause for rows strictly after `values` in `keys` order."""
+    if len({direction for _, direction in keys}) == 1:
+        # One direction: a row-value comparison, which SQLite can answer from an index.
+        op = "<" if keys[0][1] == "DESC" else ">"
+        cols = ", ".join(expr for expr, _ in keys)
+        return f"({cols}) {op} ({', '.join('?' * len(keys))})", list(values)
+    clauses, params = [], []
+    for i, (expr, direction) in enumerate(keys):
+        terms = [f"{e} = ?" for e, _ in keys[:i]] + [f"{expr} {'<' if direction == 'DESC' else '>'} ?"]
+        clauses.append("(" + " AND ".join(terms) + ")")
+        params += [*values[:i], values[i]]
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+# Highlight markers around matched terms in `search_snippet` (private-use
+# code points, so they can't clash with post text).
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fts_query(text: str) -> str | None:
+    """FTS5 MATCH expression for free text: every word, as a prefix, must match."""
+    words = _WORD_RE.findall(text)
+    return " ".join(f'"{w}"*' for w in words) if words else None
+
+
+def _fold(word: str) -> str:
+    """Case- and accent-insensitive form, like the `unicode61 remove_diacritics` tokenizer."""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def search_snippet(text: str, query: str, width: int = 16) -> str | None:
+    """About `width` words of `text` around the first match of `query`, with the
+    matched words wrapped in HIGHLIGHT_START / HIGHLIGHT_END. None if the
+    words only matched another column.
+
+    Done here rather than with FTS5's snippet(): with prefix terms, each
+    snippet() row lookup re-reads the whole prefix doclist.
+    """
+    prefixes = tuple(_fold(w) for w in _WORD_RE.findall(query))
+    tokens = list(_WORD_RE.finditer(text))
+    hits = [i for i, t in enumerate(tokens) if _fold(t.group()).startswith(prefixes)]
+    if not prefixes or not hits:
+        return None
+    first = max(0, min(hits[0] - 3, len(tokens) - width))
+    last = min(len(tokens), first + width)
+    parts, pos = [], tokens[first].start()
+    for t in tokens[first:last]:
+        if _fold(t.group()).startswith(prefixes):
+            parts += [text[pos:t.start()], HIGHLIGHT_START, t.group(), HIGHLIGHT_END]
+            pos = t.end()
+    parts.append(text[pos:tokens[last - 1].end()])
+    return ("…" if first else "") + "".join(parts) + ("…" if last < len(tokens) else "")
+
+
+def _has_post_search(cur: sqlite3.Cursor) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts';")
+    return cur.fetchone() is not None
+
+
 def list_posts_for_ui(
     *,
     status: str = "all",
@@ -118,6 +225,8 @@ def list_posts_for_ui(
     company: str | None = None,
     sort: str = "latest",
     limit: int = 500,
+    cursor: str | None = None,
+    uids: Iterable[int] | None = None,
     db_path: Path | None = None,
 ) -> list[dict]:
     """List posts joined with their *latest* analysis summary, for the UI grid.
@@ -133,81 +242,129 @@ def list_posts_for_ui(
     exactly one of them, so their counts sum to `all`.
 
     Additional filters:
-        `query`     case-insensitive substring across post_text, author_name,
-                    LinkedIn search query, and company_name.
+        `query`     words matched (as prefixes) against post_text, author_name,
+                    LinkedIn search query and company_name through the
+                    `posts_fts` full-text index (without FTS5, a
+                    case-insensitive substring match over the same columns).
+                    Rows then carry a `search_snippet`: a post_text excerpt
+                    with the matches between HIGHLIGHT_START / HIGHLIGHT_END.
         `min_match` keep only posts whose latest match_percentage >= min_match
                     (0 disables; unanalyzed posts are excluded when > 0).
         `company`   case-insensitive substring on company_name.
-        `sort`      one of `latest`, `oldest`, `match_desc`, `match_asc`.
-    """
-    sql = """
-        SELECT
-            lp.uid,
-            lp.query,
-            lp.author_name,
-            lp.profile_url,
-            lp.post_link,
-            lp.post_text,
-            lp.post_date,
-            lp.analysed,
-            lp.inserted_at,
-            pa.analysis_id,
-            pa.match_percentage,
-            pa.experience_gap,
-            pa.company_name,
-            pa.should_apply,
-            pa.mail_sent,
-            pa.final_decision
-        FROM linkedin_posts lp
-        LEFT JOIN post_analysis pa ON pa.analysis_id = (
-            SELECT analysis_id FROM post_analysis
-            WHERE post_uid = lp.uid
-            ORDER BY analysis_id DESC LIMIT 1
-        )
+        `sort`      one of `relevance` (needs `query`; otherwise `latest`),
+                    `latest`, `oldest`, `match_desc`, `match_asc`.
+        `cursor`    start after the row whose `cursor` field this is
+                    (ValueError if it isn't a cursor for `sort`).
+        `uids`      only these posts (the live updates re-render changed cards).
+
+    Every row carries a `cursor` for fetching the rows after it.
     """
-    where: list[str] = []
-    params: list[Any] = []
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        match = fts_query(query) if query and _has_post_search(cur) else None
+        if sort not in _SORT_KEYS or (sort == "relevance" and match is None):
+            sort = "latest"
+        keys = _SORT_KEYS[sort]
+        key_cols = ", ".join(f"{expr} AS _k{i}" for i, (expr, _) in enumerate(keys))
+        ranked = sort == "relevance"
+        sql = f"""
+            SELECT
+                lp.uid,
+                lp.query,
+                lp.author_name,
+                lp.profile_url,
+                lp.post_link,
+                lp.post_text,
+                lp.post_date,
+                lp.analysed,
+                lp.inserted_at,
+                pa.analysis_id,
+                pa.match_percentage,
+                pa.experience_gap,
+                pa.company_name,
+                pa.should_apply,
+                pa.mail_sent,
+                pa.final_decision,
+                {key_cols}
+            FROM {"posts_fts JOIN linkedin_posts lp ON lp.uid = posts_fts.rowid" if ranked else "linkedin_posts lp"}
+            LEFT JOIN post_analysis pa ON pa.analysis_id = (
+                SELECT analysis_id FROM post_analysis
+                WHERE post_uid = lp.uid
+                ORDER BY analysis_id DESC LIMIT 1
+            )
+        """
+        where: list[str] = []
+        params: list[Any] = []
+
+        if status == "unanalyzed":
+            where.append("lp.analysed = 0")
+        elif status == "pending":
+            where.append("pa.mail_sent = -1")
+        elif status == "sent":
+            where.append("pa.mail_sent = 1")
+        elif status == "rejected":
+            where.append("pa.mail_sent = 0")
+
+        if ranked:
+            where.append("posts_fts MATCH ?")
+            params.append(match)
+        elif match:
+            # Matching uids are only collected, not ranked. For the date sorts
+            # the unary + keeps SQLite walking the date index (stopping after
+            # `limit` rows) instead of fetching and sorting every match.
+            uid = "+lp.uid" if keys[0][0] == "lp.post_date" else "lp.uid"
+            where.append(f"{uid} IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)")
+            params.append(match)
+        elif query:
+            where.append(
+                "(LOWER(lp.post_text) LIKE ? OR LOWER(lp.author_name) LIKE ? "
+                "OR LOWER(lp.query) LIKE ? OR LOWER(COALESCE(pa.company_name, '')) LIKE ?)"
+            )
+            like = f"%{query.lower()}%"
+            params.extend([like, like, like, like])
 
-    if status == "unanalyzed":
-        where.append("lp.analysed = 0")
-    elif status == "pending":
-        where.append("pa.mail_sent = -1")
-    elif status == "sent":
-        where.append("pa.mail_sent = 1")
-    elif status == "rejected":
-        where.append("pa.mail_sent = 0")
-
-    if query:
-        where.append(
-            "(LOWER(lp.post_text) LIKE ? OR LOWER(lp.author_name) LIKE ? "
-            "OR LOWER(lp.query) LIKE ? OR LOWER(COALESCE(pa.company_name, '')) LIKE ?)"
-        )
-        like = f"%{query.lower()}%"
-        params.extend([like, like, like, like])
+        if min_match and int(min_match) > 0:
+            where.append("pa.match_percentage >= ?")
+            params.append(int(min_match))
 
-    if min_match and int(min_match) > 0:
-        where.append("pa.match_percentage >= ?")
-        params.append(int(min_match))
+        if company:
+            where.append("LOWER(COALESCE(pa.company_name, '')) LIKE ?")
+            params.append(f"%{company.lower().strip()}%")
 
-    if company:
-        where.append("LOWER(COALESCE(pa.company_name, '')) LIKE ?")
-        params.append(f"%{company.lower().strip()}%")
+        if uids is not None:
+            uid_list = [int(u) for u in uids]
+            where.append(f"lp.uid IN ({', '.join('?' * len(uid_list)) or 'NULL'})")
+            params.extend(uid_list)
 
-    if where:
-        sql += " WHERE " + " AND ".join(where)
+        if cursor:
+            clause, values = _after(keys, decode_cursor(sort, cursor))
+            where.append(clause)
+            params.extend(values)
 
-    order_by = SORT_OPTIONS.get(sort, SORT_OPTIONS["latest"])
-    sql += f" ORDER BY {order_by} LIMIT ?;"
-    params.append(int(limit))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        sql += f" ORDER BY {SORT_OPTIONS[sort]} LIMIT ?;"
+        params.append(int(limit))
 
-    with get_conn(db_path) as conn:
-        cur = conn.cursor()
         cur.execute(sql, params)
         rows = [dict(r) for r in cur.fetchall()]
         cur.close()
+    for row in rows:
+        row["cursor"] = encode_cursor(sort, [row.pop(f"_k{i}") for i in range(len(keys))])
+        if query:
+            row["search_snippet"] = search_snippet(row.get("post_text") or "", query)
     return rows
 
 
+def list_posts_page(*, limit: int = 50, **filters: Any) -> tuple[list[dict], str | None]:
+    """One page of `list_posts_for_ui`: (rows, cursor of the next page or None)."""
+    rows = list_posts_for_ui(limit=limit + 1, **filters)
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]["cursor"]
+    return rows, None
+
+
 def list_distinct_companies(db_path: Path | None = None) -> list[str]:
     """Distinct, non-empty company names — used for the company autocomplete."""
     sql = """
@@ -228,11 +385,20 @@ def fetch_post_with_analyses(uid: int, db_path: Path | None = None) -> dict | No
     """Return one post (with parsed `other_data`) plus all its analyses (newest first).
 
     Shape: {"post": {...}, "analyses": [{...}, ...]}
+    `post["duplicate_of"]` is the near-duplicate cluster representative uid, or None.
     Returns None if the post doesn't exist.
     """
     with get_conn(db_path) as conn:
         cur = conn.cursor()
-        cur.execute("SELECT * FROM linkedin_posts WHERE uid = ?;", (uid,))
+        cur.execute(
+            """
+            SELECT lp.*, pm.duplicate_of
+            FROM linkedin_posts lp
+            LEFT JOIN post_minhash pm ON pm.post_uid = lp.uid
+            WHERE lp.uid = ?;
+            """,
+            (uid,),
+        )
         row = cur.fetchone()
         if row is None:
             cur.close()
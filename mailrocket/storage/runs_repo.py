@@ -0,0 +1,117 @@
+"""Per-stage run records (`pipeline_runs` table) for checkpoint / `--resume`.
+
+A run is `running` until the stage returns (`completed`), raises (`failed`)
+or is stopped with Ctrl-C (`interrupted`). A scrape that skipped failed
+queries also ends `failed`. A process that dies outright
+(OOM, kill -9) leaves it `running`. Any run that never completed can be
+picked up again with `latest_incomplete_run`. A continued run is marked
+`resumed` so it isn't resumed twice.
+
+`progress` is a free-form JSON dict owned by the stage, e.g. for scrape:
+completed_queries, failed_queries, query_index, current_query; for analyze: outcome counts
+and the last finished uid. Keep it small: it is rewritten after every post.
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from mailrocket.storage.connection import get_conn
+
+
+def _row(r: Any) -> dict:
+    d = dict(r)
+    d["progress"] = json.loads(d["progress"]) if d.get("progress") else {}
+    return d
+
+
+def start_run(
+    stage: str,
+    progress: dict[str, Any] | None = None,
+    worker: str | None = None,
+    db_path: Path | None = None,
+) -> int:
+    """Insert a `running` row; returns its run_id."""
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO pipeline_runs (stage, worker, started_at, updated_at, progress)
+            VALUES (?, ?, ?, ?, ?);
+            """,
+            (stage, worker, now, now, json.dumps(progress or {})),
+        )
+        run_id = cur.lastrowid
+        cur.close()
+    return run_id
+
+
+def save_progress(run_id: int, progress: dict[str, Any], db_path: Path | None = None) -> None:
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE pipeline_runs SET progress = ?, updated_at = ? WHERE run_id = ?;",
+            (json.dumps(progress), time.time(), run_id),
+        )
+        cur.close()
+
+
+def finish_run(
+    run_id: int,
+    status: str,
+    progress: dict[str, Any] | None = None,
+    db_path: Path | None = None,
+) -> None:
+    """Set the final status (completed / failed / interrupted / resumed)."""
+    now = time.time()
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        if progress is None:
+            cur.execute(
+                "UPDATE pipeline_runs SET status = ?, updated_at = ?, finished_at = ? WHERE run_id = ?;",
+                (status, now, now, run_id),
+            )
+        else:
+            cur.execute(
+                """
+                UPDATE pipeline_runs
+                SET status = ?, progress = ?, updated_at = ?, finished_at = ?
+                WHERE run_id = ?;
+                """,
+                (status, json.dumps(progress), now, now, run_id),
+            )
+        cur.close()
+
+
+def latest_incomplete_run(stage: str, db_path: Path | None = None) -> dict | None:
+    """Most recent `stage` run that is still running, failed or was interrupted.
+
+    Returns None when the latest run of that stage completed.
+    """
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT * FROM pipeline_runs
+            WHERE stage = ? AND status != 'resumed'
+            ORDER BY run_id DESC LIMIT 1;
+            """,
+            (stage,),
+        )
+        row = cur.fetchone()
+        cur.close()
+    if row is None or row["status"] == "completed":
+        return None
+    return _row(row)
+
+
+def list_runs(limit: int = 20, db_path: Path | None = None) -> list[dict]:
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM pipeline_runs ORDER BY run_id DESC LIMIT ?;", (limit,))
+        rows = [_row(r) for r in cur.fetchall()]
+        cur.close()
+    return rows
@@ -52,17 +52,365 @@ CREATE TABLE IF NOT EXISTS post_analysis (
 );
 """
 
+# MinHash signature per post + the cluster representative it was matched to.
+# See `storage/dedup_repo.py`.
+_POST_MINHASH_DDL = """
+CREATE TABLE IF NOT EXISTS post_minhash (
+    post_uid INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL,
+    duplicate_of INTEGER,
+    similarity REAL,
+    FOREIGN KEY (post_uid) REFERENCES linkedin_posts(uid) ON DELETE CASCADE
+);
+"""
+
+_POST_LSH_BUCKETS_DDL = """
+CREATE TABLE IF NOT EXISTS post_lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    post_uid INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, post_uid),
+    FOREIGN KEY (post_uid) REFERENCES linkedin_posts(uid) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+# One row per LLM attempt (success or failure). `started_at` is epoch
+# seconds so `stats llm --since` windows are a plain range scan.
+_LLM_CALLS_DDL = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    call_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    started_at REAL NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cached_tokens INTEGER,
+    latency_ms REAL,
+    outcome TEXT NOT NULL,
+    schema_valid BOOLEAN,
+    error TEXT,
+    post_uid INTEGER,
+    prompt_version TEXT
+);
+"""
+
+_LLM_CALLS_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_llm_calls_started_at ON llm_calls (started_at);
+"""
+
+# Lease-based claims for the analyze stage, one row per post still to do.
+# Rows are added lazily by `claim_batch` and deleted when the analysis is
+# stored. See `storage/jobs_repo.py`.
+_ANALYSIS_JOBS_DDL = """
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    post_uid INTEGER PRIMARY KEY,
+    claimed_by TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    parked_at REAL,
+    FOREIGN KEY (post_uid) REFERENCES linkedin_posts(uid) ON DELETE CASCADE
+);
+"""
+
+_UNANALYSED_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_linkedin_posts_unanalysed ON linkedin_posts (uid) WHERE analysed = 0;
+"""
+
+# One row per scrape / analyze run with its progress (JSON) so an
+# interrupted run can be continued with `--resume`. See `storage/runs_repo.py`.
+_PIPELINE_RUNS_DDL = """
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running'
+        CHECK (status IN ('running', 'completed', 'failed', 'interrupted', 'resumed')),
+    worker TEXT,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    progress JSON
+);
+"""
+
+# Review UI list: the latest analysis per post, and keyset pages by date.
+_POST_ANALYSIS_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_post_analysis_post ON post_analysis (post_uid, analysis_id);
+"""
+
+_POST_DATE_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_linkedin_posts_date ON linkedin_posts (post_date, uid);
+"""
+
+_PIPELINE_RUNS_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_stage ON pipeline_runs (stage, run_id);
+"""
+
+# Per-command timing summary from `mailrocket.timing` (spans + counters JSON).
+_PERF_REPORTS_DDL = """
+CREATE TABLE IF NOT EXISTS perf_reports (
+    report_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    command TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    wall_s REAL NOT NULL,
+    exit_code INTEGER,
+    summary JSON NOT NULL
+);
+"""
+
+# Per-recipient send log: one row per (draft, recipient) with an idempotency
+# key, so a crashed or partly failed send never mails anyone twice. See
+# `storage/outbox_repo.py`.
+_OUTBOX_DDL = """
+CREATE TABLE IF NOT EXISTS outbox (
+    outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    analysis_id INTEGER NOT NULL,
+    recipient TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'recipient' CHECK (kind IN ('recipient', 'review')),
+    idempotency_key TEXT NOT NULL UNIQUE,
+    state TEXT NOT NULL DEFAULT 'pending'
+        CHECK (state IN ('pending', 'sending', 'sent', 'failed', 'unknown')),
+    gmail_message_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    FOREIGN KEY (analysis_id) REFERENCES post_analysis(analysis_id) ON DELETE CASCADE
+);
+"""
+
+_OUTBOX_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_outbox_analysis ON outbox (analysis_id, kind, state);
+"""
+
+# Write counters for the tables the review UI reads, bumped by triggers on
+# every row change (from any process). Readers cache derived data and
+# derive ETags from them. See `storage/changes_repo.py`.
+_CHANGE_COUNTERS_DDL = """
+CREATE TABLE IF NOT EXISTS change_counters (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_COUNTED_TABLES = ("linkedin_posts", "post_analysis", "post_minhash")
+
+_CHANGE_COUNTERS_SEED_DDL = (
+    "INSERT OR IGNORE INTO change_counters (name) VALUES "
+    + ", ".join(f"('{t}')" for t in _COUNTED_TABLES) + ";"
+)
+
+_CHANGE_COUNTER_TRIGGERS_DDL: tuple[str, ...] = tuple(
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_count_{event.lower()} AFTER {event} ON {table} BEGIN
+        UPDATE change_counters SET version = version + 1 WHERE name = '{table}';
+    END;
+    """
+    for table in _COUNTED_TABLES
+    for event in ("INSERT", "UPDATE", "DELETE")
+)
+
+# Row-level change feed for the review UI's live updates: one row per new
+# post, new analysis, analysis edit or mail status change, appended by
+# triggers (from any process) and tailed by `ui/events.py`. Only the last
+# _CHANGE_LOG_KEEP rows are kept.
+_CHANGE_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,              -- 'post' | 'analysis' | 'mail_status'
+    post_uid INTEGER NOT NULL
+);
+"""
+
+_CHANGE_LOG_KEEP = 10_000
+
+_CHANGE_LOG_TRIGGERS_DDL: tuple[str, ...] = (
+    """
+    CREATE TRIGGER IF NOT EXISTS change_log_post_insert AFTER INSERT ON linkedin_posts BEGIN
+        INSERT INTO change_log (kind, post_uid) VALUES ('post', new.uid);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS change_log_analysis_insert AFTER INSERT ON post_analysis BEGIN
+        INSERT INTO change_log (kind, post_uid) VALUES ('analysis', new.post_uid);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS change_log_analysis_update
+    AFTER UPDATE OF match_percentage, company_name, should_apply ON post_analysis BEGIN
+        INSERT INTO change_log (kind, post_uid) VALUES ('analysis', new.post_uid);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS change_log_mail_status
+    AFTER UPDATE OF mail_sent ON post_analysis WHEN old.mail_sent IS NOT new.mail_sent BEGIN
+        INSERT INTO change_log (kind, post_uid) VALUES ('mail_status', new.post_uid);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_prune AFTER INSERT ON change_log BEGIN
+        DELETE FROM change_log WHERE seq <= new.seq - {_CHANGE_LOG_KEEP};
+    END;
+    """,
+)
+
+_ALL_DDL: tuple[str, ...] = (
+    _LINKEDIN_POSTS_DDL,
+    _POST_ANALYSIS_DDL,
+    _POST_MINHASH_DDL,
+    _POST_LSH_BUCKETS_DDL,
+    _LLM_CALLS_DDL,
+    _LLM_CALLS_INDEX_DDL,
+    _ANALYSIS_JOBS_DDL,
+    _UNANALYSED_INDEX_DDL,
+    _PIPELINE_RUNS_DDL,
+    _PIPELINE_RUNS_INDEX_DDL,
+    _PERF_REPORTS_DDL,
+    _OUTBOX_DDL,
+    _OUTBOX_INDEX_DDL,
+    _POST_ANALYSIS_INDEX_DDL,
+    _POST_DATE_INDEX_DDL,
+    _CHANGE_COUNTERS_DDL,
+    _CHANGE_COUNTERS_SEED_DDL,
+    *_CHANGE_COUNTER_TRIGGERS_DDL,
+    _CHANGE_LOG_DDL,
+    *_CHANGE_LOG_TRIGGERS_DDL,
+)
+
+
+# Full-text index for the review UI search: one row per post (rowid = uid)
+# with the post's text columns and its latest analysis' company_name. The
+# triggers below keep it in sync; `init_db` back-fills it when it is first
+# created. Needs SQLite built with FTS5 (the UI falls back to LIKE without).
+_POSTS_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    post_text, author_name, query, company_name,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+_LATEST_COMPANY_SQL = """(
+    SELECT company_name FROM post_analysis
+    WHERE post_uid = {uid} ORDER BY analysis_id DESC LIMIT 1
+)"""
+
+_POSTS_FTS_TRIGGERS_DDL: tuple[str, ...] = (
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_post_insert AFTER INSERT ON linkedin_posts BEGIN
+        INSERT INTO posts_fts (rowid, post_text, author_name, query)
+        VALUES (new.uid, new.post_text, new.author_name, new.query);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_post_update
+    AFTER UPDATE OF post_text, author_name, query ON linkedin_posts BEGIN
+        UPDATE posts_fts SET post_text = new.post_text, author_name = new.author_name, query = new.query
+        WHERE rowid = new.uid;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_post_delete AFTER DELETE ON linkedin_posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.uid;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_analysis_insert AFTER INSERT ON post_analysis BEGIN
+        UPDATE posts_fts SET company_name = {_LATEST_COMPANY_SQL.format(uid="new.post_uid")}
+        WHERE rowid = new.post_uid;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_analysis_update
+    AFTER UPDATE OF company_name ON post_analysis BEGIN
+        UPDATE posts_fts SET company_name = {_LATEST_COMPANY_SQL.format(uid="new.post_uid")}
+        WHERE rowid = new.post_uid;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_analysis_delete AFTER DELETE ON post_analysis BEGIN
+        UPDATE posts_fts SET company_name = {_LATEST_COMPANY_SQL.format(uid="old.post_uid")}
+        WHERE rowid = old.post_uid;
+    END;
+    """,
+)
+
+
+def _fill_post_search(cur: sqlite3.Cursor) -> int:
+    cur.execute("DELETE FROM posts_fts;")
+    cur.execute(
+        f"""
+        INSERT INTO posts_fts (rowid, post_text, author_name, query, company_name)
+        SELECT lp.uid, lp.post_text, lp.author_name, lp.query, {_LATEST_COMPANY_SQL.format(uid="lp.uid")}
+        FROM linkedin_posts lp;
+        """
+    )
+    return cur.rowcount
+
+
+def _init_post_search(cur: sqlite3.Cursor, backfill: bool = True) -> None:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts';")
+    existed = cur.fetchone() is not None
+    try:
+        cur.execute(_POSTS_FTS_DDL)
+    except sqlite3.OperationalError as e:
+        logger.warning("Full-text search unavailable (%s); UI search falls back to LIKE", e)
+        return
+    for ddl in _POSTS_FTS_TRIGGERS_DDL:
+        cur.execute(ddl)
+    if backfill and not existed:
+        n = _fill_post_search(cur)
+        if n:
+            logger.info("Back-filled the search index with %d posts", n)
+
+
+def _repair_outbox(cur: sqlite3.Cursor) -> None:
+    """Rebuild an `outbox` whose foreign key an older `migrate` pointed at
+    the dropped post_analysis_old table (every enqueue then fails)."""
+    row = cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'outbox';").fetchone()
+    if row is None or "post_analysis_old" not in row[0]:
+        return
+    cur.execute("PRAGMA foreign_keys = OFF;")
+    cur.execute("PRAGMA legacy_alter_table = ON;")
+    try:
+        cur.execute("BEGIN TRANSACTION;")
+        cur.execute("ALTER TABLE outbox RENAME TO outbox_broken;")
+        cur.execute(_OUTBOX_DDL)
+        cur.execute("INSERT INTO outbox SELECT * FROM outbox_broken;")
+        cur.execute("DROP TABLE outbox_broken;")
+        cur.execute("COMMIT;")
+        logger.warning("Repaired the outbox foreign key left dangling by an earlier migration.")
+    except sqlite3.Error:
+        cur.execute("ROLLBACK;")
+        raise
+    finally:
+        cur.execute("PRAGMA legacy_alter_table = OFF;")
+        cur.execute("PRAGMA foreign_keys = ON;")
+
 
 def init_db(db_path: Path | None = None) -> None:
     """Create tables if they don't exist."""
     with get_conn(db_path) as conn:
         cur = conn.cursor()
-        cur.execute(_LINKEDIN_POSTS_DDL)
-        cur.execute(_POST_ANALYSIS_DDL)
+        _repair_outbox(cur)
+        for ddl in _ALL_DDL:
+            cur.execute(ddl)
+        _init_post_search(cur)
         cur.close()
     logger.info("DB initialised at %s", db_path or "(default)")
 
 
+def rebuild_post_search(db_path: Path | None = None) -> int:
+    """Re-index every post for full-text search; returns how many."""
+    with get_conn(db_path) as conn:
+        cur = conn.cursor()
+        _init_post_search(cur, backfill=False)
+        n = _fill_post_search(cur)
+        cur.close()
+    return n
+
+
 def migrate_post_analysis_schema(db_path: Path | None = None) -> None:
     """One-shot migration that flips legacy mail_sent==0 to mail_sent==-1.
 
@@ -71,6 +419,9 @@ def migrate_post_analysis_schema(db_path: Path | None = None) -> None:
     with get_conn(db_path) as conn:
         cur = conn.cursor()
         cur.execute("PRAGMA foreign_keys = OFF;")
+        # Without the legacy rename, SQLite 3.26+ repoints outbox's foreign key
+        # at post_analysis_old, which is dropped below.
+        cur.execute("PRAGMA legacy_alter_table = ON;")
         try:
             cur.execute("BEGIN TRANSACTION;")
             cur.execute("ALTER TABLE post_analysis RENAME TO post_analysis_old;")
@@ -99,5 +450,8 @@ def migrate_post_analysis_schema(db_path: Path | None = None) -> None:
             cur.execute("ROLLBACK;")
             raise
         finally:
+            cur.execute("PRAGMA legacy_alter_table = OFF;")
             cur.execute("PRAGMA foreign_keys = ON;")
             cur.close()
+    # Indexes and triggers on post_analysis went with post_analysis_old.
+    init_db(db_path)
@@ -0,0 +1,183 @@
+"""In-process timing spans and counters behind the per-run performance report.
+
+    with timing.span("scrape.browser_start"):
+        driver = setup_driver()
+    timing.incr("scrape.posts_yielded")
+
+Spans are flat dotted names (`stage.step`). Each one keeps its count, total,
+max and a bounded sample of durations for p50/p95. Everything is
+process-global and thread-safe, so spans from the overlapped analyze
+workers land in the same report. `finish_report` prints `summary()` and
+stores it in `perf_reports`; the CLI calls it when a command ends and the
+daemon when a job ends (`perf.enabled: false` turns spans into no-ops).
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from mailrocket import metrics
+from mailrocket.settings import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_MAX_SAMPLES = 10_000
+
+_LOCK = threading.Lock()
+_COUNTERS: dict[str, float] = {}
+_STARTED_AT = time.time()
+_STARTED_PERF = time.perf_counter()
+
+
+class _SpanStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=_MAX_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+
+_SPANS: dict[str, _SpanStats] = {}
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration for span `name` (for timings measured elsewhere)."""
+    if not settings.perf.enabled:
+        return
+    with _LOCK:
+        stats = _SPANS.get(name)
+        if stats is None:
+            stats = _SPANS[name] = _SpanStats()
+        stats.add(seconds)
+    metrics.SPAN_SECONDS.observe(seconds, span=name)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as span `name`; recorded even if the block raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of `span`."""
+    def wrap(fn: F) -> F:
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner  # type: ignore[return-value]
+    return wrap
+
+
+def incr(name: str, n: float = 1) -> None:
+    if not settings.perf.enabled:
+        return
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+def reset() -> None:
+    """Start a fresh report (per CLI command, daemon job or benchmark iteration)."""
+    global _STARTED_AT, _STARTED_PERF
+    with _LOCK:
+        _SPANS.clear()
+        _COUNTERS.clear()
+        _STARTED_AT = time.time()
+        _STARTED_PERF = time.perf_counter()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """The `pct`th percentile of already sorted values; None if there are none."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def summary() -> dict[str, Any]:
+    """{"started_at", "wall_s", "spans": {name: {count, total_s, p50_ms, p95_ms, max_ms}},
+    "counters": {name: value}}; spans ordered by total time, largest first."""
+    with _LOCK:
+        snap = {name: (s.count, s.total, s.max, sorted(s.samples)) for name, s in _SPANS.items()}
+        counters = dict(sorted(_COUNTERS.items()))
+        started_at, wall = _STARTED_AT, time.perf_counter() - _STARTED_PERF
+    spans = {}
+    for name, (count, total, mx, samples) in sorted(snap.items(), key=lambda kv: -kv[1][1]):
+        spans[name] = {
+            "count": count,
+            "total_s": round(total, 3),
+            "p50_ms": round((percentile(samples, 50) or 0.0) * 1000, 1),
+            "p95_ms": round((percentile(samples, 95) or 0.0) * 1000, 1),
+            "max_ms": round(mx * 1000, 1),
+        }
+    return {"started_at": started_at, "wall_s": round(wall, 3), "spans": spans, "counters": counters}
+
+
+def format_report(report: dict[str, Any], title: str = "Performance") -> str:
+    """Plain-text table of a `summary()` dict."""
+    wall = report["wall_s"] or 1e-9
+    lines = [f"{title} (wall {report['wall_s']:.1f}s)"]
+    if report["spans"]:
+        headers = ("SPAN", "COUNT", "TOTAL S", "% WALL", "P50 MS", "P95 MS", "MAX MS")
+        table = [
+            (
+                name,
+                str(s["count"]),
+                f"{s['total_s']:.2f}",
+                f"{100 * s['total_s'] / wall:.0f}",
+                f"{s['p50_ms']:.0f}",
+                f"{s['p95_ms']:.0f}",
+                f"{s['max_ms']:.0f}",
+            )
+            for name, s in report["spans"].items()
+        ]
+        widths = [max(len(c) for c in col) for col in zip(headers, *table, strict=True)]
+        fmt = "  ".join("{:<" + str(w) + "}" for w in widths)
+        lines += [fmt.format(*headers), "-" * (sum(widths) + 2 * (len(widths) - 1))]
+        lines += [fmt.format(*row) for row in table]
+    if report["counters"]:
+        lines.append("Counters: " + ", ".join(f"{k}={v:g}" for k, v in report["counters"].items()))
+    return "\n".join(lines)
+
+
+def has_data() -> bool:
+    with _LOCK:
+        return bool(_SPANS or _COUNTERS)
+
+
+def finish_report(command: str, exit_code: int) -> None:
+    """Print the report since the last `reset()` and store it in `perf_reports`."""
+    if not settings.perf.enabled or not has_data():
+        return
+    report = summary()
+    if settings.perf.print_report:
+        print()
+        print(format_report(report, title=f"Performance: {command}"))
+    try:
+        from mailrocket.storage.perf_repo import insert_perf_report
+
+        insert_perf_report(command, report, exit_code=exit_code)
+    except Exception:
+        logger.warning("Could not store the performance report", exc_info=True)
@@ -0,0 +1,36 @@
+"""In-process cache for the review UI's DB aggregates.
+
+The sidebar counts and the company autocomplete each scan every analysis,
+yet they only change when the pipeline or a PATCH writes. Entries are
+keyed on the `change_counters` versions of the tables they read
+(`storage/changes_repo.py`), so they're recomputed only after a real change.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class VersionedCache:
+    """name -> (version, value); a value is reused while its version holds.
+
+    Read the version *before* calling `get`: a write racing the load then
+    leaves a newer version behind, and the next call reloads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[Any, Any]] = {}
+
+    def get(self, name: str, version: Any, load: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        value = load()
+        with self._lock:
+            self._entries[name] = (version, value)
+        return value
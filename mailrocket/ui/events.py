@@ -0,0 +1,127 @@
+"""Live updates for the review UI: DB changes fanned out as Server-Sent Events.
+
+One asyncio task per app tails the `change_log` table (filled by triggers,
+so pipeline runs in other processes show up too) and turns each batch of
+new rows into a single `change` event:
+
+    id: <last change_log seq>
+    event: change
+    data: {"seq": ..., "posts": [uid, ...], "analyses": [...],
+           "mail_status": [...], "cards": [card, ...], "counts": {...}}
+
+`posts` / `analyses` / `mail_status` are the uids that got a new post, a
+new or edited analysis and a mail status change; `cards` are those posts
+re-rendered for the list and `counts` the sidebar counts, so a page only
+patches what changed. The task runs while someone is subscribed. A client
+reconnecting with `Last-Event-ID` first gets what it missed.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+from collections.abc import AsyncIterator, Callable
+
+from mailrocket.storage.changes_repo import changes_since, latest_change_seq
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 1.0
+KEEPALIVE_SECONDS = 15.0
+RETRY_MS = 3000
+# change_log rows folded into one event; a bigger backlog takes several polls.
+BATCH = 500
+_KINDS = {"post": "posts", "analysis": "analyses", "mail_status": "mail_status"}
+
+
+class ChangeHub:
+    """Polls `change_log` and broadcasts `change` events to every subscriber.
+
+    `load_cards(uids)` and `load_counts()` build the event payload; they run
+    in a worker thread.
+    """
+
+    def __init__(
+        self,
+        load_cards: Callable[[list[int]], list[dict]],
+        load_counts: Callable[[], dict[str, int]],
+        poll_seconds: float = POLL_SECONDS,
+    ) -> None:
+        self._load_cards = load_cards
+        self._load_counts = load_counts
+        self._poll_seconds = poll_seconds
+        self._subscribers: set[asyncio.Queue[str]] = set()
+        self._task: asyncio.Task | None = None
+        self._seq: int | None = None
+
+    def _event(self, rows: list[dict]) -> str:
+        data: dict = {"seq": rows[-1]["seq"], **{key: [] for key in _KINDS.values()}}
+        uids: list[int] = []
+        for row in rows:
+            bucket = data[_KINDS.get(row["kind"], "analyses")]
+            if row["post_uid"] not in bucket:
+                bucket.append(row["post_uid"])
+            if row["post_uid"] not in uids:
+                uids.append(row["post_uid"])
+        data["cards"] = self._load_cards(uids)
+        data["counts"] = self._load_counts()
+        return f"id: {data['seq']}\nevent: change\ndata: {json.dumps(data, default=str)}\n\n"
+
+    async def _poll(self) -> None:
+        try:
+            while self._subscribers:
+                await asyncio.sleep(self._poll_seconds)
+                try:
+                    rows = await asyncio.to_thread(changes_since, self._seq, BATCH)
+                    if not rows:
+                        continue
+                    event = await asyncio.to_thread(self._event, rows)
+                except sqlite3.Error:
+                    logger.warning("Live updates: reading change_log failed", exc_info=True)
+                    continue
+                # No await from here on: a subscriber added meanwhile caught up to `_seq`.
+                self._seq = rows[-1]["seq"]
+                for queue in list(self._subscribers):
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        logger.debug("Live updates: dropping an event for a slow subscriber")
+        finally:
+            # Idle: the next first subscriber starts from the then-latest row.
+            self._task = None
+            self._seq = None
+
+    async def _catch_up(self, since: int, until: int) -> AsyncIterator[str]:
+        """Events for the rows a reconnecting client missed, (since, until]."""
+        while since < until:
+            rows = [r for r in await asyncio.to_thread(changes_since, since, BATCH) if r["seq"] <= until]
+            if not rows:
+                break
+            yield await asyncio.to_thread(self._event, rows)
+            since = rows[-1]["seq"]
+
+    async def stream(self, last_event_id: str | None = None) -> AsyncIterator[str]:
+        """The `text/event-stream` body for one client; ends when it disconnects."""
+        if self._seq is None:
+            seq = await asyncio.to_thread(latest_change_seq)
+            if self._seq is None:
+                self._seq = seq
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=100)
+        # Subscribe and note the position together: later rows arrive on the queue.
+        self._subscribers.add(queue)
+        until = self._seq
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if last_event_id and last_event_id.isdigit():
+                async for event in self._catch_up(int(last_event_id), until):
+                    yield event
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(queue)
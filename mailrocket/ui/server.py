@@ -10,25 +10,37 @@ There is no auth — bind to localhost only.
 """
 from __future__ import annotations
 
+import hashlib
+import html
 import json
 import logging
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
+from mailrocket import metrics
 from mailrocket.settings import settings
+from mailrocket.storage import init_db
 from mailrocket.storage.analysis_repo import status_counts, update_analysis
+from mailrocket.storage.changes_repo import change_versions
 from mailrocket.storage.posts_repo import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
     SORT_OPTIONS,
     fetch_post_with_analyses,
     list_distinct_companies,
     list_posts_for_ui,
+    list_posts_page,
 )
+from mailrocket.ui.cache import VersionedCache
+from mailrocket.ui.events import ChangeHub
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +50,13 @@ STATIC_DIR = UI_ROOT / "static"
 
 VALID_STATUSES = ("all", "unanalyzed", "pending", "sent", "rejected")
 DEFAULT_SORT = "latest"
+SEARCH_SORT = "relevance"  # default while searching; only valid with `q`
+# Cards per page; the index renders the first page and the list fetches
+# the rest from /api/posts as it is scrolled.
+PAGE_SIZE = 50
+# change_counters tables each JSON endpoint reads, for its ETag.
+LIST_TABLES = ("linkedin_posts", "post_analysis")
+DETAIL_TABLES = ("linkedin_posts", "post_analysis", "post_minhash")
 
 
 class AnalysisUpdate(BaseModel):
@@ -68,16 +87,54 @@ def _humanize_mail_sent(value: int | None) -> dict[str, str]:
     return mapping.get(value if value is not None else -1, {"label": "—", "tone": "muted"})
 
 
+def _resolve_sort(sort: str | None, q: str | None) -> tuple[str, str]:
+    """(sort to use, default sort for these params)."""
+    default = SEARCH_SORT if q else DEFAULT_SORT
+    if sort not in SORT_OPTIONS or (sort == SEARCH_SORT and not q):
+        return default, default
+    return sort, default
+
+
+def _highlight(snippet: str) -> str:
+    """Escape an FTS snippet and turn its match markers into <mark> tags."""
+    return (
+        html.escape(" ".join(snippet.split()))
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
+
+
+def _etag(*parts: Any) -> str:
+    """Weak ETag for a response determined by `parts` (gzip may re-encode it)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
 def _post_to_card(row: dict) -> dict:
-    """Trim a list-row into something the template can iterate over."""
+    """Trim a list-row into something the template can iterate over.
+
+    Search results also get `snippet_html`: the best-matching excerpt,
+    escaped, with the matched words in <mark>.
+    """
     text = (row.get("post_text") or "").strip().splitlines()
     snippet = " ".join(text)[:140]
+    search_snippet = row.get("search_snippet")
     return {
         "uid": row["uid"],
         "author": row.get("author_name") or "Unknown",
         "query": row.get("query") or "",
         "post_date": row.get("post_date") or "",
         "snippet": snippet,
+        "snippet_html": _highlight(search_snippet) if search_snippet else None,
         "analysed": bool(row.get("analysed")),
         "match_percentage": row.get("match_percentage"),
         "company_name": row.get("company_name"),
@@ -111,6 +168,7 @@ def _detail_payload(uid: int) -> dict:
             "post_date": post.get("post_date") or "",
             "analysed": bool(post.get("analysed")),
             "inserted_at": post.get("inserted_at") or "",
+            "duplicate_of": post.get("duplicate_of"),
             "hashtags": other.get("hashtags") or [],
             "reactions": other.get("reactions"),
             "comments": other.get("comments"),
@@ -136,10 +194,50 @@ def _detail_payload(uid: int) -> dict:
 def create_app() -> FastAPI:
     app = FastAPI(title="MailRocket Review UI", version="0.1.0")
 
+    # Idempotent; makes sure tables added after the DB was created exist.
+    init_db()
+
     templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
     templates.env.filters["tojson_pretty"] = lambda v: json.dumps(v, indent=2, default=str)
 
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    # Compresses HTML and JSON; the event stream is excluded by Starlette.
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+    aggregates = VersionedCache()
+    app.state.aggregates = aggregates
+
+    def sidebar() -> tuple[dict[str, int], list[str]]:
+        """(status counts, company names), recomputed only after writes."""
+        versions = change_versions()
+        posts_v, analyses_v = versions.get("linkedin_posts"), versions.get("post_analysis")
+        counts = aggregates.get("status_counts", (posts_v, analyses_v), status_counts)
+        companies = aggregates.get("companies", analyses_v, list_distinct_companies)
+        return counts, companies
+
+    def changed_cards(uids: list[int]) -> list[dict]:
+        return [_post_to_card(r) for r in list_posts_for_ui(uids=uids, limit=len(uids))]
+
+    hub = ChangeHub(changed_cards, lambda: sidebar()[0])
+    app.state.changes = hub
+
+    def conditional_json(request: Request, tables: tuple[str, ...], build: Callable[[], Any]) -> Response:
+        """`build()` as JSON, or 304 if the client's ETag is still current.
+
+        The ETag covers the URL and the change_counters versions of `tables`,
+        so a revalidation is answered without reading the data itself.
+        """
+        versions = change_versions()
+        etag = _etag(
+            app.version,
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            [versions.get(t) for t in tables],
+        )
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(build(), headers=headers)
 
     @app.get("/", response_class=HTMLResponse)
     def index(
@@ -149,18 +247,19 @@ def create_app() -> FastAPI:
         uid: int | None = Query(None),
         min_match: int = Query(0, ge=0, le=100),
         company: str | None = Query(None),
-        sort: str = Query(DEFAULT_SORT),
+        sort: str | None = Query(None),
     ) -> Any:
         status = status if status in VALID_STATUSES else "all"
-        sort = sort if sort in SORT_OPTIONS else DEFAULT_SORT
+        sort, default_sort = _resolve_sort(sort, q)
         company_clean = (company or "").strip() or None
 
-        rows = list_posts_for_ui(
+        rows, next_cursor = list_posts_page(
             status=status,
             query=(q or None),
             min_match=min_match,
             company=company_clean,
             sort=sort,
+            limit=PAGE_SIZE,
         )
         cards = [_post_to_card(r) for r in rows]
 
@@ -176,14 +275,16 @@ def create_app() -> FastAPI:
             base_params["min_match"] = str(min_match)
         if company_clean:
             base_params["company"] = company_clean
-        if sort and sort != DEFAULT_SORT:
+        if sort != default_sort:
             base_params["sort"] = sort
 
+        counts, companies = sidebar()
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
                 "cards": cards,
+                "next_cursor": next_cursor,
                 "selected_uid": selected_uid,
                 "detail": detail,
                 "filter_status": status,
@@ -191,9 +292,10 @@ def create_app() -> FastAPI:
                 "min_match": min_match,
                 "company_filter": company_clean or "",
                 "sort_by": sort,
-                "companies": list_distinct_companies(),
+                "default_sort": default_sort,
+                "companies": companies,
                 "base_params": base_params,
-                "counts": status_counts(),
+                "counts": counts,
                 "db_path": str(settings.paths.db),
                 "candidate_name": settings.candidate.full_name,
             },
@@ -201,28 +303,64 @@ def create_app() -> FastAPI:
 
     @app.get("/api/posts")
     def api_posts(
+        request: Request,
         status: str = Query("all"),
         q: str | None = Query(None),
         min_match: int = Query(0, ge=0, le=100),
         company: str | None = Query(None),
-        sort: str = Query(DEFAULT_SORT),
-        limit: int = Query(500, ge=1, le=2000),
-    ) -> JSONResponse:
+        sort: str | None = Query(None),
+        limit: int = Query(PAGE_SIZE, ge=1, le=500),
+        cursor: str | None = Query(None),
+    ) -> Response:
+        """One page of cards; pass `next_cursor` back as `cursor` for the next."""
         status = status if status in VALID_STATUSES else "all"
-        sort = sort if sort in SORT_OPTIONS else DEFAULT_SORT
-        rows = list_posts_for_ui(
-            status=status,
-            query=(q or None),
-            min_match=min_match,
-            company=(company or None),
-            sort=sort,
-            limit=limit,
-        )
-        return JSONResponse([_post_to_card(r) for r in rows])
+        sort, _ = _resolve_sort(sort, q)
+
+        def page() -> dict:
+            try:
+                rows, next_cursor = list_posts_page(
+                    status=status,
+                    query=(q or None),
+                    min_match=min_match,
+                    company=(company or "").strip() or None,
+                    sort=sort,
+                    limit=limit,
+                    cursor=cursor or None,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            return {"items": [_post_to_card(r) for r in rows], "next_cursor": next_cursor}
+
+        return conditional_json(request, LIST_TABLES, page)
 
     @app.get("/api/posts/{uid}")
-    def api_post_detail(uid: int) -> JSONResponse:
-        return JSONResponse(_detail_payload(uid))
+    def api_post_detail(
+        request: Request,
+        uid: int,
+        view: str = Query("full", pattern="^(full|card)$"),
+    ) -> Response:
+        """The post with all its analyses, or with `view=card` just its list card
+        (no post text, analysis bodies or raw LLM JSON) for cheap polling."""
+        if view == "full":
+            return conditional_json(request, DETAIL_TABLES, lambda: _detail_payload(uid))
+
+        def card() -> dict:
+            rows = list_posts_for_ui(uids=[uid], limit=1)
+            if not rows:
+                raise HTTPException(status_code=404, detail=f"post uid={uid} not found")
+            return _post_to_card(rows[0])
+
+        return conditional_json(request, LIST_TABLES, card)
+
+    @app.get("/api/events")
+    def api_events(request: Request) -> StreamingResponse:
+        """Server-Sent Events: a `change` event per batch of new posts, analyses
+        and mail status changes (see `ui/events.py`)."""
+        return StreamingResponse(
+            hub.stream(request.headers.get("last-event-id")),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.patch("/api/analyses/{analysis_id}")
     def api_update_analysis(analysis_id: int, payload: AnalysisUpdate) -> JSONResponse:
@@ -241,6 +379,14 @@ def create_app() -> FastAPI:
     def healthz() -> JSONResponse:
         return JSONResponse({"ok": True})
 
+    @app.get("/metrics")
+    def prometheus_metrics(request: Request) -> Response:
+        openmetrics = metrics.wants_openmetrics(request.headers.get("accept"))
+        return Response(
+            metrics.render(openmetrics=openmetrics),
+            media_type=metrics.OPENMETRICS_CONTENT_TYPE if openmetrics else metrics.PROMETHEUS_CONTENT_TYPE,
+        )
+
     return app
 
 
@@ -54,6 +54,8 @@
     return out;
   }
 
+  let lastSavedAt = 0;
+
   async function saveAnalysis(form) {
     const id = form.dataset.analysisId;
     if (!id) return;
@@ -76,6 +78,7 @@
       const data = await r.json();
       showToast(`Saved ${data.fields.length} field(s)`, true);
       form.classList.remove("is-dirty");
+      lastSavedAt = Date.now();
     } catch (err) {
       console.error(err);
       showToast(`Save failed: ${err.message}`, false);
@@ -271,7 +274,191 @@
     });
   }
 
+  /* ---------- Post list paging ---------- */
+  // The server renders the first page of cards; the rest are fetched from
+  // /api/posts with the keyset cursor as the list is scrolled.
+  function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function renderMeta(c) {
+    const meta = el("div", "post-card-row post-card-meta");
+    if (c.has_analysis) {
+      if (c.match_percentage !== null && c.match_percentage !== undefined) {
+        meta.append(el("span", "badge badge-match", `${c.match_percentage}% match`));
+      }
+      if (c.company_name) {
+        const company = el("span", "badge badge-company", c.company_name);
+        company.title = c.company_name;
+        meta.append(company);
+      }
+      meta.append(el("span", `badge badge-${c.mail_status.tone}`, c.mail_status.label));
+    } else {
+      meta.append(el("span", "badge badge-muted", "Not analyzed"));
+    }
+    return meta;
+  }
+
+  function renderCard(c, listQuery, selectedUid) {
+    const li = document.createElement("li");
+    const a = el("a", "post-card");
+    const selected = String(c.uid) === selectedUid;
+    if (selected) a.classList.add("is-selected");
+    a.href = `?${listQuery}&uid=${c.uid}`;
+    a.dataset.uid = c.uid;
+    a.setAttribute("aria-current", selected ? "true" : "false");
+
+    const head = el("div", "post-card-row");
+    head.append(el("span", "post-card-author", c.author), el("span", "post-card-uid", `#${c.uid}`));
+    const snippet = el("div", "post-card-snippet");
+    // snippet_html is escaped server-side; only <mark> tags are added.
+    if (c.snippet_html) snippet.innerHTML = c.snippet_html;
+    else snippet.textContent = c.snippet || "(no text)";
+    a.append(head, snippet, renderMeta(c));
+    li.append(a);
+    return li;
+  }
+
+  function initInfiniteList() {
+    const list = document.querySelector("ol.post-list[data-list-query]");
+    if (!list || !list.dataset.nextCursor || !("IntersectionObserver" in window)) return;
+
+    const listQuery = list.dataset.listQuery;
+    const selectedUid = list.dataset.selectedUid;
+    const countEl = document.querySelector(".pane-list .pane-count");
+    const sentinel = el("li", "list-sentinel", "Loading...");
+    sentinel.setAttribute("aria-hidden", "true");
+    list.append(sentinel);
+
+    let cursor = list.dataset.nextCursor;
+    let loading = false;
+
+    const observer = new IntersectionObserver(async (entries) => {
+      if (loading || !cursor || !entries.some((e) => e.isIntersecting)) return;
+      loading = true;
+      try {
+        const r = await fetch(`/api/posts?${listQuery}&cursor=${encodeURIComponent(cursor)}`);
+        if (!r.ok) throw new Error(`HTTP ${r.status}`);
+        const page = await r.json();
+        const frag = document.createDocumentFragment();
+        for (const c of page.items) frag.append(renderCard(c, listQuery, selectedUid));
+        list.insertBefore(frag, sentinel);
+        cursor = page.next_cursor;
+      } catch (err) {
+        console.error(err);
+        showToast(`Loading more posts failed: ${err.message}`, false);
+        cursor = null;
+      } finally {
+        loading = false;
+      }
+      const shown = list.querySelectorAll(".post-card").length;
+      if (countEl) countEl.textContent = cursor ? `${shown}+` : String(shown);
+      if (!cursor) {
+        observer.disconnect();
+        sentinel.remove();
+      } else {
+        // Still in view (tall window): ask again for the next page.
+        observer.unobserve(sentinel);
+        observer.observe(sentinel);
+      }
+    }, { root: list.closest(".pane-list"), rootMargin: "0px 0px 600px 0px" });
+    observer.observe(sentinel);
+  }
+
+  /* ---------- Live updates ---------- */
+  // /api/events pushes a `change` event when posts are added, analyses are
+  // added or edited, or a mail status flips (by the pipeline or another tab).
+  // Cards already on the page get their badges patched in place and the
+  // sidebar counts are updated; posts new to this view are only announced,
+  // since where they'd land depends on the sort and the page already loaded.
+  function matchesView(c, params) {
+    const status = params.get("status") || "all";
+    if (status === "unanalyzed" && c.analysed) return false;
+    if (status === "pending" && c.mail_sent !== -1) return false;
+    if (status === "sent" && c.mail_sent !== 1) return false;
+    if (status === "rejected" && c.mail_sent !== 0) return false;
+    const minMatch = parseInt(params.get("min_match") || "0", 10);
+    if (minMatch > 0 && !(c.match_percentage >= minMatch)) return false;
+    const company = (params.get("company") || "").trim().toLowerCase();
+    if (company && !(c.company_name || "").toLowerCase().includes(company)) return false;
+    return true;
+  }
+
+  function setLiveStatus(text, title) {
+    const node = document.getElementById("live-status");
+    if (!node) return;
+    node.textContent = text;
+    node.title = title;
+    node.classList.toggle("is-live", text === "live");
+  }
+
+  function initLiveUpdates() {
+    if (!("EventSource" in window)) return;
+    const list = document.querySelector("ol.post-list[data-list-query]");
+    const listQuery = list ? list.dataset.listQuery : "";
+    const params = new URLSearchParams(listQuery);
+    const selectedUid = list ? list.dataset.selectedUid : "";
+    const unseen = new Set();
+    let notice = null;
+
+    const announce = () => {
+      if (!list) return;
+      if (!notice) {
+        notice = el("button", "list-notice");
+        notice.type = "button";
+        notice.addEventListener("click", reloadNow);
+        list.before(notice);
+      }
+      const n = unseen.size;
+      notice.textContent = `${n} new or updated post${n === 1 ? "" : "s"} · show`;
+    };
+
+    const source = new EventSource("/api/events");
+    source.addEventListener("open", () => setLiveStatus("live", "Receiving live updates"));
+    source.addEventListener("error", () => setLiveStatus("offline", "Live updates disconnected; retrying"));
+    source.addEventListener("change", (ev) => {
+      let change;
+      try {
+        change = JSON.parse(ev.data);
+      } catch (err) {
+        console.error(err);
+        return;
+      }
+
+      for (const [slug, count] of Object.entries(change.counts || {})) {
+        const pill = document.querySelector(`.pill[data-status="${slug}"] .pill-count`);
+        if (pill) pill.textContent = count;
+      }
+
+      for (const c of change.cards || []) {
+        const card = list && list.querySelector(`.post-card[data-uid="${c.uid}"]`);
+        if (card) {
+          card.querySelector(".post-card-meta").replaceWith(renderMeta(c));
+          card.classList.toggle("is-stale", !matchesView(c, params));
+          card.classList.remove("is-updated");
+          void card.offsetWidth; // restart the highlight animation
+          card.classList.add("is-updated");
+        } else if (matchesView(c, params)) {
+          unseen.add(c.uid);
+        }
+      }
+      if (unseen.size) announce();
+
+      // Our own saves come back as events too; only announce other writers.
+      const uid = Number(selectedUid);
+      if (uid && Date.now() - lastSavedAt > 5000
+          && (change.analyses.includes(uid) || change.mail_status.includes(uid))) {
+        showToast(`Post #${uid} changed elsewhere. Reload to see it.`);
+      }
+    });
+  }
+
   trackFormDirty();
   initAutoRefresh();
   initListFilters();
+  initInfiniteList();
+  initLiveUpdates();
 })();
@@ -0,0 +1,111 @@
+"""Benchmark CLI startup: wall time and heaviest imports per subcommand.
+
+Runs each command in a fresh interpreter (against a throwaway DB) a few
+times and reports the best wall time, then re-runs it once under
+`python -X importtime` and lists the slowest top-level imports. Exits 1
+if any command on the budgeted list is over `--budget-ms`.
+
+    --help / init-db / send --dry-run / stats llm    budgeted (must stay fast)
+    analyze                                          informational (loads litellm)
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 5 --budget-ms 400 --top 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_BUDGETED: tuple[tuple[str, ...], ...] = (
+    ("--help",),
+    ("init-db",),
+    ("send", "--dry-run"),
+    ("stats", "llm"),
+)
+# `analyze` would call models, so time what it imports instead.
+_IMPORT_ONLY: tuple[tuple[str, str], ...] = (
+    ("analyze (imports)", "import mailrocket.pipeline, mailrocket.analyzer.service"),
+    ("first LLM call (litellm)", "import mailrocket.analyzer.llm as m; m._init_litellm()"),
+)
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def _env(db: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env["MAILROCKET_DB"] = str(db)
+    env["MAILROCKET_LOG_LEVEL"] = "WARNING"
+    env["PYTHONPATH"] = str(REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _argv(cmd: tuple[str, ...]) -> list[str]:
+    if cmd[0] == "-c":
+        return [sys.executable, *cmd]
+    return [sys.executable, "-m", "mailrocket", *cmd]
+
+
+def _wall_ms(cmd: tuple[str, ...], env: dict[str, str], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(_argv(cmd), env=env, cwd=REPO_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _heaviest_imports(cmd: tuple[str, ...], env: dict[str, str], top: int) -> list[tuple[str, float]]:
+    argv = _argv(cmd)
+    argv.insert(1, "-Ximporttime")
+    proc = subprocess.run(argv, env=env, cwd=REPO_ROOT, capture_output=True, text=True, check=False)
+    roots: list[tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        # Only top-level entries: their cumulative time includes their children.
+        if m and len(m.group(3)) == 1:
+            roots.append((m.group(4), int(m.group(2)) / 1000))
+    roots.sort(key=lambda r: r[1], reverse=True)
+    return roots[:top]
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else "")
+    p.add_argument("--runs", type=int, default=3, help="Runs per command; best is reported (default 3)")
+    p.add_argument("--budget-ms", type=float, default=500.0, help="Wall-time budget for fast commands (default 500)")
+    p.add_argument("--top", type=int, default=5, help="Heaviest imports to list per command (default 5)")
+    args = p.parse_args()
+
+    env = _env(Path(tempfile.mkdtemp(prefix="mailrocket-startup-")) / "bench.db")
+    over: list[str] = []
+
+    commands = [(" ".join(c), c, True) for c in _BUDGETED]
+    commands += [(label, ("-c", code), False) for label, code in _IMPORT_ONLY]
+    for label, cmd, budgeted in commands:
+        ms = _wall_ms(cmd, env, args.runs)
+        status = ""
+        if budgeted:
+            status = "ok" if ms <= args.budget_ms else "OVER BUDGET"
+            if ms > args.budget_ms:
+                over.append(label)
+        print(f"{label:<32} {ms:>8.0f} ms  {status}")
+        for name, cum_ms in _heaviest_imports(cmd, env, args.top):
+            print(f"    {name:<28} {cum_ms:>8.1f} ms")
+
+    if over:
+        print(f"\n{len(over)} command(s) over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        return 1
+    print(f"\nAll budgeted commands within {args.budget_ms:.0f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
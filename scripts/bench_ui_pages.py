@@ -0,0 +1,172 @@
+"""Benchmark review-UI list pages on a large synthetic DB.
+
+Seeds a throwaway SQLite DB with `--posts` posts (about 70% analyzed),
+then for every sort option times:
+
+    query 500    one `list_posts_for_ui(limit=500)` (the old unpaged list)
+    first page   `list_posts_page` with the UI page size
+    deep page    the page reached after following `--depth` cursors
+    GET /        the whole index render (first page + detail + sidebar)
+    GET /api     one /api/posts page fetched with a deep cursor
+
+and, for a few searches, the first page through the FTS5 index (by
+relevance and by date) against the LIKE scan used without FTS5. Last,
+the bytes on the wire for a list page, a post detail and its card view:
+plain, gzipped, and as a 304 revalidation.
+
+Medians over `--repeat` runs, in milliseconds. The HTTP rows need httpx
+(`uv run --with httpx python scripts/bench_ui_pages.py`).
+
+Usage:
+    python scripts/bench_ui_pages.py
+    python scripts/bench_ui_pages.py --posts 200000 --depth 500
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+_COMPANIES = ("acme", "globex", "initech", "umbrella", "hooli", "starklabs", None)
+_WORDS = (
+    "hiring", "engineer", "backend", "frontend", "python", "golang", "rust", "kubernetes", "postgres",
+    "remote", "hybrid", "senior", "junior", "startup", "fintech", "data", "platform", "team", "apply",
+    "salary", "visa", "relocation", "london", "warsaw", "singapore", "berlin", "react", "django",
+)
+_SEARCHES = ("golang", "senior rust", "kube", "acme remote")
+
+
+def _median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _seed(n: int, rng: random.Random) -> None:
+    from mailrocket.storage.connection import get_conn
+
+    posts, analyses = [], []
+    for uid in range(1, n + 1):
+        day = rng.randrange(365)
+        posts.append((
+            uid, f"query {uid % 20}", f"Author {uid}", f"https://example.invalid/posts/{uid}",
+            " ".join(rng.choice(_WORDS) if rng.random() < 0.05 else f"w{rng.randrange(5000)}" for _ in range(60)),
+            f"2025-{1 + day // 31:02d}-{1 + day % 28:02d}T{rng.randrange(24):02d}:00:00", int(rng.random() < 0.7),
+        ))
+        if posts[-1][-1]:
+            analyses.append((
+                uid, rng.randrange(101), rng.choice(_COMPANIES), rng.choice((-1, 0, 1)), "Application", "Hello",
+            ))
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO linkedin_posts (uid, query, author_name, post_link, post_text, post_date, analysed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?);",
+            posts,
+        )
+        conn.executemany(
+            "INSERT INTO post_analysis (post_uid, match_percentage, company_name, mail_sent, subject, body) "
+            "VALUES (?, ?, ?, ?, ?, ?);",
+            analyses,
+        )
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else "")
+    p.add_argument("--posts", type=int, default=100_000, help="Synthetic posts to seed (default 100000)")
+    p.add_argument("--depth", type=int, default=200, help="Cursor pages to follow for the deep page (default 200)")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is shown (default 5)")
+    p.add_argument("--seed", type=int, default=None, help="Seed for the synthetic posts")
+    args = p.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="mailrocket-ui-"))
+    os.environ["MAILROCKET_DB"] = str(work / "ui.db")
+
+    from mailrocket.storage import init_db
+    from mailrocket.storage.posts_repo import SORT_OPTIONS, list_posts_for_ui, list_posts_page
+    from mailrocket.ui.server import PAGE_SIZE, create_app
+
+    init_db()
+    start = time.perf_counter()
+    _seed(args.posts, random.Random(args.seed))
+    print(f"DB: {work / 'ui.db'} ({args.posts:,} posts seeded in {time.perf_counter() - start:.1f}s)")
+    print(f"Page size {PAGE_SIZE}, deep page = after {args.depth} pages, median of {args.repeat} runs\n")
+
+    try:
+        from fastapi.testclient import TestClient
+
+        client = TestClient(create_app())
+    except ImportError:
+        client = None
+        print("(httpx not installed: skipping the HTTP rows)\n")
+
+    print(f"  {'sort':<11} {'query 500':>10} {'first page':>11} {'deep page':>10} {'GET /':>8} {'GET /api':>9}")
+    for sort in SORT_OPTIONS:
+        if sort == "relevance":  # needs a search; timed below
+            continue
+        cursor = None
+        for _ in range(args.depth):
+            _, cursor = list_posts_page(sort=sort, limit=PAGE_SIZE, cursor=cursor)
+            if cursor is None:
+                break
+        row = [
+            _median_ms(lambda sort=sort: list_posts_for_ui(sort=sort, limit=500), args.repeat),
+            _median_ms(lambda sort=sort: list_posts_page(sort=sort, limit=PAGE_SIZE), args.repeat),
+            _median_ms(lambda sort=sort, cursor=cursor: list_posts_page(sort=sort, limit=PAGE_SIZE, cursor=cursor), args.repeat),
+        ]
+        if client is not None:
+            row.append(_median_ms(lambda sort=sort: client.get("/", params={"sort": sort}).raise_for_status(), args.repeat))
+            row.append(_median_ms(
+                lambda sort=sort, cursor=cursor: client.get("/api/posts", params={"sort": sort, "cursor": cursor or ""}).raise_for_status(),
+                args.repeat,
+            ))
+        # Without httpx the two GET columns are left off.
+        print(f"  {sort:<11} " + " ".join(f"{v:>{w}.1f}" for v, w in zip(row, (10, 11, 10, 8, 9), strict=False)))
+
+    # The same DB without the FTS table takes the LIKE fallback.
+    like_db = work / "ui-like.db"
+    shutil.copy(work / "ui.db", like_db)
+    with sqlite3.connect(like_db) as conn:
+        conn.execute("DROP TABLE posts_fts;")
+
+    print(f"\n  {'search':<13} {'fts rank':>9} {'fts date':>9} {'LIKE':>8}")
+    for q in _SEARCHES:
+        row = [
+            _median_ms(lambda q=q: list_posts_page(query=q, sort="relevance", limit=PAGE_SIZE), args.repeat),
+            _median_ms(lambda q=q: list_posts_page(query=q, sort="latest", limit=PAGE_SIZE), args.repeat),
+            _median_ms(lambda q=q: list_posts_page(query=q, limit=PAGE_SIZE, db_path=like_db), args.repeat),
+        ]
+        print(f"  {q!r:<13} " + " ".join(f"{v:>{w}.1f}" for v, w in zip(row, (9, 9, 8), strict=True)))
+
+    if client is not None:
+        uid = list_posts_page(status="pending", limit=1)[0][0]["uid"]
+        print(f"\n  {'payload':<22} {'plain':>8} {'gzip':>8} {'304':>5}")
+        for name, url in (
+            ("GET /api/posts", "/api/posts"),
+            ("GET /api/posts/{uid}", f"/api/posts/{uid}"),
+            ("  ?view=card", f"/api/posts/{uid}?view=card"),
+        ):
+            plain = client.get(url, headers={"Accept-Encoding": "identity"})
+            gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+            revalidated = client.get(url, headers={"If-None-Match": plain.headers["etag"]})
+            print(
+                f"  {name:<22} {len(plain.content):>8,} {int(gzipped.headers['content-length']):>8,}"
+                f" {int(revalidated.headers.get('content-length', 0)):>5}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
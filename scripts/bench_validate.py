@@ -0,0 +1,84 @@
+"""Benchmark output-schema validation: per-call `jsonschema.validate` vs the cached validator.
+
+Validates the one-shot example output (`prompts/v1/examples/one_shot.json`)
+against `prompts/v1/output_schema.json` repeatedly and prints
+validations/second for:
+
+    uncached   jsonschema.validate(instance, schema)  (the old per-call path)
+    cached     mailrocket.analyzer.llm.validate_response (compiled once)
+    threaded   the cached path from N threads sharing one validator
+
+Usage:
+    python scripts/bench_validate.py
+    python scripts/bench_validate.py --iterations 1000 --threads 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import jsonschema  # noqa: E402
+
+from mailrocket.analyzer.llm import _load_output_schema, validate_response  # noqa: E402
+from mailrocket.settings import settings  # noqa: E402
+
+
+def _rate(label: str, n: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed else float("inf")
+    print(f"  {label:<10} {rate:>12,.0f} validations/s   ({elapsed * 1000:,.1f} ms for {n:,})")
+    return rate
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else "")
+    p.add_argument("--iterations", type=int, default=300, help="Validations per variant (default 300)")
+    p.add_argument("--threads", type=int, default=4, help="Threads for the shared-validator run (default 4)")
+    args = p.parse_args()
+
+    schema = _load_output_schema()
+    if schema is None:
+        print("No prompts/v1/output_schema.json found.", file=sys.stderr)
+        return 2
+    example_path = settings.paths.prompts_dir / "v1" / "examples" / "one_shot.json"
+    instance = json.loads(example_path.read_text(encoding="utf-8"))["output"]
+    n = args.iterations
+
+    validate_response(instance)  # warm: builds the cached validator
+
+    print(f"Validating {example_path.name} output, {n:,} iterations each\n")
+
+    def uncached() -> None:
+        for _ in range(n):
+            jsonschema.validate(instance=instance, schema=schema)
+
+    def cached() -> None:
+        for _ in range(n):
+            validate_response(instance)
+
+    def threaded() -> None:
+        per_thread = max(1, n // args.threads)
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for f in [pool.submit(lambda: [validate_response(instance) for _ in range(per_thread)])
+                      for _ in range(args.threads)]:
+                f.result()
+
+    base = _rate("uncached", n, uncached)
+    fast = _rate("cached", n, cached)
+    _rate("threaded", max(1, n // args.threads) * args.threads, threaded)
+
+    print(f"\nSpeed-up (cached vs uncached): {fast / base:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,10 @@ Usage:
     python scripts/db_admin.py mark-sent --from urls.txt
     python scripts/db_admin.py count-by-date
     python scripts/db_admin.py migrate
+    python scripts/db_admin.py reindex-dedup
+    python scripts/db_admin.py reindex-search
+    python scripts/db_admin.py queue-status
+    python scripts/db_admin.py requeue [--uid 42]
 """
 from __future__ import annotations
 
@@ -113,6 +117,11 @@ def main() -> None:
 
     sub.add_parser("count-by-date", help="Print unsent counts grouped by day")
     sub.add_parser("migrate", help="One-shot mail_sent legacy migration")
+    sub.add_parser("reindex-dedup", help="Rebuild the near-duplicate (MinHash) index")
+    sub.add_parser("reindex-search", help="Rebuild the full-text search index (posts_fts)")
+    sub.add_parser("queue-status", help="Analyze queue: ready / leased / retrying / parked posts")
+    rq = sub.add_parser("requeue", help="Un-park posts that exhausted their analyze attempts")
+    rq.add_argument("--uid", type=int, default=None, help="Only this post (default: all parked)")
 
     args = p.parse_args()
 
@@ -126,6 +135,31 @@ def main() -> None:
         count_unsent_by_date()
     elif args.cmd == "migrate":
         migrate_post_analysis_schema()
+    elif args.cmd == "reindex-dedup":
+        from mailrocket.storage import init_db
+        from mailrocket.storage.dedup_repo import reindex_all
+
+        init_db()
+        indexed, duplicates = reindex_all()
+        print(f"Indexed {indexed} posts; {duplicates} near-duplicates.")
+    elif args.cmd == "reindex-search":
+        from mailrocket.storage import init_db
+        from mailrocket.storage.schema import rebuild_post_search
+
+        init_db()
+        print(f"Indexed {rebuild_post_search()} posts for search.")
+    elif args.cmd == "queue-status":
+        from mailrocket.storage import init_db
+        from mailrocket.storage.jobs_repo import queue_status
+
+        init_db()
+        print(json.dumps(queue_status(), indent=2, default=str))
+    elif args.cmd == "requeue":
+        from mailrocket.storage import init_db
+        from mailrocket.storage.jobs_repo import requeue_parked
+
+        init_db()
+        print(f"Requeued {requeue_parked(args.uid)} parked post(s).")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""Offline load test of the analyze stage against the `mock` LLM provider.
+
+Seeds a throwaway SQLite DB with synthetic job posts, points `llm.models`
+at mock profiles (see `llm.mock_profiles` in config.example.yaml) and runs
+`run_analyze()` end to end: prompt building, rotation/hedging, JSON
+validation, the `llm_calls` ledger and the analysis writes. Nothing leaves
+the machine and no API keys are needed.
+
+Usage:
+    python scripts/load_test_analyze.py
+    python scripts/load_test_analyze.py --posts 500 --models mock/fast,mock/flaky
+    python scripts/load_test_analyze.py --duplicates 0.3 --hedging --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+_ROLES = ("Backend Engineer", "Data Engineer", "Python Developer", "SRE", "ML Engineer")
+_COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Labs")
+_STACKS = ("Go, Postgres, Kubernetes", "Python, Django, AWS", "Spark, Airflow, dbt",
+           "Terraform, GCP, Prometheus", "PyTorch, Ray, Triton")
+
+
+def _synthetic_post(i: int, rng: random.Random) -> dict:
+    company = rng.choice(_COMPANIES)
+    role = rng.choice(_ROLES)
+    slug = company.lower().replace(" ", "")
+    text = (
+        f"We're hiring a {role} at {company}! ({i})\n"
+        f"{rng.randint(1, 8)}+ years with {rng.choice(_STACKS)}. "
+        f"Location: {rng.choice(['Remote', 'Berlin', 'Bangalore', 'NYC'])}.\n"
+        f"Send your CV to jobs{i}@{slug}.example or apply at https://{slug}.example/jobs/{i}"
+    )
+    return {
+        "query": "load-test",
+        "post_link": f"https://example.invalid/posts/{i}",
+        "post_text": text,
+        "post_date": "2026-01-01T00:00:00",
+        "author_name": f"Recruiter {i}",
+        "profile_url": None,
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else "")
+    p.add_argument("--posts", type=int, default=100, help="Synthetic posts to analyze (default 100)")
+    p.add_argument("--models", default="mock/fast,mock/flaky",
+                   help="Comma-separated provider/name list (default mock/fast,mock/flaky)")
+    p.add_argument("--duplicates", type=float, default=0.0,
+                   help="Fraction of posts that repeat an earlier post's text (default 0)")
+    p.add_argument("--streaming", action="store_true", help="Stream completions")
+    p.add_argument("--hedging", action="store_true", help="Enable hedged requests")
+    p.add_argument("--seed", type=int, default=None, help="Seed for posts and mock latencies")
+    p.add_argument("--db", type=Path, default=None, help="DB path (default: a temp file)")
+    args = p.parse_args()
+
+    db = args.db or Path(tempfile.mkdtemp(prefix="mailrocket-load-")) / "load.db"
+    # Settings are read once at import, so configure them before importing mailrocket.
+    os.environ["MAILROCKET_DB"] = str(db)
+    os.environ["MAILROCKET_LLM_MODELS"] = args.models
+    os.environ.setdefault("MAILROCKET_RESUME_TEXT", str(REPO_ROOT / "data" / "resume.example.txt"))
+    os.environ["MAILROCKET_LLM_STREAMING"] = "1" if args.streaming else "0"
+    os.environ["MAILROCKET_LLM_HEDGING"] = "1" if args.hedging else "0"
+
+    from mailrocket.analyzer import mock_llm
+    from mailrocket.logging_setup import configure_logging
+    from mailrocket.pipeline import run_analyze
+    from mailrocket.storage import init_db
+    from mailrocket.storage.llm_calls_repo import flush_llm_calls, llm_call_stats
+    from mailrocket.storage.posts_repo import insert_post
+
+    configure_logging("WARNING")
+
+    rng = random.Random(args.seed)
+    if args.seed is not None:
+        mock_llm.seed(args.seed)
+
+    init_db()
+    posts: list[dict] = []
+    for i in range(args.posts):
+        post = _synthetic_post(i, rng)
+        if posts and rng.random() < args.duplicates:
+            post["post_text"] = rng.choice(posts)["post_text"]
+        posts.append(post)
+        insert_post(post)
+
+    print(f"DB: {db}\nModels: {args.models}\nPosts: {args.posts}\n")
+    start = time.perf_counter()
+    started_at = time.time()
+    analyzed = run_analyze()
+    elapsed = time.perf_counter() - start
+    flush_llm_calls()
+
+    print(f"Analyzed {analyzed}/{args.posts} posts in {elapsed:.1f}s "
+          f"({analyzed / elapsed if elapsed else 0:.2f} posts/s)\n")
+    window = time.time() - started_at + 1
+    print(f"  {'model':<24} {'calls':>6} {'fail%':>6} {'p50 ms':>8} {'p95 ms':>8}  outcomes")
+    for s in llm_call_stats(window):
+        p50 = f"{s['p50_ms']:.0f}" if s["p50_ms"] is not None else "-"
+        p95 = f"{s['p95_ms']:.0f}" if s["p95_ms"] is not None else "-"
+        outcomes = ", ".join(f"{k}={v}" for k, v in sorted(s["outcomes"].items()))
+        print(f"  {s['provider'] + '/' + s['model']:<24} {s['calls']:>6} "
+              f"{s['failure_rate'] * 100:>5.1f}% {p50:>8} {p95:>8}  {outcomes}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
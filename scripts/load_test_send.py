@@ -0,0 +1,171 @@
+"""Offline load test of the send stage against a local transport.
+
+Seeds a throwaway SQLite DB with synthetic drafts that pass the send rules
+and runs `run_send()` end to end: outbox claims, MIME building (with an
+optional synthetic resume PDF), the chosen `send.mode` and transport, and
+the bookkeeping writes. By default messages go to a temp Maildir. With
+`--transport smtp` they go to an SMTP server: `--sink` starts an in-process
+aiosmtpd stand-in (`uv run --with aiosmtpd ...`), or point `--smtp-host` /
+`--smtp-port` at a relay you run yourself. Nothing reaches Gmail. The
+synthetic bodies have paragraphs longer than SMTP's 998-byte line limit.
+`--migrate` runs the legacy `db_admin migrate` on the seeded DB before
+sending, so the outbox enqueues against a migrated schema. Exits 1 unless every message was delivered (and, with `--sink`, received).
+
+Usage:
+    python scripts/load_test_send.py
+    python scripts/load_test_send.py --drafts 500 --mode concurrent --concurrency 8
+    uv run --with aiosmtpd python scripts/load_test_send.py --sink --attachment-kb 300
+    python scripts/load_test_send.py --mode batch
+    python scripts/load_test_send.py --migrate
+    python scripts/load_test_send.py --transport smtp --smtp-port 8025 --no-pipelining
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+_COMPANIES = ("acme", "globex", "initech", "umbrella", "hooli", "starklabs")
+
+
+def _free_port() -> int:
+    # aiosmtpd's startup self-check connects to the port it was given, so it can't take 0.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_sink():
+    """In-process aiosmtpd server counting delivered messages; returns (controller, counter)."""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise SystemExit("--sink needs aiosmtpd: uv run --with aiosmtpd python scripts/load_test_send.py ...") from None
+
+    class _Counter:
+        messages = 0
+
+        async def handle_DATA(self, server, session, envelope):  # noqa: N802 (aiosmtpd hook name)
+            self.messages += 1
+            return "250 OK"
+
+    handler = _Counter()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    return controller, handler
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else "")
+    p.add_argument("--drafts", type=int, default=200, help="Synthetic drafts to send (default 200)")
+    p.add_argument("--recipients", type=int, default=2, help="Recipients per draft (default 2)")
+    p.add_argument("--transport", choices=("maildir", "smtp"), default="maildir",
+                   help="Where messages go (default maildir)")
+    p.add_argument("--mode", choices=("sequential", "concurrent", "batch"), default="sequential",
+                   help="send.mode (default sequential)")
+    p.add_argument("--concurrency", type=int, default=4, help="Worker threads in concurrent mode (default 4)")
+    p.add_argument("--attachment-kb", type=int, default=0,
+                   help="Attach a synthetic resume PDF of this size (default: no attachment)")
+    p.add_argument("--sink", action="store_true", help="Start a local aiosmtpd sink (implies --transport smtp)")
+    p.add_argument("--smtp-host", default="127.0.0.1", help="SMTP host (default 127.0.0.1)")
+    p.add_argument("--smtp-port", type=int, default=8025, help="SMTP port (default 8025)")
+    p.add_argument("--no-pipelining", action="store_true", help="Don't use ESMTP PIPELINING")
+    p.add_argument("--migrate", action="store_true",
+                   help="Run the legacy post_analysis migration on the seeded DB before sending")
+    p.add_argument("--seed", type=int, default=None, help="Seed for the synthetic drafts")
+    args = p.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="mailrocket-send-"))
+    transport = "smtp" if args.sink else args.transport
+    controller = handler = None
+    if args.sink:
+        controller, handler = _start_sink()
+        args.smtp_host, args.smtp_port = controller.hostname, controller.port
+
+    pdf = work / "resume.pdf"
+    if args.attachment_kb:
+        pdf.write_bytes(b"%PDF-1.4\n" + os.urandom(args.attachment_kb * 1024))
+
+    # Settings are read once at import, so configure them before importing mailrocket.
+    os.environ["MAILROCKET_DB"] = str(work / "load.db")
+    os.environ["MAILROCKET_TRANSPORT"] = transport
+    os.environ["MAILROCKET_MAILDIR"] = str(work / "maildir")
+    os.environ["MAILROCKET_SMTP_HOST"] = args.smtp_host
+    os.environ["MAILROCKET_SMTP_PORT"] = str(args.smtp_port)
+    os.environ["MAILROCKET_SMTP_STARTTLS"] = "0"
+    os.environ["MAILROCKET_SMTP_PIPELINING"] = "0" if args.no_pipelining else "1"
+    os.environ["MAILROCKET_SEND_MODE"] = args.mode
+    os.environ["MAILROCKET_SEND_CONCURRENCY"] = str(args.concurrency)
+    os.environ["MAILROCKET_SEND_DOMAIN_RATE_PER_MINUTE"] = "0"
+    os.environ["MAILROCKET_RESUME_PDF"] = str(pdf)
+    os.environ["MAILROCKET_FROM_MAIL"] = "load-test@mailrocket.example"
+    os.environ["MAILROCKET_SELF_REVIEW_MAIL"] = ""
+    os.environ["MAILROCKET_MATCH_THRESHOLD"] = "0"
+
+    from mailrocket import timing
+    from mailrocket.logging_setup import configure_logging
+    from mailrocket.pipeline import run_send
+    from mailrocket.storage import init_db
+    from mailrocket.storage.analysis_repo import insert_analysis
+    from mailrocket.storage.outbox_repo import outbox_summary
+    from mailrocket.storage.posts_repo import insert_post
+    from mailrocket.storage.schema import migrate_post_analysis_schema
+
+    configure_logging("WARNING")
+
+    rng = random.Random(args.seed)
+    init_db()
+    for i in range(args.drafts):
+        company = rng.choice(_COMPANIES)
+        uid = insert_post({
+            "query": "load-test",
+            "post_link": f"https://example.invalid/posts/{i}",
+            "post_text": f"Hiring at {company} ({i})",
+            "post_date": "2026-01-01T00:00:00",
+            "author_name": f"Recruiter {i}",
+            "profile_url": None,
+        })
+        insert_analysis(uid, [{
+            "match_percentage": 90,
+            "experience_gap": 0,
+            "contact_email": [f"hr{j}.{i}@{company}.example" for j in range(args.recipients)],
+            "company_name": company,
+            "message_content": {"subject": f"Application {i}", "body": "Hello,\n" + "Lorem ipsum. " * 80},
+        }], model_used="load-test")
+    if args.migrate:
+        migrate_post_analysis_schema()
+
+    target = work / "maildir" if transport == "maildir" else f"{args.smtp_host}:{args.smtp_port}"
+    print(f"DB: {work / 'load.db'}\nTransport: {transport} -> {target}\n"
+          f"Mode: {args.mode}{' (migrated DB)' if args.migrate else ''}\nDrafts: {args.drafts} x {args.recipients} recipients\n")
+    timing.reset()
+    start = time.perf_counter()
+    sent, rejected = run_send()
+    elapsed = time.perf_counter() - start
+    messages = outbox_summary().get("sent", 0)
+
+    print(f"Sent {sent} drafts ({messages} messages), rejected {rejected}, in {elapsed:.2f}s "
+          f"({messages / elapsed if elapsed else 0:.0f} messages/s)")
+    expected = args.drafts * args.recipients
+    ok = messages == expected
+    if handler is not None:
+        print(f"Sink received {handler.messages} messages")
+        ok = ok and handler.messages == expected
+        controller.stop()
+    print()
+    print(timing.format_report(timing.summary(), title="Send stage"))
+    if not ok:
+        print(f"\nFAILED: expected {expected} delivered messages; outbox states {outbox_summary()}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())